@@ -85,6 +85,27 @@ DATABASES = {
 }
 
 
+# Cache (dipakai badge notifikasi pasien). LocMemCache berlaku per proses;
+# untuk beberapa worker gunakan backend bersama seperti Redis atau Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'spstunting',
+    }
+}
+
+# Cache disk untuk laporan PDF (lihat core/laporan_pdf.py)
+PDF_CACHE_DIR = BASE_DIR / 'cache' / 'pdf'
+PDF_CACHE_MAX_BYTES = 200 * 1024 * 1024
+# Mesin render laporan PDF: 'xhtml2pdf' (template HTML) atau 'reportlab' (digambar langsung,
+# jauh lebih ringan untuk cetak massal). Lihat `manage.py benchmark_pdf`.
+PDF_ENGINE = 'xhtml2pdf'
+
+# Laporan kesalahan impor massal pengukuran (lihat core/impor_pengukuran.py); dibuang
+# setelah IMPOR_LAPORAN_MAX_AGE detik
+IMPOR_LAPORAN_DIR = BASE_DIR / 'cache' / 'impor'
+IMPOR_LAPORAN_MAX_AGE = 7 * 24 * 60 * 60
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
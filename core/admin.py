@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.http import HttpResponseForbidden
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import Pasien, Gejala, Kondisi, Aturan, Konsultasi, DetailKonsultasi, PengukuranFisik, Notifikasi
+from .models import Pasien, Gejala, Kondisi, Aturan, Konsultasi, DetailKonsultasi, PengukuranFisik, Notifikasi, TugasPdf, SnapshotBasisPengetahuan
 
 # Custom ModelAdmin classes with role-based access control
 class RestrictedModelAdmin(admin.ModelAdmin):
@@ -52,6 +52,24 @@ class AturanAdmin(RestrictedModelAdmin):
     search_fields = ('kodeKelompokAturan', 'kondisi__namaKondisi', 'gejala__namaGejala')
     ordering = ('kodeKelompokAturan', 'kondisi', 'gejala')
 
+@admin.register(SnapshotBasisPengetahuan)
+class SnapshotBasisPengetahuanAdmin(RestrictedModelAdmin):
+    # Snapshot tidak boleh diubah: konsultasi lama merujuknya untuk diputar ulang
+    list_display = ('id', 'hash', 'dibuat')
+    search_fields = ('hash',)
+    ordering = ('-dibuat',)
+    exclude = ('isi',)
+    readonly_fields = ('hash', 'dibuat')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 # Register other models with default access (accessible by both Admin and Pakar)
 @admin.register(Pasien)
 class PasienAdmin(admin.ModelAdmin):
@@ -62,7 +80,7 @@ class PasienAdmin(admin.ModelAdmin):
 
 @admin.register(Konsultasi)
 class KonsultasiAdmin(admin.ModelAdmin):
-    list_display = ('id', 'pasien', 'tanggalKonsultasi', 'hasilKondisi', 'tombol_cetak_pdf')
+    list_display = ('id', 'pasien', 'tanggalKonsultasi', 'hasilKondisi', 'hasilEvaluasiUlang', 'tombol_cetak_pdf')
     list_filter = ('tanggalKonsultasi', 'hasilKondisi')
     search_fields = ('pasien__nama', 'hasilKondisi__namaKondisi')
     ordering = ('-tanggalKonsultasi',)
@@ -86,7 +104,7 @@ class DetailKonsultasiAdmin(admin.ModelAdmin):
 
 @admin.register(PengukuranFisik)
 class PengukuranFisikAdmin(admin.ModelAdmin):
-    list_display = ('pasien', 'tanggalUkur', 'beratBadan', 'tinggiBadan', 'skor_Z_BB_U', 'skor_Z_TB_U', 'tombol_cetak_riwayat')
+    list_display = ('pasien', 'tanggalUkur', 'beratBadan', 'tinggiBadan', 'skor_Z_BB_U', 'skor_Z_TB_U', 'skor_Z_BB_TB', 'skor_Z_IMT_U', 'tombol_cetak_riwayat')
     list_filter = ('tanggalUkur', 'pasien__jenisKelamin')
     search_fields = ('pasien__nama',)
     ordering = ('-tanggalUkur',)
@@ -107,4 +125,12 @@ class NotifikasiAdmin(admin.ModelAdmin):
     list_display = ('pasien', 'judul', 'jadwalNotifikasi', 'sudahTerkirim', 'tipe')
     list_filter = ('sudahTerkirim', 'tipe', 'jadwalNotifikasi')
     search_fields = ('pasien__nama', 'judul')
-    ordering = ('-jadwalNotifikasi',)
\ No newline at end of file
+    ordering = ('-jadwalNotifikasi',)
+
+@admin.register(TugasPdf)
+class TugasPdfAdmin(admin.ModelAdmin):
+    list_display = ('pasien', 'jenis', 'status', 'dibuat', 'dimulai', 'selesai')
+    list_filter = ('status', 'jenis')
+    search_fields = ('pasien__nama',)
+    ordering = ('-dibuat',)
+    readonly_fields = ('kunci', 'pesanError', 'dibuat', 'dimulai', 'selesai')
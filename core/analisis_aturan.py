@@ -0,0 +1,153 @@
+"""
+Analisis Konflik dan Ambiguitas Kelompok Aturan
+
+Mesin inferensi memakai Strict Equality Matching: kelompok aturan pertama
+(urut id) yang himpunan gejalanya sama persis dengan gejala input menang.
+Analisis ini memeriksa seluruh kelompok sekaligus dari dict kelompok
+IndeksAturan (kunci (kodeKondisi, kodeKelompokAturan) -> frozenset gejala,
+urut prioritas) tanpa perbandingan berpasangan:
+
+- Duplikat: kelompok dengan himpunan gejala yang sama, dikelompokkan lewat
+  hash frozenset. Duplikat lintas kondisi adalah konflik.
+- Tidak terjangkau: setiap duplikat selain yang pertama, karena tidak
+  pernah bisa menang.
+- Subset/superset: setiap subset sejati suatu kelompok dicari di dict
+  hash. Jumlah gejala per kelompok kecil sehingga biayanya linear terhadap
+  jumlah kelompok; kelompok yang lebih besar dari BATAS_ENUMERASI_SUBSET
+  dibandingkan langsung dengan semua kelompok.
+"""
+from collections import namedtuple
+from itertools import combinations
+
+# Kelompok dengan gejala lebih banyak dari ini tidak dienumerasi subsetnya (2^n)
+BATAS_ENUMERASI_SUBSET = 12
+
+Duplikat = namedtuple('Duplikat', [
+    'gejala',             # Kode gejala (urut)
+    'kelompok',           # List kunci (kodeKondisi, kodeKelompokAturan) urut prioritas
+    'lintas_kondisi',     # True jika kelompoknya milik lebih dari satu kondisi
+])
+TidakTerjangkau = namedtuple('TidakTerjangkau', [
+    'kelompok',           # Kunci kelompok yang tidak pernah bisa menang
+    'pemenang',           # Kunci kelompok sebelumnya dengan gejala yang sama
+])
+Subset = namedtuple('Subset', [
+    'kecil',              # Kunci kelompok yang gejalanya subset sejati
+    'besar',              # Kunci kelompok superset
+    'gejala_tambahan',    # Kode gejala yang hanya ada di kelompok besar
+])
+HasilAnalisis = namedtuple('HasilAnalisis', ['duplikat', 'tidak_terjangkau', 'subset', 'jumlah_kelompok'])
+
+
+def _subset_sejati(gejala_set, per_himpunan):
+    """
+    Himpunan di per_himpunan yang merupakan subset sejati gejala_set
+    """
+    if len(gejala_set) > BATAS_ENUMERASI_SUBSET:
+        return [himpunan for himpunan in per_himpunan if himpunan < gejala_set]
+    kode = sorted(gejala_set)
+    return [
+        frozenset(bagian)
+        for ukuran in range(1, len(kode))
+        for bagian in combinations(kode, ukuran)
+        if frozenset(bagian) in per_himpunan
+    ]
+
+
+def analisis_kelompok(kelompok):
+    """
+    Analisis duplikat, kelompok tidak terjangkau dan relasi subset/superset
+
+    Args:
+        kelompok: dict (kodeKondisi, kodeKelompokAturan) -> frozenset kode gejala, urut prioritas
+
+    Returns:
+        HasilAnalisis
+    """
+    per_himpunan = {}
+    for key, gejala_set in kelompok.items():
+        per_himpunan.setdefault(gejala_set, []).append(key)
+
+    duplikat = []
+    tidak_terjangkau = []
+    for gejala_set, daftar in per_himpunan.items():
+        if len(daftar) < 2:
+            continue
+        duplikat.append(Duplikat(
+            gejala=sorted(gejala_set),
+            kelompok=daftar,
+            lintas_kondisi=len({kode_kondisi for kode_kondisi, _ in daftar}) > 1,
+        ))
+        tidak_terjangkau.extend(TidakTerjangkau(kelompok=key, pemenang=daftar[0]) for key in daftar[1:])
+
+    # Relasi subset dicatat antar kelompok yang dapat menang (yang pertama per himpunan)
+    subset = [
+        Subset(kecil=per_himpunan[bagian][0], besar=daftar[0], gejala_tambahan=sorted(gejala_set - bagian))
+        for gejala_set, daftar in per_himpunan.items()
+        for bagian in _subset_sejati(gejala_set, per_himpunan)
+    ]
+    return HasilAnalisis(duplikat, tidak_terjangkau, subset, len(kelompok))
+
+
+def periksa_perubahan(kelompok_saat_ini, kelompok_baru, kode_kondisi=None):
+    """
+    Analisis kelompok aturan yang akan disimpan terhadap basis pengetahuan saat ini
+
+    Args:
+        kelompok_saat_ini: dict kelompok IndeksAturan
+        kelompok_baru: dict (kodeKondisi, kodeKelompokAturan) -> frozenset gejala yang akan disimpan
+        kode_kondisi: Jika diisi, seluruh kelompok kondisi ini diganti (seperti edit_rule_pakar);
+            jika tidak, gejala ditambahkan ke kelompok dengan kunci yang sama (seperti create_rule_group)
+
+    Returns:
+        HasilAnalisis yang hanya berisi temuan yang melibatkan kelompok_baru
+    """
+    gabungan = {
+        key: gejala_set for key, gejala_set in kelompok_saat_ini.items()
+        if kode_kondisi is None or key[0] != kode_kondisi
+    }
+    for key, gejala_set in kelompok_baru.items():
+        # Baris Aturan baru mendapat id terbesar sehingga kelompok baru berada di akhir urutan prioritas
+        gabungan[key] = gabungan.get(key, frozenset()) | gejala_set
+
+    hasil = analisis_kelompok(gabungan)
+    return HasilAnalisis(
+        duplikat=[item for item in hasil.duplikat if any(key in kelompok_baru for key in item.kelompok)],
+        tidak_terjangkau=[
+            item for item in hasil.tidak_terjangkau if item.kelompok in kelompok_baru or item.pemenang in kelompok_baru
+        ],
+        subset=[item for item in hasil.subset if item.kecil in kelompok_baru or item.besar in kelompok_baru],
+        jumlah_kelompok=hasil.jumlah_kelompok,
+    )
+
+
+def _nama_kelompok(key):
+    return f'{key[1]} ({key[0]})'
+
+
+def pesan_konflik(hasil):
+    """
+    Pesan untuk duplikat lintas kondisi, yang membuat hasil diagnosa bergantung urutan aturan
+    """
+    return [
+        f'Gejala {", ".join(item.gejala)} sudah dipakai kelompok '
+        f'{", ".join(_nama_kelompok(key) for key in item.kelompok[:-1])}; '
+        f'{_nama_kelompok(item.kelompok[-1])} akan menghasilkan diagnosa ganda'
+        for item in hasil.duplikat if item.lintas_kondisi
+    ]
+
+
+def pesan_peringatan(hasil):
+    """
+    Pesan untuk temuan yang tidak memblokir penyimpanan
+    """
+    pesan = [
+        f'Kelompok {_nama_kelompok(item.kelompok)} tidak pernah terpakai karena sama dengan {_nama_kelompok(item.pemenang)}'
+        for item in hasil.tidak_terjangkau if item.kelompok[0] == item.pemenang[0]
+    ]
+    pesan += [
+        f'Gejala kelompok {_nama_kelompok(item.kecil)} adalah bagian dari {_nama_kelompok(item.besar)} '
+        f'(tambahan: {", ".join(item.gejala_tambahan)})'
+        for item in hasil.subset
+    ]
+    return pesan
@@ -0,0 +1,194 @@
+"""
+Analitik Populasi - Prevalensi Stunting, Berat Badan Kurang dan Wasting
+
+Prevalensi dihitung dari z-score yang sudah tersimpan di PengukuranFisik,
+dikelompokkan menurut bulan ukur, jenis kelamin dan/atau kelompok umur.
+
+Data diambil sekali sebagai kolom (values_list, tanpa membuat objek model),
+lalu dikelompokkan secara vektor dengan NumPy: kode kelompok digabung
+menjadi satu kunci per baris, lalu np.bincount menjumlahkan penyebut dan
+kasus per kunci. Umur saat diukur dihitung dari tanggalUkur - tanggalLahir,
+yang tidak dapat di-GROUP BY secara portabel di database.
+
+Penyebut tiap indikator adalah pengukuran dengan z-score indikator itu
+terisi; pengukuran yang z-score-nya belum dihitung tidak ikut dihitung.
+"""
+import csv
+
+import numpy as np
+
+from .kurva_referensi import HARI_PER_BULAN
+from .models import PengukuranFisik
+
+# (kunci, label, field z-score); kasus = z-score < -2 SD
+INDIKATOR_PREVALENSI = (
+    ('stunting', 'Stunting (TB/U < -2 SD)', 'skor_Z_TB_U'),
+    ('gizi_kurang', 'Berat Badan Kurang (BB/U < -2 SD)', 'skor_Z_BB_U'),
+    ('wasting', 'Wasting (BB/TB < -2 SD)', 'skor_Z_BB_TB'),
+)
+BATAS_SD = -2
+
+# Batas bawah kelompok umur dalam bulan (pengelompokan umum laporan gizi balita)
+KELOMPOK_UMUR = (
+    (0, '0-5 bulan'),
+    (6, '6-11 bulan'),
+    (12, '12-23 bulan'),
+    (24, '24-35 bulan'),
+    (36, '36-47 bulan'),
+    (48, '48-59 bulan'),
+    (60, '60+ bulan'),
+)
+LABEL_JENIS_KELAMIN = {'L': 'Laki-laki', 'P': 'Perempuan'}
+
+DIMENSI_BULAN = 'bulan'
+DIMENSI_JENIS_KELAMIN = 'jenis_kelamin'
+DIMENSI_KELOMPOK_UMUR = 'kelompok_umur'
+DIMENSI = {
+    DIMENSI_BULAN: 'Bulan',
+    DIMENSI_JENIS_KELAMIN: 'Jenis Kelamin',
+    DIMENSI_KELOMPOK_UMUR: 'Kelompok Umur',
+}
+
+
+def ambil_kolom(dari=None, sampai=None):
+    """
+    Ambil kolom pengukuran yang dibutuhkan analitik dalam satu query
+
+    Returns:
+        dict nama kolom -> array NumPy: 'tanggal' dan 'lahir' (datetime64[D]),
+        'jenis_kelamin' (str), dan satu array float per field z-score (NaN jika kosong)
+    """
+    pengukuran = PengukuranFisik.objects.order_by()
+    if dari:
+        pengukuran = pengukuran.filter(tanggalUkur__gte=dari)
+    if sampai:
+        pengukuran = pengukuran.filter(tanggalUkur__lte=sampai)
+    field_skor = [field for _, _, field in INDIKATOR_PREVALENSI]
+    baris = list(pengukuran.values_list('tanggalUkur', 'pasien__tanggalLahir', 'pasien__jenisKelamin', *field_skor))
+
+    kolom = list(zip(*baris)) or [()] * (3 + len(field_skor))
+    data = {
+        'tanggal': np.array(kolom[0], dtype='datetime64[D]'),
+        'lahir': np.array(kolom[1], dtype='datetime64[D]'),
+        'jenis_kelamin': np.array(kolom[2], dtype=str),
+    }
+    for field, nilai in zip(field_skor, kolom[3:]):
+        # None -> NaN, Decimal -> float
+        data[field] = np.array([np.nan if v is None else float(v) for v in nilai], dtype=float)
+    return data
+
+
+def _kode_dimensi(data, dimensi):
+    """
+    Kode bilangan bulat per baris untuk satu dimensi, beserta fungsi kode -> label
+    """
+    if dimensi == DIMENSI_BULAN:
+        kode = data['tanggal'].astype('datetime64[M]').astype(np.int64)
+        return kode, lambda k: str(np.datetime64(int(k), 'M'))
+    if dimensi == DIMENSI_JENIS_KELAMIN:
+        kunci = sorted(LABEL_JENIS_KELAMIN)
+        kode = np.searchsorted(kunci, data['jenis_kelamin'])
+        return kode, lambda k: LABEL_JENIS_KELAMIN[kunci[k]]
+    if dimensi == DIMENSI_KELOMPOK_UMUR:
+        umur_bulan = (data['tanggal'] - data['lahir']).astype(np.int64) / HARI_PER_BULAN
+        batas = np.array([bawah for bawah, _ in KELOMPOK_UMUR[1:]])
+        kode = np.searchsorted(batas, umur_bulan, side='right')
+        return kode, lambda k: KELOMPOK_UMUR[k][1]
+    raise ValueError(f'Dimensi tidak dikenal: {dimensi}')
+
+
+def hitung_prevalensi(data, dimensi=(DIMENSI_BULAN,)):
+    """
+    Hitung prevalensi tiap indikator per kombinasi dimensi
+
+    Args:
+        data: Hasil ambil_kolom()
+        dimensi: Urutan kunci DIMENSI; () menghasilkan satu baris total
+
+    Returns:
+        List dict per kelompok (urut kode: bulan naik, L lalu P, umur naik) berisi
+        label tiap dimensi, 'jumlah_pengukuran', dan per indikator '<kunci>_diukur',
+        '<kunci>_kasus', '<kunci>_persen' (None jika tidak ada yang diukur)
+    """
+    # Umur negatif (tanggal lahir setelah tanggal ukur) adalah data salah
+    sah = data['tanggal'] >= data['lahir']
+    if DIMENSI_JENIS_KELAMIN in dimensi:
+        sah &= np.isin(data['jenis_kelamin'], list(LABEL_JENIS_KELAMIN))
+
+    kode_list, label_list = [], []
+    for nama in dimensi:
+        kode, label = _kode_dimensi(data, nama)
+        kode_list.append(kode[sah])
+        label_list.append(label)
+
+    jumlah_sah = int(sah.sum())
+    if not jumlah_sah:
+        return []
+    if kode_list:
+        kunci, invers = np.unique(np.stack(kode_list, axis=1), axis=0, return_inverse=True)
+        invers = invers.reshape(-1)
+    else:
+        kunci, invers = np.zeros((1, 0), dtype=np.int64), np.zeros(jumlah_sah, dtype=np.int64)
+
+    jumlah_kelompok = len(kunci)
+    hasil = [
+        {nama: label(k) for nama, label, k in zip(dimensi, label_list, baris_kunci)}
+        for baris_kunci in kunci
+    ]
+    jumlah_pengukuran = np.bincount(invers, minlength=jumlah_kelompok)
+    for baris, jumlah in zip(hasil, jumlah_pengukuran):
+        baris['jumlah_pengukuran'] = int(jumlah)
+
+    for kunci_indikator, _, field in INDIKATOR_PREVALENSI:
+        skor = data[field][sah]
+        diukur = np.bincount(invers, weights=~np.isnan(skor), minlength=jumlah_kelompok)
+        # NaN < -2 bernilai False, jadi pengukuran tanpa skor tidak menjadi kasus
+        kasus = np.bincount(invers, weights=skor < BATAS_SD, minlength=jumlah_kelompok)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            persen = np.round(100 * kasus / diukur, 1)
+        for baris, n, k, p in zip(hasil, diukur, kasus, persen):
+            baris[f'{kunci_indikator}_diukur'] = int(n)
+            baris[f'{kunci_indikator}_kasus'] = int(k)
+            baris[f'{kunci_indikator}_persen'] = float(p) if n else None
+    return hasil
+
+
+def baris_tabel(hasil, dimensi):
+    """
+    Ubah hasil hitung_prevalensi() menjadi baris siap tampil di template
+
+    Returns:
+        List dict 'label' (list label dimensi), 'jumlah_pengukuran' dan
+        'indikator' (list tuple (diukur, kasus, persen) sesuai INDIKATOR_PREVALENSI)
+    """
+    return [
+        {
+            'label': [baris[nama] for nama in dimensi],
+            'jumlah_pengukuran': baris['jumlah_pengukuran'],
+            'indikator': [
+                (baris[f'{kunci}_diukur'], baris[f'{kunci}_kasus'], baris[f'{kunci}_persen'])
+                for kunci, _, _ in INDIKATOR_PREVALENSI
+            ],
+        }
+        for baris in hasil
+    ]
+
+
+def kolom_csv(dimensi):
+    """
+    Urutan kolom ekspor CSV untuk dimensi terpilih
+    """
+    kolom = list(dimensi) + ['jumlah_pengukuran']
+    for kunci, _, _ in INDIKATOR_PREVALENSI:
+        kolom += [f'{kunci}_diukur', f'{kunci}_kasus', f'{kunci}_persen']
+    return kolom
+
+
+def tulis_csv(hasil, dimensi, berkas):
+    """
+    Tulis hasil hitung_prevalensi() sebagai CSV ke objek berkas teks
+    """
+    writer = csv.DictWriter(berkas, fieldnames=kolom_csv(dimensi), extrasaction='ignore')
+    writer.writeheader()
+    for baris in hasil:
+        writer.writerow({kunci: '' if nilai is None else nilai for kunci, nilai in baris.items()})
@@ -0,0 +1,139 @@
+"""
+Antrian PDF - Render Laporan di Latar Belakang
+
+Request web hanya mencatat TugasPdf (satu INSERT) lalu mengarahkan pengguna
+ke halaman status yang melakukan polling. Worker (`manage.py run_pdf_worker`)
+mengklaim tugas dari tabel dengan UPDATE bersyarat, me-render PDF di
+ProcessPoolExecutor (bukan thread, agar tidak terhambat GIL), dan menyimpan
+hasilnya ke cache disk laporan_pdf. Unduhan dilayani langsung dari cache.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .laporan_pdf import ada_di_cache, laporan_hasil_diagnosa, laporan_riwayat, pastikan_di_cache
+from .models import TugasPdf
+
+# Tugas 'diproses' yang lebih lama dari ini dianggap ditinggal worker yang mati
+BATAS_WAKTU_PROSES = timedelta(minutes=10)
+
+STATUS_AKTIF = (TugasPdf.STATUS_ANTRI, TugasPdf.STATUS_DIPROSES)
+
+
+def laporan_untuk_tugas(tugas):
+    """
+    Siapkan Laporan (kunci, template, context) sesuai jenis tugas
+    """
+    if tugas.jenis == TugasPdf.JENIS_HASIL_DIAGNOSA:
+        return laporan_hasil_diagnosa(tugas.konsultasi_id)
+    return laporan_riwayat(tugas.pasien_id)
+
+
+def antrekan_pdf(jenis, pasien_id, konsultasi_id=None):
+    """
+    Catat permintaan PDF ke antrian, atau pakai tugas aktif yang sama
+
+    Args:
+        jenis: TugasPdf.JENIS_RIWAYAT atau TugasPdf.JENIS_HASIL_DIAGNOSA
+        pasien_id: ID Pasien pemilik laporan
+        konsultasi_id: ID Konsultasi (wajib untuk hasil diagnosa)
+
+    Returns:
+        Objek TugasPdf
+    """
+    tugas = TugasPdf.objects.filter(
+        jenis=jenis, pasien_id=pasien_id, konsultasi_id=konsultasi_id, status__in=STATUS_AKTIF
+    ).order_by('dibuat').first()
+    if tugas is None:
+        tugas = TugasPdf.objects.create(jenis=jenis, pasien_id=pasien_id, konsultasi_id=konsultasi_id)
+    return tugas
+
+
+def klaim_tugas(batas):
+    """
+    Ambil hingga `batas` tugas tertua dari antrian dan tandai 'diproses'
+
+    UPDATE bersyarat pada status memastikan satu tugas hanya diklaim satu
+    worker meskipun beberapa proses worker berjalan bersamaan.
+
+    Returns:
+        List ID tugas yang berhasil diklaim
+    """
+    kandidat = TugasPdf.objects.filter(status=TugasPdf.STATUS_ANTRI).order_by('dibuat').values_list('id', flat=True)[:batas]
+    diklaim = []
+    for tugas_id in kandidat:
+        if TugasPdf.objects.filter(id=tugas_id, status=TugasPdf.STATUS_ANTRI).update(
+            status=TugasPdf.STATUS_DIPROSES, dimulai=timezone.now()
+        ):
+            diklaim.append(tugas_id)
+    return diklaim
+
+
+def pulihkan_tugas_macet(batas_waktu=BATAS_WAKTU_PROSES, kecuali=()):
+    """
+    Kembalikan tugas 'diproses' yang terlalu lama ke antrian
+
+    Args:
+        batas_waktu: Umur klaim sebelum tugas dianggap ditinggal
+        kecuali: ID tugas yang masih dirender worker pemanggil (render panjang, bukan macet)
+
+    Returns:
+        Jumlah tugas yang dikembalikan
+    """
+    return TugasPdf.objects.filter(
+        status=TugasPdf.STATUS_DIPROSES, dimulai__lt=timezone.now() - batas_waktu
+    ).exclude(id__in=list(kecuali)).update(status=TugasPdf.STATUS_ANTRI, dimulai=None)
+
+
+def lepaskan_tugas(tugas_ids):
+    """
+    Kembalikan tugas yang sudah diklaim tetapi belum sempat dirender ke antrian
+
+    Returns:
+        Jumlah tugas yang dikembalikan
+    """
+    return TugasPdf.objects.filter(id__in=list(tugas_ids), status=TugasPdf.STATUS_DIPROSES).update(
+        status=TugasPdf.STATUS_ANTRI, dimulai=None
+    )
+
+
+def kerjakan_tugas(tugas_id):
+    """
+    Render PDF satu tugas yang sudah diklaim dan simpan ke cache disk
+
+    Dipanggil di proses worker. Status akhir (selesai/gagal) ditulis ke tabel.
+
+    Returns:
+        Status akhir tugas
+    """
+    tugas = TugasPdf.objects.get(id=tugas_id)
+    try:
+        laporan = laporan_untuk_tugas(tugas)
+        pastikan_di_cache(laporan.kunci, laporan.nama_template, laporan.context)
+    except Exception as e:
+        TugasPdf.objects.filter(id=tugas_id).update(
+            status=TugasPdf.STATUS_GAGAL, pesanError=str(e), selesai=timezone.now()
+        )
+        return TugasPdf.STATUS_GAGAL
+
+    TugasPdf.objects.filter(id=tugas_id).update(
+        status=TugasPdf.STATUS_SELESAI, kunci=laporan.kunci, pesanError='', selesai=timezone.now()
+    )
+    return TugasPdf.STATUS_SELESAI
+
+
+def tugas_siap_diunduh(tugas):
+    """
+    True jika tugas selesai dan berkasnya masih ada di cache (belum tergusur LRU)
+    """
+    return tugas.status == TugasPdf.STATUS_SELESAI and bool(tugas.kunci) and ada_di_cache(tugas.kunci)
+
+
+def antrekan_ulang(tugas):
+    """
+    Kembalikan tugas ke antrian, misal karena berkasnya sudah tergusur dari cache
+    """
+    TugasPdf.objects.filter(id=tugas.id).update(
+        status=TugasPdf.STATUS_ANTRI, dimulai=None, selesai=None, pesanError=''
+    )
+    tugas.status = TugasPdf.STATUS_ANTRI
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Daftarkan sinyal invalidasi cache basis pengetahuan
+        from . import signals  # noqa: F401
@@ -0,0 +1,207 @@
+"""
+Pemuat Basis Pengetahuan Berbasis Selisih (YAML/JSON)
+
+Basis pengetahuan disimpan sebagai berkas berversi (core/data/basis_pengetahuan.yaml).
+Pemuat membaca berkas, membandingkannya dengan isi database lalu hanya
+menerapkan selisihnya dengan bulk_create/bulk_update/delete dalam satu
+transaksi. Baris yang tidak berubah tidak disentuh, sehingga memuat ulang
+tidak lagi menghapus seluruh Kondisi (yang mengosongkan hasilKondisi riwayat
+Konsultasi) dan dapat dijalankan saat jam layanan.
+
+Identitas baris:
+    Gejala  -> kodeGejala
+    Kondisi -> kodeKondisi
+    Aturan  -> (kodeKelompokAturan, kondisi, gejala)
+"""
+import os
+
+import yaml
+from django.db import transaction
+
+from .mesin_inferensi import perubahan_massal
+from .models import Aturan, Gejala, Kondisi, Konsultasi
+from .statistik import catat_objek_baru
+
+BERKAS_DEFAULT = os.path.join(os.path.dirname(__file__), 'data', 'basis_pengetahuan.yaml')
+
+FIELD_GEJALA = {'nama': 'namaGejala'}
+FIELD_KONDISI = {'nama': 'namaKondisi', 'deskripsi': 'deskripsi', 'solusi': 'solusi'}
+
+
+def baca_berkas(path=BERKAS_DEFAULT):
+    """
+    Baca berkas basis pengetahuan YAML atau JSON (JSON adalah subset YAML)
+
+    Returns:
+        dict dengan 'versi', 'gejala', 'kondisi', 'aturan'
+    """
+    with open(path, encoding='utf-8') as f:
+        data = yaml.safe_load(f)
+    validasi(data)
+    return data
+
+
+def validasi(data):
+    """
+    Periksa struktur, kode ganda dan rujukan aturan
+
+    Raises:
+        ValueError: Pesan kesalahan pertama yang ditemukan
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Berkas basis pengetahuan harus berisi mapping')
+    for kunci in ('gejala', 'kondisi', 'aturan'):
+        if not isinstance(data.get(kunci), list):
+            raise ValueError(f'Bagian "{kunci}" harus berupa daftar')
+
+    kode = {}
+    for bagian, field in (('gejala', FIELD_GEJALA), ('kondisi', FIELD_KONDISI)):
+        kode[bagian] = set()
+        for item in data[bagian]:
+            if not item.get('kode'):
+                raise ValueError(f'Setiap {bagian} harus memiliki kode')
+            if item['kode'] in kode[bagian]:
+                raise ValueError(f'Kode {bagian} ganda: {item["kode"]}')
+            kosong = [nama for nama in field if not item.get(nama)]
+            if kosong:
+                raise ValueError(f'{bagian} {item["kode"]} belum memiliki {", ".join(kosong)}')
+            kode[bagian].add(item['kode'])
+
+    kelompok = set()
+    for aturan in data['aturan']:
+        nama = aturan.get('kelompok')
+        if not nama or not aturan.get('gejala'):
+            raise ValueError('Setiap aturan harus memiliki kelompok dan daftar gejala')
+        if (nama, aturan.get('kondisi')) in kelompok:
+            raise ValueError(f'Kelompok aturan {nama} untuk {aturan.get("kondisi")} ditulis dua kali')
+        kelompok.add((nama, aturan.get('kondisi')))
+        if aturan.get('kondisi') not in kode['kondisi']:
+            raise ValueError(f'Aturan {nama} merujuk kondisi tidak dikenal: {aturan.get("kondisi")}')
+        tidak_dikenal = sorted(set(aturan['gejala']) - kode['gejala'])
+        if tidak_dikenal:
+            raise ValueError(f'Aturan {nama} merujuk gejala tidak dikenal: {", ".join(tidak_dikenal)}')
+
+
+def _selisih_entitas(model, field_pk, field_map, item_list):
+    """
+    Bandingkan entitas berkode (Gejala/Kondisi) dengan database
+
+    Returns:
+        dict 'tambah' (objek baru), 'ubah' (objek dengan nilai baru), 'hapus' (kode)
+    """
+    lama = {obj.pk: obj for obj in model.objects.all()}
+    tambah, ubah = [], []
+    for item in item_list:
+        nilai = {field: item[kunci] for kunci, field in field_map.items()}
+        obj = lama.pop(item['kode'], None)
+        if obj is None:
+            tambah.append(model(**{field_pk: item['kode']}, **nilai))
+        elif any(getattr(obj, field) != isi for field, isi in nilai.items()):
+            for field, isi in nilai.items():
+                setattr(obj, field, isi)
+            ubah.append(obj)
+    return {'tambah': tambah, 'ubah': ubah, 'hapus': sorted(lama)}
+
+
+def _selisih_aturan(aturan_list):
+    lama = {
+        (obj.kodeKelompokAturan, obj.kondisi_id, obj.gejala_id): obj
+        for obj in Aturan.objects.all()
+    }
+    tambah, ubah = [], []
+    for aturan in aturan_list:
+        keterangan = aturan.get('keterangan') or None
+        for kode_gejala in dict.fromkeys(aturan['gejala']):
+            kunci = (aturan['kelompok'], aturan['kondisi'], kode_gejala)
+            obj = lama.pop(kunci, None)
+            if obj is None:
+                tambah.append(Aturan(
+                    kodeKelompokAturan=aturan['kelompok'], kondisi_id=aturan['kondisi'],
+                    gejala_id=kode_gejala, keterangan=keterangan,
+                ))
+            elif (obj.keterangan or None) != keterangan:
+                obj.keterangan = keterangan
+                ubah.append(obj)
+    return {'tambah': tambah, 'ubah': ubah, 'hapus': [obj.pk for obj in lama.values()]}
+
+
+def hitung_selisih(data):
+    """
+    Rencana perubahan untuk menyamakan database dengan isi berkas
+
+    Returns:
+        dict 'gejala', 'kondisi', 'aturan' -> hasil selisih, ditambah
+        'konsultasi_terdampak': jumlah Konsultasi yang hasilKondisi-nya akan
+        dikosongkan karena kondisinya dihapus
+    """
+    selisih = {
+        'gejala': _selisih_entitas(Gejala, 'kodeGejala', FIELD_GEJALA, data['gejala']),
+        'kondisi': _selisih_entitas(Kondisi, 'kodeKondisi', FIELD_KONDISI, data['kondisi']),
+        'aturan': _selisih_aturan(data['aturan']),
+    }
+    hapus_kondisi = selisih['kondisi']['hapus']
+    selisih['konsultasi_terdampak'] = (
+        Konsultasi.objects.filter(hasilKondisi_id__in=hapus_kondisi).count() if hapus_kondisi else 0
+    )
+    return selisih
+
+
+def ada_perubahan(selisih):
+    return any(selisih[bagian][jenis] for bagian in ('gejala', 'kondisi', 'aturan') for jenis in ('tambah', 'ubah', 'hapus'))
+
+
+def ringkasan(selisih):
+    """
+    Ringkasan jumlah perubahan per bagian, misal {'gejala': (2, 1, 0), ...} (tambah, ubah, hapus)
+    """
+    return {
+        bagian: tuple(len(selisih[bagian][jenis]) for jenis in ('tambah', 'ubah', 'hapus'))
+        for bagian in ('gejala', 'kondisi', 'aturan')
+    }
+
+
+def terapkan_selisih(selisih):
+    """
+    Terapkan rencana hitung_selisih() dalam satu transaksi
+
+    Urutan: hapus aturan dahulu (agar tidak ikut terhapus berantai dua kali),
+    lalu gejala/kondisi; tambah dan ubah gejala/kondisi sebelum aturan baru
+    yang merujuknya. Versi basis pengetahuan naik tepat sekali, dan tidak naik
+    sama sekali bila tidak ada perubahan.
+    """
+    if not ada_perubahan(selisih):
+        return
+    with transaction.atomic(), perubahan_massal():
+        Aturan.objects.filter(pk__in=selisih['aturan']['hapus']).delete()
+        Gejala.objects.filter(pk__in=selisih['gejala']['hapus']).delete()
+        Kondisi.objects.filter(pk__in=selisih['kondisi']['hapus']).delete()
+
+        for model, bagian, field_map in ((Gejala, 'gejala', FIELD_GEJALA), (Kondisi, 'kondisi', FIELD_KONDISI)):
+            if selisih[bagian]['tambah']:
+                model.objects.bulk_create(selisih[bagian]['tambah'])
+            if selisih[bagian]['ubah']:
+                model.objects.bulk_update(selisih[bagian]['ubah'], list(field_map.values()))
+
+        if selisih['aturan']['tambah']:
+            Aturan.objects.bulk_create(selisih['aturan']['tambah'])
+        if selisih['aturan']['ubah']:
+            Aturan.objects.bulk_update(selisih['aturan']['ubah'], ['keterangan'])
+
+        # bulk_create tidak memicu sinyal rekap dasbor; penghapusan sudah lewat sinyal
+        catat_objek_baru(selisih['gejala']['tambah'] + selisih['kondisi']['tambah'] + selisih['aturan']['tambah'])
+
+
+def muat_basis_pengetahuan(path=BERKAS_DEFAULT, simpan=True):
+    """
+    Baca berkas, hitung selisih dan (bila simpan) terapkan
+
+    Returns:
+        Tuple (data berkas, selisih)
+    """
+    data = baca_berkas(path)
+    # Selisih dihitung dan diterapkan dalam transaksi yang sama agar tidak menimpa perubahan lain di antaranya
+    with transaction.atomic():
+        selisih = hitung_selisih(data)
+        if simpan:
+            terapkan_selisih(selisih)
+    return data, selisih
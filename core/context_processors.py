@@ -1,13 +1,7 @@
-from .models import Notifikasi
-from django.utils import timezone
+from .utils import hitung_notifikasi_belum_dibaca
 
 def notifikasi_processor(request):
     pasien_id = request.session.get('pasien_id')
     if pasien_id:
-        count = Notifikasi.objects.filter(
-            pasien_id=pasien_id,
-            sudahTerkirim=False,
-            jadwalNotifikasi__lte=timezone.now()
-        ).count()
-        return {'notif_count': count}
-    return {'notif_count': 0}
\ No newline at end of file
+        return {'notif_count': hitung_notifikasi_belum_dibaca(pasien_id)}
+    return {'notif_count': 0}
@@ -0,0 +1,175 @@
+"""
+Diagnosa Ulang Inkremental Setelah Perubahan Aturan
+
+Konsultasi lama dievaluasi ulang terhadap basis pengetahuan saat ini dan
+hasilnya ditulis ke kolom hasilEvaluasiUlang; hasilKondisi tetap berisi
+diagnosa asli. snapshotEvaluasiUlang mencatat snapshot yang dipakai.
+
+Pembanding tiap konsultasi adalah snapshot evaluasi terakhirnya (atau
+snapshot saat diagnosa bila belum pernah dievaluasi ulang). Kelompok aturan
+snapshot pembanding dibandingkan dengan indeks saat ini, dan hanya
+konsultasi yang gejalanya beririsan dengan kelompok yang berubah yang
+dievaluasi ulang; sisanya cukup ditandai dengan satu UPDATE. Konsultasi
+tanpa snapshot (sebelum snapshot ada) selalu dievaluasi.
+
+Konsultasi yang terdampak dikelompokkan per himpunan gejala, sehingga
+setiap himpunan gejala yang berbeda dicocokkan satu kali saja.
+"""
+from collections import Counter, defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .mesin_inferensi import dapatkan_indeks, indeks_snapshot
+from .models import DetailKonsultasi, Konsultasi
+
+UKURAN_CHUNK = 500
+
+
+def berbeda_dari_diagnosa_awal():
+    """
+    Filter konsultasi yang hasil evaluasi ulangnya berbeda dari hasilKondisi
+    """
+    return Q(snapshotEvaluasiUlang__isnull=False) & (
+        Q(hasilKondisi__isnull=True, hasilEvaluasiUlang__isnull=False)
+        | Q(hasilKondisi__isnull=False, hasilEvaluasiUlang__isnull=True)
+        | (Q(hasilKondisi__isnull=False, hasilEvaluasiUlang__isnull=False) & ~Q(hasilEvaluasiUlang=F('hasilKondisi')))
+    )
+
+
+def gejala_berubah(snapshot_lama_id, indeks):
+    """
+    Kode gejala dari kelompok aturan yang berbeda antara snapshot lama dan indeks
+
+    Kelompok yang ditambah, dihapus atau diubah gejalanya dihitung sebagai
+    berubah; gejala versi lama dan baru sama-sama disertakan.
+
+    Returns:
+        Set kode gejala, atau None bila tidak ada snapshot pembanding (semua dianggap berubah)
+    """
+    if snapshot_lama_id is None:
+        return None
+    if snapshot_lama_id == indeks.snapshot_id:
+        return set()
+    lama = indeks_snapshot(snapshot_lama_id).kelompok
+    berubah = set()
+    for key in lama.keys() | indeks.kelompok.keys():
+        gejala_lama = lama.get(key, frozenset())
+        gejala_baru = indeks.kelompok.get(key, frozenset())
+        if gejala_lama != gejala_baru:
+            berubah |= gejala_lama | gejala_baru
+    return berubah
+
+
+def _partisi_kandidat(snapshot_id):
+    """
+    Kelompokkan konsultasi yang belum dievaluasi terhadap snapshot_id menurut snapshot pembandingnya
+
+    Returns:
+        List (filter Q, id snapshot pembanding, belum pernah dievaluasi ulang)
+    """
+    belum = Q(snapshotEvaluasiUlang__isnull=True)
+    partisi = [
+        (belum & Q(snapshotBasisPengetahuan_id=lama), lama, True)
+        for lama in Konsultasi.objects.filter(belum).order_by()
+        .values_list('snapshotBasisPengetahuan_id', flat=True).distinct()
+    ]
+    partisi += [
+        (Q(snapshotEvaluasiUlang_id=lama), lama, False)
+        for lama in Konsultasi.objects.filter(snapshotEvaluasiUlang__isnull=False)
+        .exclude(snapshotEvaluasiUlang_id=snapshot_id).order_by()
+        .values_list('snapshotEvaluasiUlang_id', flat=True).distinct()
+    ]
+    return partisi
+
+
+def _himpunan_gejala(filter_terdampak):
+    """
+    Kelompokkan konsultasi terdampak per himpunan gejala dengan satu query
+
+    Returns:
+        dict frozenset kode gejala -> list (konsultasi_id, hasilKondisi_id)
+    """
+    baris = (
+        Konsultasi.objects.filter(filter_terdampak).order_by('id')
+        .values_list('id', 'hasilKondisi_id', 'detailkonsultasi__gejala_id')
+    )
+    per_himpunan = defaultdict(list)
+    for (konsultasi_id, hasil_lama), grup in groupby(baris.iterator(chunk_size=2000), key=itemgetter(0, 1)):
+        # Konsultasi tanpa gejala menghasilkan satu baris dengan gejala None (LEFT JOIN)
+        himpunan = frozenset(kode for _, _, kode in grup if kode is not None)
+        per_himpunan[himpunan].append((konsultasi_id, hasil_lama))
+    return per_himpunan
+
+
+def diagnosa_ulang(simpan=True, ukuran_chunk=UKURAN_CHUNK):
+    """
+    Evaluasi ulang konsultasi yang terdampak perubahan aturan sejak evaluasi terakhirnya
+
+    Args:
+        simpan: False untuk hanya menghitung tanpa menulis (dry run)
+        ukuran_chunk: Jumlah id per UPDATE
+
+    Returns:
+        dict dengan kunci snapshot_id, dievaluasi (konsultasi terdampak),
+        himpunan_gejala (jumlah pencocokan), tidak_terdampak, berubah
+        (hasil baru berbeda dari hasilKondisi) dan perubahan (list
+        (kode lama, kode baru, jumlah) urut jumlah terbanyak)
+    """
+    indeks = dapatkan_indeks()
+    filter_terdampak = None
+    tidak_terdampak = []
+    for filter_partisi, snapshot_lama, belum_dievaluasi in _partisi_kandidat(indeks.snapshot_id):
+        berubah = gejala_berubah(snapshot_lama, indeks)
+        if berubah is None:
+            terdampak = filter_partisi
+        elif not berubah:
+            tidak_terdampak.append((filter_partisi, belum_dievaluasi))
+            continue
+        else:
+            punya_gejala_berubah = Q(id__in=DetailKonsultasi.objects.filter(gejala_id__in=berubah).values('konsultasi_id'))
+            terdampak = filter_partisi & punya_gejala_berubah
+            tidak_terdampak.append((filter_partisi & ~punya_gejala_berubah, belum_dievaluasi))
+        filter_terdampak = terdampak if filter_terdampak is None else filter_terdampak | terdampak
+
+    per_himpunan = _himpunan_gejala(filter_terdampak) if filter_terdampak is not None else {}
+
+    id_per_hasil = defaultdict(list)
+    perubahan = Counter()
+    for himpunan, daftar in per_himpunan.items():
+        kondisi = indeks.cocokkan(himpunan)
+        kode_baru = kondisi.pk if kondisi else None
+        for konsultasi_id, kode_lama in daftar:
+            id_per_hasil[kode_baru].append(konsultasi_id)
+            if kode_lama != kode_baru:
+                perubahan[(kode_lama, kode_baru)] += 1
+
+    hasil = {
+        'snapshot_id': indeks.snapshot_id,
+        'dievaluasi': sum(len(daftar) for daftar in per_himpunan.values()),
+        'himpunan_gejala': len(per_himpunan),
+        'tidak_terdampak': 0,
+        'berubah': sum(perubahan.values()),
+        'perubahan': [(lama, baru, jumlah) for (lama, baru), jumlah in perubahan.most_common()],
+    }
+
+    if not simpan:
+        hasil['tidak_terdampak'] = sum(Konsultasi.objects.filter(q).count() for q, _ in tidak_terdampak)
+        return hasil
+
+    with transaction.atomic():
+        for filter_partisi, belum_dievaluasi in tidak_terdampak:
+            # Hasil untuk gejala yang tidak menyentuh kelompok berubah sama dengan hasil sebelumnya
+            nilai = {'snapshotEvaluasiUlang_id': indeks.snapshot_id}
+            if belum_dievaluasi:
+                nilai['hasilEvaluasiUlang'] = F('hasilKondisi')
+            hasil['tidak_terdampak'] += Konsultasi.objects.filter(filter_partisi).update(**nilai)
+
+        for kode_baru, daftar_id in id_per_hasil.items():
+            for awal in range(0, len(daftar_id), ukuran_chunk):
+                Konsultasi.objects.filter(id__in=daftar_id[awal:awal + ukuran_chunk]).update(
+                    hasilEvaluasiUlang_id=kode_baru, snapshotEvaluasiUlang_id=indeks.snapshot_id
+                )
+    return hasil
@@ -0,0 +1,216 @@
+"""
+Ekspor Data Pengukuran dan Konsultasi (CSV/Parquet) dengan Memori Tetap
+
+Baris dibaca dengan values_list().iterator(chunk_size=...) sehingga tidak
+ada objek model dan tidak ada hasil query yang dimuat seluruhnya. Data
+Pasien dan Kondisi ikut diambil lewat JOIN di SQL (pasien__nama,
+hasilKondisi__namaKondisi) sehingga tetap satu query. Keluaran berupa
+generator potongan bytes yang dapat langsung dikirim StreamingHttpResponse
+atau ditulis ke berkas; byte pertama terkirim sebelum query selesai dibaca.
+
+Parquet membutuhkan paket opsional pyarrow. Setiap chunk ditulis sebagai
+satu row group lalu bytes-nya langsung dikeluarkan, sehingga memori tetap
+sebanding dengan ukuran chunk.
+"""
+import csv
+import io
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Konsultasi, PengukuranFisik
+
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+PILIHAN_FORMAT_EKSPOR = (FORMAT_CSV, FORMAT_PARQUET)
+UKURAN_CHUNK_DEFAULT = 2000
+
+# Tipe kolom: 'int', 'tanggal', 'waktu', 'teks', 'angka' (Decimal -> float di Parquet)
+KOLOM_PASIEN = (
+    ('pasien_id', 'pasien_id', 'int'),
+    ('nama_pengguna', 'pasien__namaPengguna', 'teks'),
+    ('nama', 'pasien__nama', 'teks'),
+    ('jenis_kelamin', 'pasien__jenisKelamin', 'teks'),
+    ('tanggal_lahir', 'pasien__tanggalLahir', 'tanggal'),
+)
+
+# dataset -> (model, field tanggal untuk filter rentang, kolom (judul, field, tipe))
+DATASET = {
+    'pengukuran': (PengukuranFisik, 'tanggalUkur', (
+        ('id', 'id', 'int'),
+        ('tanggal_ukur', 'tanggalUkur', 'tanggal'),
+        *KOLOM_PASIEN,
+        ('berat_badan', 'beratBadan', 'angka'),
+        ('tinggi_badan', 'tinggiBadan', 'angka'),
+        ('lingkar_kepala', 'lingkarKepala', 'angka'),
+        ('lingkar_lengan', 'lingkarLengan', 'angka'),
+        ('imunisasi', 'imunisasi', 'teks'),
+        ('z_bb_u', 'skor_Z_BB_U', 'angka'),
+        ('z_tb_u', 'skor_Z_TB_U', 'angka'),
+        ('z_bb_tb', 'skor_Z_BB_TB', 'angka'),
+        ('z_imt_u', 'skor_Z_IMT_U', 'angka'),
+        ('z_lk_u', 'skor_Z_LK_U', 'angka'),
+        ('z_lla_u', 'skor_Z_LLA_U', 'angka'),
+    )),
+    'konsultasi': (Konsultasi, 'tanggalKonsultasi__date', (
+        ('id', 'id', 'int'),
+        ('tanggal_konsultasi', 'tanggalKonsultasi', 'waktu'),
+        *KOLOM_PASIEN,
+        ('kode_kondisi', 'hasilKondisi_id', 'teks'),
+        ('nama_kondisi', 'hasilKondisi__namaKondisi', 'teks'),
+    )),
+}
+
+# Filter kondisi: '-' berarti tidak terdiagnosis
+TANPA_KONDISI = '-'
+
+
+def queryset_ekspor(dataset, dari=None, sampai=None, jenis_kelamin=None, kondisi=None):
+    """
+    Bangun queryset values_list satu dataset dengan filter
+
+    Args:
+        dataset: Kunci DATASET
+        dari, sampai: Rentang tanggal (inklusif)
+        jenis_kelamin: 'L' atau 'P'
+        kondisi: kodeKondisi hasil diagnosa, atau TANPA_KONDISI. Untuk pengukuran,
+            anak yang pernah didiagnosis dengan kondisi tersebut.
+
+    Returns:
+        QuerySet values_list urut id
+    """
+    model, field_tanggal, kolom = DATASET[dataset]
+    queryset = model.objects.all()
+    if dari:
+        queryset = queryset.filter(**{f'{field_tanggal}__gte': dari})
+    if sampai:
+        queryset = queryset.filter(**{f'{field_tanggal}__lte': sampai})
+    if jenis_kelamin:
+        queryset = queryset.filter(pasien__jenisKelamin=jenis_kelamin)
+    if kondisi:
+        filter_kondisi = Q(hasilKondisi__isnull=True) if kondisi == TANPA_KONDISI else Q(hasilKondisi_id=kondisi)
+        if model is Konsultasi:
+            queryset = queryset.filter(filter_kondisi)
+        else:
+            queryset = queryset.filter(pasien_id__in=Konsultasi.objects.filter(filter_kondisi).values('pasien_id'))
+    return queryset.order_by('id').values_list(*(field for _, field, _ in kolom))
+
+
+def _nilai_csv(nilai):
+    if nilai is None:
+        return ''
+    if isinstance(nilai, datetime):
+        return timezone.localtime(nilai).isoformat(timespec='seconds')
+    return nilai
+
+
+def _chunk_baris(queryset, ukuran_chunk):
+    chunk = []
+    for baris in queryset.iterator(chunk_size=ukuran_chunk):
+        chunk.append(baris)
+        if len(chunk) >= ukuran_chunk:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def alirkan_csv(dataset, queryset, ukuran_chunk=UKURAN_CHUNK_DEFAULT):
+    """
+    Generator bytes CSV: judul kolom, lalu satu potongan per chunk baris
+    """
+    _, _, kolom = DATASET[dataset]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([judul for judul, _, _ in kolom])
+    # BOM agar Excel membaca UTF-8 dengan benar
+    yield '\ufeff'.encode('utf-8') + buffer.getvalue().encode('utf-8')
+    for chunk in _chunk_baris(queryset, ukuran_chunk):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_nilai_csv(nilai) for nilai in baris] for baris in chunk)
+        yield buffer.getvalue().encode('utf-8')
+
+
+class _PenampungAliran(io.RawIOBase):
+    """
+    Sink tulis untuk ParquetWriter yang dapat dikosongkan per row group
+
+    tell() mengembalikan total byte yang pernah ditulis (bukan isi penampung
+    saat ini) karena ParquetWriter mencatat offset row group ke footer.
+    """
+    def __init__(self):
+        super().__init__()
+        self.potongan = []
+        self.total = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.potongan.append(bytes(data))
+        self.total += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.total
+
+    def ambil(self):
+        data = b''.join(self.potongan)
+        self.potongan = []
+        return data
+
+
+def _skema_parquet(pa, kolom):
+    tipe = {
+        'int': pa.int64(),
+        'tanggal': pa.date32(),
+        'waktu': pa.timestamp('us', tz='UTC'),
+        'teks': pa.string(),
+        'angka': pa.float64(),
+    }
+    return pa.schema([(judul, tipe[jenis]) for judul, _, jenis in kolom])
+
+
+def alirkan_parquet(dataset, queryset, ukuran_chunk=UKURAN_CHUNK_DEFAULT):
+    """
+    Generator bytes Parquet: satu row group per chunk, footer di akhir
+
+    Raises:
+        ValueError: Jika pyarrow tidak terpasang (dilempar saat dipanggil, bukan saat iterasi)
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError('Ekspor Parquet membutuhkan paket pyarrow; gunakan format CSV atau pasang pyarrow')
+
+    _, _, kolom = DATASET[dataset]
+    skema = _skema_parquet(pa, kolom)
+    angka = [i for i, (_, _, jenis) in enumerate(kolom) if jenis == 'angka']
+
+    def generator():
+        sink = _PenampungAliran()
+        writer = pq.ParquetWriter(sink, skema)
+        for chunk in _chunk_baris(queryset, ukuran_chunk):
+            kolom_nilai = [list(nilai) for nilai in zip(*chunk)]
+            for i in angka:
+                kolom_nilai[i] = [None if v is None else float(v) for v in kolom_nilai[i]]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(nilai, type=field.type) for nilai, field in zip(kolom_nilai, skema)], schema=skema
+            ))
+            yield sink.ambil()
+        writer.close()
+        yield sink.ambil()
+
+    return generator()
+
+
+def alirkan_ekspor(dataset, queryset, format_keluaran=FORMAT_CSV, ukuran_chunk=UKURAN_CHUNK_DEFAULT):
+    """
+    Generator bytes ekspor dalam format yang diminta
+    """
+    if format_keluaran == FORMAT_PARQUET:
+        return alirkan_parquet(dataset, queryset, ukuran_chunk)
+    return alirkan_csv(dataset, queryset, ukuran_chunk)
@@ -0,0 +1,406 @@
+"""
+Impor Massal Pengukuran dari Buku Register Posyandu (CSV/XLSX)
+
+Baris berkas dibaca satu per satu (tidak dimuat sekaligus ke memori) lalu
+diproses per chunk:
+
+    1. Pencocokan anak memakai satu dict yang dimuat sekali di awal:
+       nama pengguna, atau nama + tanggal lahir.
+    2. Validasi per baris (tanggal, angka, umur, duplikat).
+    3. Z-score seluruh chunk dihitung sebagai array (hitung_semua_zscore).
+    4. Satu bulk_create per chunk dalam transaksi.
+
+Baris yang gagal ditulis ke laporan kesalahan CSV (nomor baris, pesan, isi
+asli) yang dapat diunduh dan diperbaiki lalu diimpor ulang. Laporan yang lebih
+tua dari settings.IMPOR_LAPORAN_MAX_AGE dibuang pada impor berikutnya.
+
+Format XLSX membutuhkan paket opsional openpyxl.
+"""
+import csv
+import io
+import os
+import time
+import uuid
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import Pasien, PengukuranFisik
+from .standar_pertumbuhan import hitung_semua_zscore
+from .statistik import catat_objek_baru
+from .utils import KOLOM_ZSCORE, indikator_tidak_wajar, zscore_ke_desimal
+
+# Kolom yang dikenali (judul kolom tidak peka huruf besar/kecil, spasi = garis bawah)
+KOLOM_IMPOR = (
+    'nama_pengguna', 'nama', 'tanggal_lahir', 'tanggal_ukur',
+    'berat_badan', 'tinggi_badan', 'lingkar_kepala', 'lingkar_lengan', 'imunisasi',
+)
+FORMAT_TANGGAL = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+UKURAN_CHUNK_DEFAULT = 1000
+UMUR_LAPORAN_MAKS_DEFAULT = 7 * 24 * 60 * 60
+# Batas DecimalField(max_digits=5, decimal_places=2)
+NILAI_MAKS = Decimal('999.99')
+UMUR_MAKS_HARI = 20 * 366
+# Penanda nama + tanggal lahir yang dimiliki lebih dari satu pasien
+AMBIGU = object()
+
+
+def direktori_laporan():
+    return str(getattr(settings, 'IMPOR_LAPORAN_DIR', os.path.join(settings.BASE_DIR, 'cache', 'impor')))
+
+
+def umur_maks_laporan():
+    return getattr(settings, 'IMPOR_LAPORAN_MAX_AGE', UMUR_LAPORAN_MAKS_DEFAULT)
+
+
+def _judul_kolom(nilai):
+    return str(nilai or '').strip().lower().replace(' ', '_')
+
+
+def baca_csv(berkas):
+    """
+    Baca baris CSV dari berkas biner secara bertahap
+
+    Yields:
+        Tuple (nomor baris di berkas, dict kolom -> nilai)
+    """
+    reader = csv.reader(io.TextIOWrapper(berkas, encoding='utf-8-sig', newline=''))
+    try:
+        judul = [_judul_kolom(nilai) for nilai in next(reader, [])]
+        for nomor, nilai in enumerate(reader, start=2):
+            if any(nilai):
+                yield nomor, dict(zip(judul, nilai))
+    except csv.Error as e:
+        raise ValueError(f'Berkas CSV tidak dapat dibaca (baris {reader.line_num}): {e}')
+
+
+def baca_xlsx(berkas):
+    """
+    Baca baris lembar pertama XLSX secara bertahap (mode read_only openpyxl)
+
+    Yields:
+        Tuple (nomor baris di lembar, dict kolom -> nilai sel)
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError('Impor XLSX membutuhkan paket openpyxl; simpan berkas sebagai CSV atau pasang openpyxl')
+
+    try:
+        workbook = load_workbook(berkas, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, KeyError):
+        raise ValueError('Berkas XLSX rusak atau bukan berkas Excel; simpan ulang dari Excel atau sebagai CSV')
+    try:
+        baris_iter = workbook.worksheets[0].iter_rows(values_only=True)
+        judul = [_judul_kolom(nilai) for nilai in next(baris_iter, ())]
+        for nomor, nilai in enumerate(baris_iter, start=2):
+            if any(sel not in (None, '') for sel in nilai):
+                yield nomor, dict(zip(judul, nilai))
+    except zipfile.BadZipFile:
+        raise ValueError('Berkas XLSX rusak atau bukan berkas Excel; simpan ulang dari Excel atau sebagai CSV')
+    finally:
+        workbook.close()
+
+
+def baca_berkas(berkas, nama_berkas):
+    """
+    Pilih pembaca berdasarkan ekstensi nama berkas (.csv atau .xlsx)
+    """
+    ekstensi = os.path.splitext(nama_berkas)[1].lower()
+    if ekstensi == '.csv':
+        return baca_csv(berkas)
+    if ekstensi == '.xlsx':
+        return baca_xlsx(berkas)
+    raise ValueError('Format berkas harus .csv atau .xlsx')
+
+
+def _kunci_nama(nama, tanggal_lahir):
+    return ' '.join(str(nama).split()).casefold(), tanggal_lahir
+
+
+def muat_indeks_pasien():
+    """
+    Muat seluruh pasien sekali sebagai dict pencocokan
+
+    Returns:
+        Tuple (per nama pengguna, per (nama, tanggal lahir)); nilai berupa
+        tuple (id, tanggalLahir, jenisKelamin) atau AMBIGU
+    """
+    per_pengguna, per_nama = {}, {}
+    for pasien in Pasien.objects.values_list('id', 'namaPengguna', 'nama', 'tanggalLahir', 'jenisKelamin'):
+        pk, nama_pengguna, nama, tanggal_lahir, jenis_kelamin = pasien
+        info = (pk, tanggal_lahir, jenis_kelamin)
+        per_pengguna[nama_pengguna.lower()] = info
+        kunci = _kunci_nama(nama, tanggal_lahir)
+        per_nama[kunci] = AMBIGU if kunci in per_nama else info
+    return per_pengguna, per_nama
+
+
+def _parse_tanggal(nilai, kolom):
+    if isinstance(nilai, datetime):
+        return nilai.date()
+    if isinstance(nilai, date):
+        return nilai
+    teks = str(nilai or '').strip()
+    if not teks:
+        raise ValueError(f'{kolom} wajib diisi')
+    for format_tanggal in FORMAT_TANGGAL:
+        try:
+            return datetime.strptime(teks, format_tanggal).date()
+        except ValueError:
+            pass
+    raise ValueError(f'{kolom} "{teks}" bukan tanggal (YYYY-MM-DD atau DD/MM/YYYY)')
+
+
+def _parse_angka(nilai, kolom, wajib):
+    teks = str(nilai if nilai is not None else '').strip().replace(',', '.')
+    if not teks:
+        if wajib:
+            raise ValueError(f'{kolom} wajib diisi')
+        return None
+    try:
+        angka = Decimal(teks).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(f'{kolom} "{teks}" bukan angka')
+    if not Decimal('0') < angka <= NILAI_MAKS:
+        raise ValueError(f'{kolom} {angka} di luar rentang 0-{NILAI_MAKS}')
+    return angka
+
+
+def validasi_baris(data, indeks_pasien):
+    """
+    Cocokkan anak dan ubah satu baris menjadi nilai field PengukuranFisik
+
+    Returns:
+        Tuple (info pasien, dict field)
+
+    Raises:
+        ValueError: Pesan kesalahan untuk laporan
+    """
+    per_pengguna, per_nama = indeks_pasien
+    nama_pengguna = str(data.get('nama_pengguna') or '').strip().lower()
+    if nama_pengguna:
+        info = per_pengguna.get(nama_pengguna)
+        if info is None:
+            raise ValueError(f'Nama pengguna "{nama_pengguna}" tidak ditemukan')
+    else:
+        nama = str(data.get('nama') or '').strip()
+        if not nama or not data.get('tanggal_lahir'):
+            raise ValueError('Isi nama_pengguna, atau nama dan tanggal_lahir')
+        info = per_nama.get(_kunci_nama(nama, _parse_tanggal(data['tanggal_lahir'], 'tanggal_lahir')))
+        if info is None:
+            raise ValueError(f'Anak "{nama}" dengan tanggal lahir tersebut tidak ditemukan')
+        if info is AMBIGU:
+            raise ValueError(f'Lebih dari satu anak bernama "{nama}" dengan tanggal lahir sama; gunakan nama_pengguna')
+
+    tanggal_ukur = _parse_tanggal(data.get('tanggal_ukur'), 'tanggal_ukur')
+    umur_hari = (tanggal_ukur - info[1]).days
+    if umur_hari < 0:
+        raise ValueError('Tanggal ukur sebelum tanggal lahir anak')
+    if umur_hari > UMUR_MAKS_HARI:
+        raise ValueError('Usia anak pada tanggal ukur terlalu besar')
+    if tanggal_ukur > date.today():
+        raise ValueError('Tanggal ukur di masa depan')
+
+    return info, {
+        'tanggalUkur': tanggal_ukur,
+        'beratBadan': _parse_angka(data.get('berat_badan'), 'berat_badan', wajib=True),
+        'tinggiBadan': _parse_angka(data.get('tinggi_badan'), 'tinggi_badan', wajib=True),
+        'lingkarKepala': _parse_angka(data.get('lingkar_kepala'), 'lingkar_kepala', wajib=False),
+        'lingkarLengan': _parse_angka(data.get('lingkar_lengan'), 'lingkar_lengan', wajib=False),
+        'imunisasi': str(data.get('imunisasi') or '').strip()[:100] or None,
+    }
+
+
+def _float_atau_nan(nilai):
+    return np.nan if nilai is None else float(nilai)
+
+
+def _hitung_zscore_chunk(valid):
+    """
+    Hitung z-score seluruh baris valid satu chunk sekaligus
+
+    Returns:
+        dict indikator -> array z-score
+    """
+    info = [item[1] for item in valid]
+    field = [item[2] for item in valid]
+    umur_hari = np.array([(f['tanggalUkur'] - i[1]).days for i, f in zip(info, field)], dtype=np.int64)
+    return hitung_semua_zscore(
+        np.array([i[2] for i in info]),
+        umur_hari,
+        np.array([float(f['beratBadan']) for f in field]),
+        np.array([float(f['tinggiBadan']) for f in field]),
+        np.array([_float_atau_nan(f['lingkarKepala']) for f in field]),
+        np.array([_float_atau_nan(f['lingkarLengan']) for f in field]),
+    )
+
+
+class LaporanKesalahan:
+    """
+    Penulis laporan kesalahan CSV: baris, pesan, lalu kolom asli berkas impor
+    """
+    def __init__(self, berkas):
+        self.writer = csv.writer(berkas) if berkas is not None else None
+        self.jumlah = 0
+        self.contoh = []
+        if self.writer:
+            self.writer.writerow(['baris', 'kesalahan', *KOLOM_IMPOR])
+
+    def catat(self, nomor, pesan, data, batas_contoh=20):
+        self.jumlah += 1
+        if len(self.contoh) < batas_contoh:
+            self.contoh.append({'baris': nomor, 'kesalahan': pesan})
+        if self.writer:
+            self.writer.writerow([nomor, pesan, *('' if data.get(k) is None else data.get(k) for k in KOLOM_IMPOR)])
+
+
+def _proses_chunk(chunk, indeks_pasien, laporan, sudah_ada, simpan):
+    """
+    Validasi, hitung z-score dan simpan satu chunk baris
+
+    Returns:
+        Jumlah pengukuran yang diimpor
+    """
+    valid = []
+    for nomor, data in chunk:
+        try:
+            info, field = validasi_baris(data, indeks_pasien)
+        except ValueError as e:
+            laporan.catat(nomor, str(e), data)
+            continue
+        valid.append((nomor, info, field, data))
+    if not valid:
+        return 0
+
+    # Satu query untuk pengukuran yang sudah tersimpan pada pasien dan tanggal chunk ini
+    sudah_ada |= set(PengukuranFisik.objects.filter(
+        pasien_id__in={item[1][0] for item in valid},
+        tanggalUkur__in={item[2]['tanggalUkur'] for item in valid},
+    ).order_by().values_list('pasien_id', 'tanggalUkur'))
+
+    skor = _hitung_zscore_chunk(valid)
+
+    objek_baru = []
+    for i, (nomor, info, field, data) in enumerate(valid):
+        kunci = (info[0], field['tanggalUkur'])
+        if kunci in sudah_ada:
+            laporan.catat(nomor, 'Pengukuran anak ini pada tanggal tersebut sudah ada', data)
+            continue
+        tidak_wajar = indikator_tidak_wajar({indikator: nilai[i] for indikator, nilai in skor.items()})
+        if tidak_wajar:
+            laporan.catat(nomor, f'Z-score tidak wajar ({", ".join(tidak_wajar)}); periksa satuan berat/tinggi', data)
+            continue
+        sudah_ada.add(kunci)
+        objek_baru.append(PengukuranFisik(
+            pasien_id=info[0],
+            **field,
+            **{kolom: zscore_ke_desimal(indikator, float(skor[indikator][i])) for indikator, kolom in KOLOM_ZSCORE.items()},
+        ))
+
+    if simpan and objek_baru:
+        with transaction.atomic():
+            PengukuranFisik.objects.bulk_create(objek_baru)
+            # bulk_create tidak memicu sinyal rekap dasbor
+            catat_objek_baru(objek_baru)
+    return len(objek_baru)
+
+
+def impor_pengukuran(baris_iter, berkas_kesalahan=None, ukuran_chunk=UKURAN_CHUNK_DEFAULT, simpan=True):
+    """
+    Impor pengukuran dari iterator baris (hasil baca_berkas)
+
+    Args:
+        baris_iter: Iterator tuple (nomor baris, dict kolom -> nilai)
+        berkas_kesalahan: Berkas teks untuk laporan kesalahan CSV (opsional)
+        ukuran_chunk: Jumlah baris per validasi/bulk_create
+        simpan: False untuk hanya memvalidasi (dry run)
+
+    Returns:
+        dict 'dibaca', 'diimpor', 'gagal', 'contoh_kesalahan' (maksimal 20 pertama)
+    """
+    indeks_pasien = muat_indeks_pasien()
+    laporan = LaporanKesalahan(berkas_kesalahan)
+    sudah_ada = set()
+    dibaca = diimpor = 0
+    chunk = []
+    for baris in baris_iter:
+        dibaca += 1
+        chunk.append(baris)
+        if len(chunk) >= ukuran_chunk:
+            diimpor += _proses_chunk(chunk, indeks_pasien, laporan, sudah_ada, simpan)
+            chunk = []
+    if chunk:
+        diimpor += _proses_chunk(chunk, indeks_pasien, laporan, sudah_ada, simpan)
+    return {'dibaca': dibaca, 'diimpor': diimpor, 'gagal': laporan.jumlah, 'contoh_kesalahan': laporan.contoh}
+
+
+def path_laporan(token):
+    """
+    Path laporan kesalahan untuk token hex; None jika token tidak sah
+    """
+    try:
+        token = uuid.UUID(hex=token).hex
+    except (TypeError, ValueError):
+        return None
+    return os.path.join(direktori_laporan(), f'{token}.csv')
+
+
+def impor_dengan_laporan(berkas, nama_berkas, ukuran_chunk=UKURAN_CHUNK_DEFAULT, simpan=True):
+    """
+    Impor berkas unggahan dan simpan laporan kesalahan ke direktori laporan
+
+    Returns:
+        dict hasil impor_pengukuran() ditambah 'token_laporan' (None jika tidak ada kesalahan)
+    """
+    os.makedirs(direktori_laporan(), exist_ok=True)
+    bersihkan_laporan()
+    token = uuid.uuid4().hex
+    path = path_laporan(token)
+    try:
+        with open(path, 'w', newline='', encoding='utf-8') as berkas_kesalahan:
+            hasil = impor_pengukuran(baca_berkas(berkas, nama_berkas), berkas_kesalahan, ukuran_chunk, simpan)
+    except Exception:
+        os.remove(path)
+        raise
+    if hasil['gagal']:
+        hasil['token_laporan'] = token
+    else:
+        os.remove(path)
+        hasil['token_laporan'] = None
+    return hasil
+
+
+def bersihkan_laporan(batas_detik=None):
+    """
+    Buang laporan kesalahan yang dibuat lebih lama dari batas umur
+
+    Args:
+        batas_detik: Umur maksimal laporan; default settings.IMPOR_LAPORAN_MAX_AGE
+
+    Returns:
+        Jumlah berkas yang dihapus
+    """
+    batas_detik = umur_maks_laporan() if batas_detik is None else batas_detik
+    batas_waktu = time.time() - batas_detik
+    try:
+        berkas = [
+            entry for entry in os.scandir(direktori_laporan())
+            if entry.is_file() and entry.name.endswith('.csv')
+        ]
+    except FileNotFoundError:
+        return 0
+
+    dihapus = 0
+    for entry in berkas:
+        try:
+            if entry.stat().st_mtime < batas_waktu:
+                os.unlink(entry.path)
+                dihapus += 1
+        except FileNotFoundError:
+            continue
+    return dihapus
@@ -0,0 +1,121 @@
+"""
+Kurva Referensi WHO untuk Grafik Pertumbuhan
+
+Garis -3, -2, 0, +2 dan +3 SD sama untuk setiap anak berjenis kelamin sama,
+sehingga dihitung sekali dari tabel LMS (`manage.py build_growth_references`)
+dan disimpan sebagai berkas JSON statis di core/static/core/referensi/.
+Nama berkas memuat hash tabel sumbernya, misal `bb_u_L.3f9a1c2b7d10.json`:
+isi berkas dengan nama yang sama tidak pernah berubah, sehingga server web
+boleh menyajikannya dengan `Cache-Control: max-age=31536000, immutable`.
+
+Titik kurva berjarak satu bulan (1 bulan = 30.4375 hari) dari 0 sampai 60 bulan;
+titik 60 bulan (1826.25 hari) dibatasi pada akhir tabel WHO (1826 hari).
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+from django.templatetags.static import static
+
+from .standar_pertumbuhan import DIREKTORI_TABEL, INDIKATOR, JENIS_KELAMIN, _nilai_sd, indeks_jenis_kelamin, muat_tabel
+
+DIREKTORI_KURVA = os.path.join(os.path.dirname(__file__), 'static', 'core', 'referensi')
+
+# Indikator berindeks umur; BB/PB dan BB/TB berindeks panjang badan sehingga tidak digambar per umur
+INDIKATOR_UMUR = ('bb_u', 'tb_u', 'imt_u', 'lk_u', 'lla_u')
+GARIS_SD = (-3, -2, 0, 2, 3)
+HARI_PER_BULAN = 30.4375
+UMUR_BULAN = np.arange(0, 61)
+# Naikkan bila cara menghitung kurva berubah agar nama berkas (dan cache browser) ikut berganti
+VERSI_KURVA = 2
+
+
+@lru_cache(maxsize=None)
+def versi_tabel(indikator):
+    """
+    Hash isi tabel LMS sumber dan VERSI_KURVA; berubah bila tabel WHO atau perhitungan kurva diganti
+    """
+    nama_berkas, _ = INDIKATOR[indikator]
+    with open(os.path.join(DIREKTORI_TABEL, f'{nama_berkas}.csv'), 'rb') as f:
+        return hashlib.sha256(f'{VERSI_KURVA}:'.encode() + f.read()).hexdigest()[:12]
+
+
+def nama_berkas_kurva(indikator, jenis_kelamin):
+    return f'{indikator}_{jenis_kelamin}.{versi_tabel(indikator)}.json'
+
+
+def url_kurva(indikator, jenis_kelamin):
+    """
+    URL statis berkas kurva referensi untuk dipakai di template
+    """
+    return static(f'core/referensi/{nama_berkas_kurva(indikator, jenis_kelamin)}')
+
+
+def hitung_kurva(indikator, jenis_kelamin):
+    """
+    Hitung garis SD referensi satu indikator dan jenis kelamin
+
+    Returns:
+        dict {'indikator', 'jenis_kelamin', 'versi', 'umur_bulan': [...],
+        'sd': {'-3': [...], ..., '3': [...]}}; nilai None di luar jangkauan tabel
+    """
+    tabel = muat_tabel(indikator)
+    umur_hari = np.minimum(UMUR_BULAN * HARI_PER_BULAN, tabel.x_maks)
+    L, M, S = tabel.lms(indeks_jenis_kelamin(jenis_kelamin), umur_hari)
+    sd = {}
+    for k in GARIS_SD:
+        nilai = _nilai_sd(L, M, S, k)
+        sd[str(k)] = [None if np.isnan(v) else round(float(v), 2) for v in nilai]
+    return {
+        'indikator': indikator,
+        'jenis_kelamin': jenis_kelamin,
+        'versi': versi_tabel(indikator),
+        'umur_bulan': UMUR_BULAN.tolist(),
+        'sd': sd,
+    }
+
+
+def isi_berkas_kurva(indikator, jenis_kelamin):
+    return json.dumps(hitung_kurva(indikator, jenis_kelamin), separators=(',', ':'))
+
+
+def tulis_semua_kurva(direktori=DIREKTORI_KURVA):
+    """
+    Tulis berkas kurva seluruh indikator umur dan hapus versi lama
+
+    Returns:
+        List nama berkas yang ditulis
+    """
+    os.makedirs(direktori, exist_ok=True)
+    ditulis = []
+    for indikator in INDIKATOR_UMUR:
+        for jenis_kelamin in JENIS_KELAMIN:
+            nama = nama_berkas_kurva(indikator, jenis_kelamin)
+            with open(os.path.join(direktori, nama), 'w') as f:
+                f.write(isi_berkas_kurva(indikator, jenis_kelamin))
+            ditulis.append(nama)
+
+    for nama in os.listdir(direktori):
+        if nama.endswith('.json') and nama not in ditulis:
+            os.remove(os.path.join(direktori, nama))
+    return ditulis
+
+
+def kurva_usang(direktori=DIREKTORI_KURVA):
+    """
+    Daftar berkas kurva yang hilang atau isinya tidak sesuai tabel saat ini
+    """
+    usang = []
+    for indikator in INDIKATOR_UMUR:
+        for jenis_kelamin in JENIS_KELAMIN:
+            nama = nama_berkas_kurva(indikator, jenis_kelamin)
+            try:
+                with open(os.path.join(direktori, nama)) as f:
+                    sesuai = f.read() == isi_berkas_kurva(indikator, jenis_kelamin)
+            except FileNotFoundError:
+                sesuai = False
+            if not sesuai:
+                usang.append(nama)
+    return usang
@@ -0,0 +1,166 @@
+"""
+Laporan Massal - Cetak Riwayat Banyak Pasien Sekaligus (Sesi Posyandu)
+
+Seluruh data dimuat dengan jumlah query tetap (pasien + pengukuran), lalu
+setiap laporan per anak di-render di ProcessPoolExecutor ke cache disk
+laporan_pdf. Proses worker hanya mengembalikan kunci berkas, dan jumlah tugas
+yang sedang berjalan dibatasi, sehingga memori tidak tumbuh mengikuti jumlah
+anak. Hasil akhirnya digabung dari disk menjadi satu PDF atau satu ZIP.
+
+PDF per anak identik dengan hasil `cetak_riwayat_pdf` sehingga cache dipakai
+bersama: anak yang laporannya sudah pernah dicetak tidak di-render ulang.
+"""
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connections
+
+from .laporan_pdf import (
+    inisialisasi_proses_render, laporan_riwayat_dari_timeline, pastikan_di_cache, path_cache
+)
+from .models import Pasien
+from .timeline_pasien import muat_timeline_banyak_pasien
+
+FORMAT_PDF = 'pdf'
+FORMAT_ZIP = 'zip'
+PILIHAN_FORMAT = (FORMAT_PDF, FORMAT_ZIP)
+
+# Tugas yang boleh menunggu per worker; membatasi context yang tertahan di antrian pool
+TUGAS_PER_WORKER = 2
+
+
+def jumlah_worker_default():
+    return getattr(settings, 'PDF_RENDER_WORKERS', min(4, os.cpu_count() or 1))
+
+
+def pilih_pasien(dari=None, sampai=None, pasien_ids=None):
+    """
+    Pasien yang diukur pada rentang tanggal dan/atau termasuk daftar ID
+
+    Args:
+        dari, sampai: Rentang tanggal ukur (date), boleh salah satu
+        pasien_ids: Iterable ID pasien
+
+    Returns:
+        QuerySet Pasien urut nama
+    """
+    pasien = Pasien.objects.all()
+    if dari or sampai:
+        pengukuran = {}
+        if dari:
+            pengukuran['pengukuranfisik__tanggalUkur__gte'] = dari
+        if sampai:
+            pengukuran['pengukuranfisik__tanggalUkur__lte'] = sampai
+        pasien = pasien.filter(id__in=Pasien.objects.filter(**pengukuran).values('id'))
+    if pasien_ids:
+        pasien = pasien.filter(id__in=pasien_ids)
+    return pasien.order_by('nama', 'id')
+
+
+def muat_laporan_massal(pasien_queryset):
+    """
+    Siapkan Laporan riwayat untuk setiap pasien dengan dua query
+
+    Returns:
+        List Laporan sesuai urutan queryset
+    """
+    return [
+        laporan_riwayat_dari_timeline(timeline)
+        for timeline in muat_timeline_banyak_pasien(pasien_queryset, konsultasi=False)
+    ]
+
+
+def render_massal(laporan_list, workers=None):
+    """
+    Pastikan PDF setiap laporan ada di cache disk
+
+    Args:
+        laporan_list: List Laporan
+        workers: Jumlah proses render; 0 = render di proses ini
+
+    Returns:
+        Jumlah laporan yang di-render (bukan dari cache)
+    """
+    workers = jumlah_worker_default() if workers is None else workers
+    belum = [laporan for laporan in laporan_list if not os.path.exists(path_cache(laporan.kunci))]
+    if workers == 0 or len(belum) <= 1:
+        for laporan in belum:
+            pastikan_di_cache(laporan.kunci, laporan.nama_template, laporan.context)
+        return len(belum)
+
+    # Koneksi database tidak boleh diwariskan ke proses anak
+    connections.close_all()
+    sisa = iter(belum)
+    berjalan = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=inisialisasi_proses_render) as pool:
+        while True:
+            for laporan in sisa:
+                berjalan.add(pool.submit(pastikan_di_cache, laporan.kunci, laporan.nama_template, laporan.context))
+                if len(berjalan) >= workers * TUGAS_PER_WORKER:
+                    break
+            if not berjalan:
+                break
+            rampung, berjalan = wait(berjalan, return_when=FIRST_COMPLETED)
+            for future in rampung:
+                # Teruskan kesalahan render ke pemanggil
+                future.result()
+    return len(belum)
+
+
+def _path_laporan(laporan):
+    path = path_cache(laporan.kunci)
+    if not os.path.exists(path):
+        # Tergusur LRU di antara render dan penggabungan
+        pastikan_di_cache(laporan.kunci, laporan.nama_template, laporan.context)
+    return path
+
+
+def gabung_pdf(laporan_list, tujuan):
+    """
+    Gabungkan PDF per anak menjadi satu dokumen
+
+    Args:
+        laporan_list: List Laporan yang sudah di-render
+        tujuan: File biner yang dapat ditulis
+    """
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for laporan in laporan_list:
+        writer.append(_path_laporan(laporan))
+    writer.write(tujuan)
+    writer.close()
+
+
+def buat_zip(laporan_list, tujuan):
+    """
+    Kemas PDF per anak ke dalam satu ZIP, disalin langsung dari disk
+
+    Args:
+        laporan_list: List Laporan yang sudah di-render
+        tujuan: File biner yang dapat ditulis
+    """
+    # PDF sudah terkompresi; ZIP_STORED menghindari kompresi ulang yang sia-sia
+    with zipfile.ZipFile(tujuan, 'w', compression=zipfile.ZIP_STORED) as arsip:
+        for laporan in laporan_list:
+            pasien = laporan.context['pasien']
+            arsip.write(_path_laporan(laporan), f'riwayat_{pasien.id}_{pasien.nama}.pdf')
+
+
+def tulis_laporan_massal(laporan_list, tujuan, format_keluaran=FORMAT_PDF, workers=None):
+    """
+    Render seluruh laporan lalu tulis sebagai satu PDF gabungan atau ZIP
+
+    Returns:
+        Jumlah laporan yang di-render (bukan dari cache)
+    """
+    if format_keluaran not in PILIHAN_FORMAT:
+        raise ValueError(f"Format tidak dikenal: {format_keluaran}")
+    dirender = render_massal(laporan_list, workers)
+    if format_keluaran == FORMAT_ZIP:
+        buat_zip(laporan_list, tujuan)
+    else:
+        gabung_pdf(laporan_list, tujuan)
+    return dirender
@@ -0,0 +1,418 @@
+"""
+Laporan PDF - Render dan Cache Disk Berbasis Sidik Jari Isi
+
+Render xhtml2pdf memakan ratusan milidetik CPU per laporan, padahal hasilnya
+hanya berubah bila data yang dicetak berubah. Setiap laporan diberi kunci
+sidik jari (SHA-256) dari seluruh masukannya: baris data yang dicetak, mesin
+dan versi template/penggambar, versi basis pengetahuan, dan tanggal cetak. Berkas PDF disimpan di
+disk lokal (settings.PDF_CACHE_DIR) dengan batas ukuran total
+(settings.PDF_CACHE_MAX_BYTES) dan dibuang berdasarkan waktu akses terlama (LRU).
+
+Sidik jari yang sama juga dipakai sebagai ETag sehingga browser yang
+mencetak ulang laporan yang sama cukup menerima 304 Not Modified.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import namedtuple
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .mesin_inferensi import versi_basis_pengetahuan
+from .models import Konsultasi
+from .timeline_pasien import muat_timeline_pasien
+
+TEMPLATE_RIWAYAT = 'pdf/riwayat_pengukuran_pdf.html'
+TEMPLATE_HASIL_DIAGNOSA = 'pdf/hasil_diagnosa_pdf.html'
+
+PDF_CACHE_MAX_BYTES_DEFAULT = 200 * 1024 * 1024
+
+MESIN_XHTML2PDF = 'xhtml2pdf'
+MESIN_REPORTLAB = 'reportlab'
+
+# Field yang tidak pernah tampil di laporan dan tidak ikut sidik jari
+FIELD_DIKECUALIKAN = {'kataSandi'}
+
+Laporan = namedtuple('Laporan', [
+    'kunci',            # Sidik jari seluruh masukan laporan
+    'nama_template',    # Template HTML laporan
+    'context',          # Context template
+    'nama_berkas',      # Nama berkas untuk Content-Disposition
+])
+
+
+def direktori_cache():
+    return str(getattr(settings, 'PDF_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'pdf')))
+
+
+def batas_ukuran_cache():
+    return getattr(settings, 'PDF_CACHE_MAX_BYTES', PDF_CACHE_MAX_BYTES_DEFAULT)
+
+
+def mesin_pdf():
+    return getattr(settings, 'PDF_ENGINE', MESIN_XHTML2PDF)
+
+
+def penggambar_reportlab(nama_template):
+    """
+    Fungsi render ReportLab untuk sebuah template, atau None jika belum ada padanannya
+    """
+    from . import pdf_reportlab
+
+    return {
+        TEMPLATE_RIWAYAT: pdf_reportlab.render_riwayat,
+        TEMPLATE_HASIL_DIAGNOSA: pdf_reportlab.render_hasil_diagnosa,
+    }.get(nama_template)
+
+
+@lru_cache(maxsize=None)
+def versi_template(nama_template):
+    """
+    Hash isi sumber template; berubah otomatis saat template di-deploy ulang
+    """
+    sumber = get_template(nama_template).template.source
+    return hashlib.sha256(sumber.encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def versi_reportlab():
+    """
+    Hash sumber modul pdf_reportlab; berubah otomatis saat kode penggambar berubah
+    """
+    from . import pdf_reportlab
+
+    with open(pdf_reportlab.__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def versi_penggambar(nama_template):
+    """
+    Versi mesin yang akan me-render template ini, untuk sidik jari cache
+
+    PDF dari kedua mesin berbeda isinya sehingga tidak boleh berbagi kunci.
+    """
+    if mesin_pdf() == MESIN_REPORTLAB and penggambar_reportlab(nama_template):
+        return f'{MESIN_REPORTLAB}:{versi_reportlab()}'
+    return f'{MESIN_XHTML2PDF}:{versi_template(nama_template)}'
+
+
+def nilai_model(obj):
+    """
+    Nilai seluruh kolom konkret sebuah objek model untuk dimasukkan ke sidik jari
+    """
+    if obj is None:
+        return None
+    return [
+        getattr(obj, field.attname)
+        for field in obj._meta.concrete_fields
+        if field.name not in FIELD_DIKECUALIKAN
+    ]
+
+
+def sidik_jari(*bagian):
+    """
+    Hitung kunci cache dari seluruh masukan laporan
+
+    Args:
+        *bagian: Nilai yang dapat di-serialisasi JSON (tanggal/Decimal didukung)
+
+    Returns:
+        String hex SHA-256
+    """
+    data = json.dumps(bagian, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def kunci_riwayat(timeline):
+    """
+    Sidik jari laporan riwayat pengukuran dari TimelinePasien (tanpa konsultasi)
+    """
+    # Tanggal ikut sidik jari karena laporan mencetak usia dan tanggal cetak
+    return sidik_jari(
+        TEMPLATE_RIWAYAT,
+        versi_penggambar(TEMPLATE_RIWAYAT),
+        timezone.localdate(),
+        nilai_model(timeline.pasien),
+        [nilai_model(pengukuran) for pengukuran in timeline.pengukuran_list],
+    )
+
+
+def kunci_hasil_diagnosa(konsultasi):
+    """
+    Sidik jari laporan hasil diagnosa (konsultasi dengan pasien dan hasilKondisi ter-select_related)
+    """
+    return sidik_jari(
+        TEMPLATE_HASIL_DIAGNOSA,
+        versi_penggambar(TEMPLATE_HASIL_DIAGNOSA),
+        versi_basis_pengetahuan(),
+        timezone.localdate(),
+        nilai_model(konsultasi),
+        nilai_model(konsultasi.pasien),
+        nilai_model(konsultasi.hasilKondisi),
+    )
+
+
+def laporan_riwayat(pasien_id):
+    """
+    Siapkan laporan riwayat pengukuran seorang pasien
+
+    Raises:
+        Pasien.DoesNotExist: Jika pasien tidak ditemukan
+    """
+    return laporan_riwayat_dari_timeline(muat_timeline_pasien(pasien_id, konsultasi=False))
+
+
+def laporan_riwayat_dari_timeline(timeline):
+    """
+    Siapkan laporan riwayat pengukuran dari TimelinePasien yang sudah dimuat
+    """
+    pasien = timeline.pasien
+    return Laporan(
+        kunci=kunci_riwayat(timeline),
+        nama_template=TEMPLATE_RIWAYAT,
+        context={'pasien': pasien, 'pengukuran_list': timeline.pengukuran_list},
+        nama_berkas=f'riwayat_{pasien.nama}.pdf',
+    )
+
+
+def laporan_hasil_diagnosa(konsultasi_id):
+    """
+    Siapkan laporan hasil diagnosa satu konsultasi
+
+    Raises:
+        Konsultasi.DoesNotExist: Jika konsultasi tidak ditemukan
+    """
+    konsultasi = Konsultasi.objects.select_related('hasilKondisi', 'pasien').get(id=konsultasi_id)
+    return Laporan(
+        kunci=kunci_hasil_diagnosa(konsultasi),
+        nama_template=TEMPLATE_HASIL_DIAGNOSA,
+        context={
+            'konsultasi': konsultasi,
+            'pasien': konsultasi.pasien,
+            'kondisi': konsultasi.hasilKondisi
+        },
+        nama_berkas=f'diagnosa_{konsultasi.pasien.nama}.pdf',
+    )
+
+
+def ada_di_cache(kunci):
+    return os.path.exists(path_cache(kunci))
+
+
+def render_pdf(nama_template, context):
+    """
+    Render laporan menjadi bytes PDF dengan mesin settings.PDF_ENGINE
+
+    Mesin 'reportlab' menggambar langsung dari data bila template punya
+    padanannya di pdf_reportlab; selain itu dipakai template HTML (xhtml2pdf).
+
+    Raises:
+        ValueError: Jika xhtml2pdf melaporkan kesalahan render
+    """
+    if mesin_pdf() == MESIN_REPORTLAB:
+        penggambar = penggambar_reportlab(nama_template)
+        if penggambar is not None:
+            return penggambar(context)
+    return render_html_pdf(nama_template, context)
+
+
+def render_html_pdf(nama_template, context):
+    """
+    Render template HTML menjadi bytes PDF dengan xhtml2pdf
+
+    Raises:
+        ValueError: Jika xhtml2pdf melaporkan kesalahan render
+    """
+    from xhtml2pdf import pisa
+
+    html = get_template(nama_template).render(context)
+    hasil = BytesIO()
+    status = pisa.CreatePDF(html, dest=hasil)
+    if status.err:
+        raise ValueError("Gagal membuat PDF")
+    return hasil.getvalue()
+
+
+def path_cache(kunci):
+    """
+    Lokasi berkas PDF untuk sebuah kunci di cache disk
+    """
+    return os.path.join(direktori_cache(), f'{kunci}.pdf')
+
+
+def baca_cache(kunci):
+    """
+    Ambil PDF dari cache disk dan tandai sebagai baru diakses
+
+    Returns:
+        Tuple (isi bytes, waktu dibuat epoch) atau None jika tidak ada
+    """
+    path = path_cache(kunci)
+    try:
+        with open(path, 'rb') as f:
+            isi = f.read()
+        info = os.stat(path)
+        # atime = waktu akses terakhir (dipakai LRU); mtime = waktu dibuat (Last-Modified)
+        os.utime(path, (time.time(), info.st_mtime))
+    except FileNotFoundError:
+        return None
+    return isi, info.st_mtime
+
+
+def simpan_cache(kunci, isi):
+    """
+    Simpan PDF ke cache disk secara atomik lalu jalankan eviksi bila perlu
+
+    Returns:
+        Waktu dibuat (epoch)
+    """
+    direktori = direktori_cache()
+    os.makedirs(direktori, exist_ok=True)
+    fd, path_sementara = tempfile.mkstemp(dir=direktori, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(isi)
+        os.replace(path_sementara, path_cache(kunci))
+    except BaseException:
+        if os.path.exists(path_sementara):
+            os.unlink(path_sementara)
+        raise
+    bersihkan_cache()
+    return os.stat(path_cache(kunci)).st_mtime
+
+
+def bersihkan_cache(batas_byte=None):
+    """
+    Buang PDF yang paling lama tidak diakses hingga total ukuran di bawah batas
+
+    Args:
+        batas_byte: Batas ukuran total; default settings.PDF_CACHE_MAX_BYTES
+
+    Returns:
+        Jumlah berkas yang dihapus
+    """
+    batas_byte = batas_ukuran_cache() if batas_byte is None else batas_byte
+    try:
+        berkas = [
+            entry for entry in os.scandir(direktori_cache())
+            if entry.is_file() and entry.name.endswith('.pdf')
+        ]
+    except FileNotFoundError:
+        return 0
+
+    info = []
+    for entry in berkas:
+        try:
+            info.append((entry.stat().st_atime, entry.stat().st_size, entry.path))
+        except FileNotFoundError:
+            continue
+    total = sum(ukuran for _, ukuran, _ in info)
+    if total <= batas_byte:
+        return 0
+
+    # Buang sampai 90% batas agar eviksi tidak berjalan di setiap penyimpanan
+    target = batas_byte * 0.9
+    dihapus = 0
+    for _, ukuran, path in sorted(info):
+        if total <= target:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= ukuran
+        dihapus += 1
+    return dihapus
+
+
+def ambil_atau_render_pdf(kunci, nama_template, context):
+    """
+    Ambil PDF dari cache, atau render dan simpan jika belum ada
+
+    Returns:
+        Tuple (isi bytes, waktu dibuat epoch)
+    """
+    hasil = baca_cache(kunci)
+    if hasil is not None:
+        return hasil
+    isi = render_pdf(nama_template, context)
+    return isi, simpan_cache(kunci, isi)
+
+
+def pastikan_di_cache(kunci, nama_template, context):
+    """
+    Render dan simpan PDF ke cache bila belum ada, tanpa membaca isinya
+
+    Dipakai di proses worker agar yang dikirim balik hanya kunci, bukan bytes PDF.
+
+    Returns:
+        Kunci laporan
+    """
+    if not ada_di_cache(kunci):
+        simpan_cache(kunci, render_pdf(nama_template, context))
+    return kunci
+
+
+def inisialisasi_proses_render():
+    """
+    Initializer ProcessPoolExecutor: siapkan Django di proses anak
+    """
+    import django
+    django.setup()
+
+
+def _respons_pdf(request, kunci, nama_berkas, ambil_isi):
+    etag = f'"{kunci}"'
+    try:
+        dibuat = int(os.stat(path_cache(kunci)).st_mtime)
+    except FileNotFoundError:
+        dibuat = None
+    # ETag ditentukan oleh masukan laporan, jadi 304 bisa dikirim tanpa membaca atau me-render PDF
+    respons = get_conditional_response(request, etag=etag, last_modified=dibuat)
+    if respons is None:
+        hasil = ambil_isi()
+        if hasil is None:
+            return None
+        isi, dibuat = hasil
+        respons = HttpResponse(isi, content_type='application/pdf')
+        respons['Content-Disposition'] = f'attachment; filename="{nama_berkas}"'
+        respons['Last-Modified'] = http_date(dibuat)
+    respons['ETag'] = etag
+    # Laporan berisi data pasien: hanya boleh di-cache browser, selalu divalidasi ulang
+    patch_cache_control(respons, private=True, no_cache=True)
+    return respons
+
+
+def respons_pdf(request, laporan):
+    """
+    Kirim PDF ber-cache dengan header ETag/Last-Modified (304 bila tidak berubah)
+
+    Args:
+        request: HttpRequest (dipakai untuk If-None-Match / If-Modified-Since)
+        laporan: Laporan dari laporan_riwayat() / laporan_hasil_diagnosa();
+            context hanya dipakai saat PDF belum ada di cache
+    """
+    return _respons_pdf(
+        request, laporan.kunci, laporan.nama_berkas,
+        lambda: ambil_atau_render_pdf(laporan.kunci, laporan.nama_template, laporan.context)
+    )
+
+
+def respons_pdf_dari_cache(request, kunci, nama_berkas):
+    """
+    Kirim PDF yang sudah ada di cache tanpa pernah me-render
+
+    Returns:
+        HttpResponse, atau None jika berkas sudah tidak ada di cache
+    """
+    return _respons_pdf(request, kunci, nama_berkas, lambda: baca_cache(kunci))
@@ -0,0 +1,82 @@
+import gc
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from core.laporan_pdf import (
+    MESIN_REPORTLAB, MESIN_XHTML2PDF, TEMPLATE_HASIL_DIAGNOSA, TEMPLATE_RIWAYAT,
+    laporan_hasil_diagnosa, laporan_riwayat, penggambar_reportlab, render_html_pdf
+)
+from core.models import Konsultasi, PengukuranFisik
+
+
+class Command(BaseCommand):
+    help = 'Compare CPU time and peak memory of the xhtml2pdf and ReportLab PDF engines (bypasses the PDF cache)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Renders per report and engine')
+        parser.add_argument('--pasien', type=int, help='Pasien id for the history report (default: most measurements)')
+        parser.add_argument('--konsultasi', type=int, help='Konsultasi id for the diagnosis report (default: latest)')
+
+    def handle(self, *args, **options):
+        ulang = options['repeat']
+        if ulang < 1:
+            raise CommandError('--repeat harus lebih dari 0')
+
+        laporan_list = []
+        pasien_id = options['pasien'] or self.pasien_terbanyak()
+        if pasien_id:
+            laporan_list.append(('Riwayat pengukuran', TEMPLATE_RIWAYAT, laporan_riwayat(pasien_id).context))
+        konsultasi_id = options['konsultasi'] or Konsultasi.objects.order_by('-id').values_list('id', flat=True).first()
+        if konsultasi_id:
+            laporan_list.append(('Hasil diagnosa', TEMPLATE_HASIL_DIAGNOSA, laporan_hasil_diagnosa(konsultasi_id).context))
+        if not laporan_list:
+            raise CommandError('Tidak ada data pasien atau konsultasi untuk diukur.')
+
+        self.stdout.write(f'{"Laporan":<20} {"Mesin":<10} {"CPU/laporan":>12} {"Memori puncak":>14} {"Ukuran":>10}')
+        for judul, nama_template, context in laporan_list:
+            hasil = {}
+            for mesin, render in (
+                (MESIN_XHTML2PDF, lambda: render_html_pdf(nama_template, context)),
+                (MESIN_REPORTLAB, lambda: penggambar_reportlab(nama_template)(context)),
+            ):
+                hasil[mesin] = self.ukur(render, ulang)
+                cpu, memori, ukuran = hasil[mesin]
+                self.stdout.write(
+                    f'{judul:<20} {mesin:<10} {cpu * 1000:>10.1f}ms {memori / 1024:>12.0f}KB {ukuran / 1024:>8.1f}KB'
+                )
+            cpu_html, memori_html, _ = hasil[MESIN_XHTML2PDF]
+            cpu_rl, memori_rl, _ = hasil[MESIN_REPORTLAB]
+            self.stdout.write(self.style.SUCCESS(
+                f'{judul}: ReportLab {cpu_html / max(cpu_rl, 1e-9):.1f}x lebih cepat, '
+                f'memori puncak {memori_html / max(memori_rl, 1):.1f}x lebih kecil'
+            ))
+
+    def pasien_terbanyak(self):
+        return (
+            PengukuranFisik.objects.values('pasien_id').annotate(jumlah=Count('id'))
+            .order_by('-jumlah').values_list('pasien_id', flat=True).first()
+        )
+
+    def ukur(self, render, ulang):
+        """
+        Returns:
+            Tuple (detik CPU per render, byte memori puncak satu render, ukuran PDF)
+        """
+        # Pemanasan: impor modul dan font tidak ikut terukur
+        isi = render()
+
+        gc.collect()
+        mulai = time.process_time()
+        for _ in range(ulang):
+            render()
+        cpu = (time.process_time() - mulai) / ulang
+
+        gc.collect()
+        tracemalloc.start()
+        render()
+        _, puncak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return cpu, puncak, len(isi)
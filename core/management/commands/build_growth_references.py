@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.kurva_referensi import DIREKTORI_KURVA, kurva_usang, tulis_semua_kurva
+
+
+class Command(BaseCommand):
+    help = 'Precompute the WHO -3..+3 SD reference curves as versioned static JSON files for the growth charts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only verify that the committed files match the WHO tables')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            usang = kurva_usang()
+            if usang:
+                raise CommandError(
+                    f'Kurva referensi usang atau hilang: {", ".join(usang)}. '
+                    'Jalankan `manage.py build_growth_references`.'
+                )
+            self.stdout.write(self.style.SUCCESS('Kurva referensi sesuai dengan tabel WHO.'))
+            return
+
+        ditulis = tulis_semua_kurva()
+        self.stdout.write(self.style.SUCCESS(f'{len(ditulis)} berkas kurva referensi ditulis ke {DIREKTORI_KURVA}.'))
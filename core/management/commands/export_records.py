@@ -0,0 +1,54 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ekspor import DATASET, FORMAT_CSV, PILIHAN_FORMAT_EKSPOR, UKURAN_CHUNK_DEFAULT, alirkan_ekspor, queryset_ekspor
+
+
+def _tanggal(nilai):
+    try:
+        return datetime.strptime(nilai, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Tanggal harus berformat YYYY-MM-DD: {nilai}')
+
+
+class Command(BaseCommand):
+    help = 'Stream measurements or consultations to a CSV or Parquet file in constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(DATASET), help='Which records to export')
+        parser.add_argument('output', help='Destination file path')
+        parser.add_argument('--format', choices=PILIHAN_FORMAT_EKSPOR, default=FORMAT_CSV)
+        parser.add_argument('--since', help='Records dated on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Records dated on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--sex', choices=('L', 'P'), help='Only children of this sex')
+        parser.add_argument('--kondisi', help="Diagnosis code, or '-' for undiagnosed consultations")
+        parser.add_argument('--chunk-size', type=int, default=UKURAN_CHUNK_DEFAULT, help='Rows fetched and written per chunk')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size harus lebih dari 0')
+        queryset = queryset_ekspor(
+            options['dataset'],
+            _tanggal(options['since']) if options['since'] else None,
+            _tanggal(options['until']) if options['until'] else None,
+            options['sex'],
+            options['kondisi'],
+        )
+
+        mulai = time.monotonic()
+        try:
+            aliran = alirkan_ekspor(options['dataset'], queryset, options['format'], options['chunk_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        ukuran = 0
+        with open(options['output'], 'wb') as tujuan:
+            for potongan in aliran:
+                tujuan.write(potongan)
+                ukuran += len(potongan)
+
+        durasi = time.monotonic() - mulai
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {options["dataset"]} ditulis ke {options["output"]} ({ukuran / 1024:.0f} KB) dalam {durasi:.1f} detik.'
+        ))
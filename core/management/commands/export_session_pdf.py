@@ -0,0 +1,53 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.laporan_massal import (
+    FORMAT_PDF, PILIHAN_FORMAT, jumlah_worker_default, muat_laporan_massal, pilih_pasien, tulis_laporan_massal
+)
+
+
+def _tanggal(nilai):
+    try:
+        return datetime.strptime(nilai, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Tanggal harus berformat YYYY-MM-DD: {nilai}')
+
+
+class Command(BaseCommand):
+    help = 'Write the measurement history of every child in a posyandu session as one combined PDF or a ZIP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Destination file path')
+        parser.add_argument('--since', help='Children measured on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Children measured on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--pasien', type=int, nargs='+', help='Only these Pasien ids')
+        parser.add_argument('--format', choices=PILIHAN_FORMAT, default=FORMAT_PDF,
+                            help='pdf: one combined document, zip: one PDF per child')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Number of render processes (default settings.PDF_RENDER_WORKERS); 0 renders inline')
+
+    def handle(self, *args, **options):
+        dari = _tanggal(options['since']) if options['since'] else None
+        sampai = _tanggal(options['until']) if options['until'] else None
+        if not (dari or sampai or options['pasien']):
+            raise CommandError('Tentukan --since/--until atau --pasien')
+        workers = jumlah_worker_default() if options['workers'] is None else options['workers']
+        if workers < 0:
+            raise CommandError('--workers tidak boleh negatif')
+
+        mulai = time.monotonic()
+        laporan_list = muat_laporan_massal(pilih_pasien(dari, sampai, options['pasien']))
+        if not laporan_list:
+            raise CommandError('Tidak ada pasien yang cocok dengan filter.')
+        self.stdout.write(f'{len(laporan_list)} laporan akan dicetak dengan {workers or "inline"} proses.')
+
+        with open(options['output'], 'wb') as tujuan:
+            dirender = tulis_laporan_massal(laporan_list, tujuan, options['format'], workers)
+
+        durasi = time.monotonic() - mulai
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {len(laporan_list)} laporan ({dirender} di-render, '
+            f'{len(laporan_list) - dirender} dari cache) ditulis ke {options["output"]} dalam {durasi:.1f} detik.'
+        ))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.impor_pengukuran import UKURAN_CHUNK_DEFAULT, baca_berkas, impor_pengukuran
+
+
+class Command(BaseCommand):
+    help = 'Bulk import PengukuranFisik rows from a posyandu ledger (CSV or XLSX) with z-scores computed per chunk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Ledger file (.csv or .xlsx)')
+        parser.add_argument('--errors', help='Write the per-row error report CSV to this path')
+        parser.add_argument('--chunk-size', type=int, default=UKURAN_CHUNK_DEFAULT, help='Rows validated and inserted per chunk')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every row without saving')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size harus lebih dari 0')
+
+        mulai = time.monotonic()
+        berkas_kesalahan = open(options['errors'], 'w', newline='', encoding='utf-8') if options['errors'] else None
+        try:
+            with open(options['path'], 'rb') as berkas:
+                hasil = impor_pengukuran(
+                    baca_berkas(berkas, options['path']), berkas_kesalahan,
+                    options['chunk_size'], simpan=not options['dry_run'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        finally:
+            if berkas_kesalahan:
+                berkas_kesalahan.close()
+
+        for kesalahan in hasil['contoh_kesalahan']:
+            self.stdout.write(f'Baris {kesalahan["baris"]}: {kesalahan["kesalahan"]}')
+        durasi = time.monotonic() - mulai
+        keterangan = ' (dry run, tidak ada yang disimpan)' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {hasil["dibaca"]} baris dibaca, {hasil["diimpor"]} diimpor, '
+            f'{hasil["gagal"]} gagal dalam {durasi:.1f} detik{keterangan}.'
+        ))
@@ -0,0 +1,129 @@
+import time
+from datetime import datetime
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import PengukuranFisik
+from core.standar_pertumbuhan import hitung_semua_zscore
+from core.statistik import bangun_ulang_statistik
+from core.utils import KOLOM_ZSCORE, indikator_tidak_wajar, zscore_ke_desimal
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored anthropometric z-scores for PengukuranFisik using the WHO LMS tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only measurements with tanggalUkur on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--pasien', type=int, nargs='+', help='Only measurements of these Pasien ids')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows fetched and written per chunk')
+        parser.add_argument('--dry-run', action='store_true', help='Compute and report changes without saving')
+
+    def handle(self, *args, **options):
+        queryset = PengukuranFisik.objects.all()
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since harus berformat YYYY-MM-DD')
+            queryset = queryset.filter(tanggalUkur__gte=since)
+        if options['pasien']:
+            queryset = queryset.filter(pasien_id__in=options['pasien'])
+
+        ukuran_chunk = options['chunk_size']
+        if ukuran_chunk < 1:
+            raise CommandError('--chunk-size harus lebih dari 0')
+
+        total = queryset.count()
+        self.stdout.write(f'{total} pengukuran akan dihitung ulang.')
+
+        diproses = 0
+        berubah = 0
+        tidak_wajar = []
+        id_terakhir = 0
+        mulai = time.monotonic()
+
+        while True:
+            # Keyset pagination: WHERE id > terakhir ORDER BY id LIMIT n, tanpa OFFSET
+            baris = list(
+                queryset.filter(id__gt=id_terakhir).order_by('id').values_list(
+                    'id', 'tanggalUkur', 'beratBadan', 'tinggiBadan', 'lingkarKepala', 'lingkarLengan',
+                    'pasien__tanggalLahir', 'pasien__jenisKelamin',
+                    *KOLOM_ZSCORE.values(),
+                )[:ukuran_chunk]
+            )
+            if not baris:
+                break
+            id_terakhir = baris[-1][0]
+
+            diperbarui, tidak_wajar_chunk = self.hitung_chunk(baris)
+            berubah += len(diperbarui)
+            tidak_wajar += tidak_wajar_chunk
+            if diperbarui and not options['dry_run']:
+                with transaction.atomic():
+                    PengukuranFisik.objects.bulk_update(diperbarui, [*KOLOM_ZSCORE.values(), 'diperbarui'])
+
+            diproses += len(baris)
+            durasi = time.monotonic() - mulai
+            self.stdout.write(
+                f'{diproses}/{total} diproses, {berubah} berubah '
+                f'({diproses / durasi if durasi else 0:.0f} baris/detik)'
+            )
+
+        if berubah and not options['dry_run']:
+            # bulk_update tidak memicu sinyal: rekap prevalensi stunting dasbor dihitung ulang
+            bangun_ulang_statistik()
+
+        durasi = time.monotonic() - mulai
+        keterangan = ' (dry run, tidak ada yang disimpan)' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {diproses} pengukuran diproses, {berubah} diperbarui dalam {durasi:.1f} detik{keterangan}.'
+        ))
+        if tidak_wajar:
+            self.stdout.write(self.style.WARNING(
+                f'{len(tidak_wajar)} pengukuran memiliki z-score tidak wajar dan disimpan kosong; '
+                f'periksa satuan berat/tinggi (id: {", ".join(str(pk) for pk in tidak_wajar[:20])}'
+                f'{", ..." if len(tidak_wajar) > 20 else ""})'
+            ))
+
+    def hitung_chunk(self, baris):
+        """
+        Hitung z-score satu chunk sebagai array dan kembalikan objek yang nilainya berubah
+
+        Args:
+            baris: List tuple hasil values_list pada handle()
+
+        Returns:
+            Tuple (list PengukuranFisik berisi id, skor z dan waktu diperbarui untuk
+            bulk_update; list id dengan z-score tidak wajar yang disimpan kosong)
+        """
+        kolom = list(zip(*baris))
+        id_, tanggal_ukur, berat, tinggi, lingkar_kepala, lingkar_lengan, tanggal_lahir, jenis_kelamin = kolom[:8]
+        skor_lama = kolom[8:]
+
+        umur_hari = (
+            np.array(tanggal_ukur, dtype='datetime64[D]') - np.array(tanggal_lahir, dtype='datetime64[D]')
+        ).astype(np.int64)
+        # None (tidak diukur) menjadi NaN sehingga z-score-nya juga NaN
+        hasil = hitung_semua_zscore(
+            np.array(jenis_kelamin),
+            umur_hari,
+            np.array(berat, dtype=np.float64),
+            np.array(tinggi, dtype=np.float64),
+            np.array(lingkar_kepala, dtype=np.float64),
+            np.array(lingkar_lengan, dtype=np.float64),
+        )
+        skor_baru = [hasil[indikator] for indikator in KOLOM_ZSCORE]
+
+        diperbarui = []
+        tidak_wajar = []
+        sekarang = timezone.now()
+        for i, pk in enumerate(id_):
+            if indikator_tidak_wajar({indikator: z[i] for indikator, z in zip(KOLOM_ZSCORE, skor_baru)}):
+                tidak_wajar.append(pk)
+            nilai = [zscore_ke_desimal(indikator, float(z[i])) for indikator, z in zip(KOLOM_ZSCORE, skor_baru)]
+            if any(baru != lama[i] for baru, lama in zip(nilai, skor_lama)):
+                diperbarui.append(PengukuranFisik(id=pk, diperbarui=sekarang, **dict(zip(KOLOM_ZSCORE.values(), nilai))))
+        return diperbarui, tidak_wajar
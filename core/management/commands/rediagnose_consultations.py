@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.diagnosa_ulang import diagnosa_ulang
+
+
+class Command(BaseCommand):
+    help = 'Re-evaluate past consultations affected by rule changes against the current knowledge base'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without saving them')
+
+    def handle(self, *args, **options):
+        mulai = time.monotonic()
+        hasil = diagnosa_ulang(simpan=not options['dry_run'])
+
+        self.stdout.write(
+            f'{hasil["dievaluasi"]} konsultasi dievaluasi ulang ({hasil["himpunan_gejala"]} himpunan gejala berbeda), '
+            f'{hasil["tidak_terdampak"]} tidak terdampak perubahan aturan.'
+        )
+        for lama, baru, jumlah in hasil['perubahan']:
+            self.stdout.write(f'  {lama or "-"} -> {baru or "-"}: {jumlah} konsultasi')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: tidak ada perubahan yang disimpan.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{hasil["berubah"]} hasil berbeda dari diagnosa awal; selesai dalam {time.monotonic() - mulai:.1f} detik.'
+            ))
@@ -0,0 +1,129 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from core.antrian_pdf import klaim_tugas, kerjakan_tugas, lepaskan_tugas, pulihkan_tugas_macet
+from core.laporan_pdf import inisialisasi_proses_render
+from core.models import TugasPdf
+
+
+class Command(BaseCommand):
+    help = 'Render queued PDF reports (TugasPdf) in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Number of render processes; 0 renders inline in this process')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        jumlah_worker = options['workers']
+        if jumlah_worker < 0:
+            raise CommandError('--workers tidak boleh negatif')
+
+        self.stdout.write(f'Worker PDF berjalan dengan {jumlah_worker or "inline"} proses.')
+        if jumlah_worker == 0:
+            selesai = self.jalankan_inline(options)
+        else:
+            selesai = self.jalankan_pool(jumlah_worker, options)
+        self.stdout.write(self.style.SUCCESS(f'Worker PDF berhenti setelah {selesai} tugas.'))
+
+    def jalankan_inline(self, options):
+        selesai = 0
+        while True:
+            pulihkan_tugas_macet()
+            diklaim = klaim_tugas(1)
+            if not diklaim:
+                if options['once']:
+                    return selesai
+                time.sleep(options['interval'])
+                continue
+            self.laporkan(diklaim[0], kerjakan_tugas(diklaim[0]))
+            selesai += 1
+
+    def buat_pool(self, jumlah_worker):
+        # Koneksi database tidak boleh diwariskan ke proses anak
+        connections.close_all()
+        return ProcessPoolExecutor(max_workers=jumlah_worker, initializer=inisialisasi_proses_render)
+
+    def jalankan_pool(self, jumlah_worker, options):
+        berjalan = {}
+        selesai = 0
+        pool = self.buat_pool(jumlah_worker)
+        try:
+            while True:
+                # Render panjang milik worker ini bukan tugas macet: jangan sampai diklaim dan dirender dua kali
+                pulihkan_tugas_macet(kecuali=berjalan.values())
+                # Klaim hanya sebanyak slot yang kosong; sisanya tetap di antrian untuk worker lain
+                diklaim = klaim_tugas(jumlah_worker - len(berjalan))
+                try:
+                    for tugas_id in diklaim:
+                        berjalan[pool.submit(kerjakan_tugas, tugas_id)] = tugas_id
+                except BrokenProcessPool:
+                    terkirim = set(berjalan.values())
+                    lepaskan_tugas(tugas_id for tugas_id in diklaim if tugas_id not in terkirim)
+                    selesai += self.ganti_pool(pool, berjalan)
+                    pool = self.buat_pool(jumlah_worker)
+                    continue
+
+                if not berjalan:
+                    if options['once']:
+                        return selesai
+                    time.sleep(options['interval'])
+                    continue
+
+                rampung, _ = wait(berjalan, timeout=options['interval'], return_when=FIRST_COMPLETED)
+                pool_rusak = False
+                for future in rampung:
+                    pool_rusak |= self.catat_hasil(future, berjalan.pop(future))
+                    selesai += 1
+                if pool_rusak:
+                    selesai += self.ganti_pool(pool, berjalan)
+                    pool = self.buat_pool(jumlah_worker)
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def catat_hasil(self, future, tugas_id):
+        """
+        Laporkan hasil satu future; tugas yang dibatalkan sebelum sempat dirender dikembalikan ke antrian
+
+        Returns:
+            True jika pool rusak karena proses anak mati
+        """
+        if future.cancelled():
+            lepaskan_tugas([tugas_id])
+            return False
+        try:
+            status = future.result()
+        except Exception as e:
+            # Proses anak mati sebelum sempat menulis status
+            TugasPdf.objects.filter(id=tugas_id).update(
+                status=TugasPdf.STATUS_GAGAL, pesanError=str(e), selesai=timezone.now()
+            )
+            self.laporkan(tugas_id, TugasPdf.STATUS_GAGAL)
+            return isinstance(e, BrokenProcessPool)
+        self.laporkan(tugas_id, status)
+        return False
+
+    def ganti_pool(self, pool, berjalan):
+        """
+        Matikan pool yang rusak permanen setelah proses anak mati (OOM, segfault) dan
+        tuntaskan future-nya yang tersisa agar pool baru tidak ikut dianggap rusak
+
+        Returns:
+            Jumlah tugas yang selesai atau gagal (yang dibatalkan kembali ke antrian)
+        """
+        self.stdout.write(self.style.WARNING('Proses render mati; pool worker dibuat ulang.'))
+        pool.shutdown(wait=False, cancel_futures=True)
+        sisa, _ = wait(berjalan)
+        for future in sisa:
+            self.catat_hasil(future, berjalan.pop(future))
+        return sum(1 for future in sisa if not future.cancelled())
+
+    def laporkan(self, tugas_id, status):
+        gaya = self.style.SUCCESS if status == TugasPdf.STATUS_SELESAI else self.style.ERROR
+        self.stdout.write(gaya(f'Tugas {tugas_id}: {status}'))
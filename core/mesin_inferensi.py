@@ -0,0 +1,371 @@
+"""
+Mesin Inferensi Forward Chaining - Indeks Basis Pengetahuan Terkompilasi
+
+Seluruh kelompok aturan (pasangan kondisi + kodeKelompokAturan) dikompilasi
+sekali per proses. Setiap Gejala mendapat satu posisi bit dan setiap kelompok
+aturan menjadi bitmask integer, sehingga Strict Equality Matching cukup berupa
+satu lookup dict (kesamaan integer) tanpa query ke database, dan skor
+kemiripan untuk kecocokan parsial dihitung dengan popcount.
+
+Indeks di setiap proses diberi label versi basis pengetahuan (tabel
+VersiBasisPengetahuan). Setiap permintaan cukup membaca satu baris versi dan
+indeks hanya dikompilasi ulang bila versinya berubah.
+
+Isi setiap versi disimpan sekali sebagai SnapshotBasisPengetahuan: JSON
+kanonik terkompresi yang dikenali dari hash SHA-256 isinya. Worker pertama
+yang mengompilasi versi baru menautkan snapshot ke baris versi; worker lain
+memuat indeks langsung dari snapshot tersebut (satu baris, tanpa JOIN).
+Setiap Konsultasi mencatat snapshot yang dipakai sehingga audit dan
+diagnosa ulang dapat diputar ulang dengan indeks_snapshot().
+"""
+import hashlib
+import json
+import threading
+import uuid
+import zlib
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Aturan, Gejala, Kondisi, SnapshotBasisPengetahuan, VersiBasisPengetahuan
+
+# Kecocokan parsial dengan Jaccard di bawah batas ini tidak ditampilkan
+BATAS_JACCARD_PARSIAL = 0.5
+
+KecocokanParsial = namedtuple('KecocokanParsial', [
+    'kondisi',            # Objek Kondisi dari kelompok aturan
+    'kode_kelompok',      # kodeKelompokAturan
+    'jaccard',            # |WM ∩ rule| / |WM ∪ rule|
+    'cakupan',            # |WM ∩ rule| / |rule|
+    'gejala_cocok',       # Kode gejala rule yang ada di WM
+    'gejala_kurang',      # Kode gejala rule yang tidak ada di WM
+])
+
+
+class IndeksAturan:
+    """
+    Hasil kompilasi basis pengetahuan yang siap dipakai mesin inferensi
+
+    Attributes:
+        posisi_bit: dict kode gejala -> posisi bit
+        kelompok: dict (kodeKondisi, kodeKelompokAturan) -> frozenset kode gejala
+        mask_kelompok: dict (kodeKondisi, kodeKelompokAturan) -> bitmask gejala
+        pola: dict bitmask gejala -> objek Kondisi
+        snapshot_id: id SnapshotBasisPengetahuan dengan isi yang sama (None bila belum disimpan)
+    """
+
+    def __init__(self, kode_gejala, kelompok, kondisi_per_kelompok, versi=(0, ''), snapshot_id=None):
+        self.versi = versi
+        self.snapshot_id = snapshot_id
+        self.posisi_bit = {kode: posisi for posisi, kode in enumerate(kode_gejala)}
+        self.kode_per_bit = list(kode_gejala)
+        self.kelompok = kelompok
+        self.kondisi_per_kelompok = kondisi_per_kelompok
+        self.mask_kelompok = {key: self.encode(gejala_set)[0] for key, gejala_set in kelompok.items()}
+        self.pola = {}
+        for key, mask in self.mask_kelompok.items():
+            # Kelompok pertama yang ditemukan menang, sama seperti `break` pada pencarian lama
+            self.pola.setdefault(mask, kondisi_per_kelompok[key])
+
+    @classmethod
+    def dari_snapshot(cls, isi, versi=(0, ''), snapshot_id=None):
+        """
+        Bangun IndeksAturan dari isi snapshot (hasil ke_snapshot()) tanpa query
+
+        Objek Kondisi hanya memuat kodeKondisi dan namaKondisi; field lain
+        ditunda dan baru dibaca dari database bila diakses.
+        """
+        kondisi = {
+            kode: Kondisi.from_db(None, ['kodeKondisi', 'namaKondisi'], (kode, nama))
+            for kode, nama in isi['kondisi'].items()
+        }
+        kelompok = {}
+        kondisi_per_kelompok = {}
+        for kode_kondisi, kode_kelompok, kode_gejala in isi['kelompok']:
+            key = (kode_kondisi, kode_kelompok)
+            kelompok[key] = frozenset(kode_gejala)
+            kondisi_per_kelompok[key] = kondisi[kode_kondisi]
+        return cls(isi['gejala'], kelompok, kondisi_per_kelompok, versi, snapshot_id)
+
+    def ke_snapshot(self):
+        """
+        Serialisasi indeks menjadi dict yang siap di-JSON-kan
+
+        Urutan kelompok dipertahankan karena menentukan prioritas pencocokan.
+        """
+        return {
+            'gejala': self.kode_per_bit,
+            'kondisi': {key[0]: kondisi.namaKondisi for key, kondisi in self.kondisi_per_kelompok.items()},
+            'kelompok': [[key[0], key[1], sorted(gejala_set)] for key, gejala_set in self.kelompok.items()],
+        }
+
+    def encode(self, kode_gejala_input):
+        """
+        Ubah kumpulan kode gejala menjadi bitmask
+
+        Returns:
+            Tuple (bitmask, jumlah kode yang tidak dikenal basis pengetahuan)
+        """
+        mask = 0
+        tidak_dikenal = 0
+        for kode in set(kode_gejala_input):
+            posisi = self.posisi_bit.get(kode)
+            if posisi is None:
+                tidak_dikenal += 1
+            else:
+                mask |= 1 << posisi
+        return mask, tidak_dikenal
+
+    def decode(self, mask):
+        """
+        Ubah bitmask kembali menjadi daftar kode gejala (urut posisi bit)
+        """
+        return [kode for posisi, kode in enumerate(self.kode_per_bit) if mask >> posisi & 1]
+
+    def cocokkan(self, kode_gejala_input):
+        """
+        Cari Kondisi yang kelompok aturannya sama persis dengan gejala input
+
+        Args:
+            kode_gejala_input: Iterable kode gejala (misal: ['G01', 'G04'])
+
+        Returns:
+            Objek Kondisi atau None jika tidak ada kelompok yang cocok persis
+        """
+        mask, tidak_dikenal = self.encode(kode_gejala_input)
+        if tidak_dikenal:
+            # Gejala di luar basis pengetahuan tidak mungkin sama persis dengan kelompok mana pun
+            return None
+        return self.pola.get(mask)
+
+    def peringkat(self, kode_gejala_input, batas=3, jaccard_minimal=BATAS_JACCARD_PARSIAL):
+        """
+        Urutkan kelompok aturan yang paling mirip dengan gejala input
+
+        Args:
+            kode_gejala_input: Iterable kode gejala
+            batas: Jumlah maksimal kelompok yang dikembalikan
+            jaccard_minimal: Skor Jaccard minimal agar kelompok ikut diperingkat
+
+        Returns:
+            List KecocokanParsial, diurutkan dari Jaccard lalu cakupan tertinggi
+        """
+        mask_wm, tidak_dikenal = self.encode(kode_gejala_input)
+        hasil = []
+        for urutan, (key, mask_rule) in enumerate(self.mask_kelompok.items()):
+            irisan = (mask_wm & mask_rule).bit_count()
+            if not irisan:
+                continue
+            gabungan = (mask_wm | mask_rule).bit_count() + tidak_dikenal
+            jaccard = irisan / gabungan
+            if jaccard < jaccard_minimal:
+                continue
+            cakupan = irisan / mask_rule.bit_count()
+            hasil.append((-jaccard, -cakupan, urutan, key, mask_rule))
+
+        hasil.sort()
+        return [
+            KecocokanParsial(
+                kondisi=self.kondisi_per_kelompok[key],
+                kode_kelompok=key[1],
+                jaccard=-neg_jaccard,
+                cakupan=-neg_cakupan,
+                gejala_cocok=self.decode(mask_wm & mask_rule),
+                gejala_kurang=self.decode(mask_rule & ~mask_wm),
+            )
+            for neg_jaccard, neg_cakupan, _, key, mask_rule in hasil[:batas]
+        ]
+
+
+def kompilasi_basis_pengetahuan():
+    """
+    Bangun IndeksAturan dari tabel Gejala dan Aturan
+
+    Returns:
+        Objek IndeksAturan
+    """
+    # Baca versi sebelum aturan: jika ada perubahan di antaranya, indeks akan
+    # berlabel versi lama sehingga dikompilasi ulang pada permintaan berikutnya
+    versi = versi_basis_pengetahuan()
+    kode_gejala = list(Gejala.objects.order_by('kodeGejala').values_list('kodeGejala', flat=True))
+    kelompok = defaultdict(set)
+    kondisi_per_kelompok = {}
+
+    # Urutkan berdasarkan id agar kelompok yang lebih dulu dibuat tetap diprioritaskan
+    for aturan in Aturan.objects.select_related('kondisi').order_by('id'):
+        key = (aturan.kondisi_id, aturan.kodeKelompokAturan)
+        kelompok[key].add(aturan.gejala_id)
+        kondisi_per_kelompok.setdefault(key, aturan.kondisi)
+
+    kelompok = {key: frozenset(gejala_set) for key, gejala_set in kelompok.items()}
+    return IndeksAturan(kode_gejala, kelompok, kondisi_per_kelompok, versi)
+
+
+def _kodekan_snapshot(isi):
+    """
+    Returns:
+        Tuple (hash sha256 JSON kanonik, blob terkompresi)
+    """
+    teks = json.dumps(isi, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(teks).hexdigest(), zlib.compress(teks, 9)
+
+
+def _baca_snapshot(snapshot_id):
+    blob = SnapshotBasisPengetahuan.objects.values_list('isi', flat=True).get(pk=snapshot_id)
+    return json.loads(zlib.decompress(blob))
+
+
+def simpan_snapshot(indeks):
+    """
+    Simpan isi indeks sebagai SnapshotBasisPengetahuan (dipakai ulang bila isinya sudah pernah disimpan)
+
+    Mengisi indeks.snapshot_id dan menautkan snapshot ke baris versi bila
+    versi tersebut masih berlaku.
+
+    Returns:
+        id SnapshotBasisPengetahuan
+    """
+    hash_isi, blob = _kodekan_snapshot(indeks.ke_snapshot())
+    snapshot, _ = SnapshotBasisPengetahuan.objects.get_or_create(hash=hash_isi, defaults={'isi': blob})
+    versi, token = indeks.versi
+    # Tidak menimpa bila versi sudah naik lagi sejak indeks ini dikompilasi
+    VersiBasisPengetahuan.objects.filter(pk=1, versi=versi, token=token).update(snapshot=snapshot)
+    indeks.snapshot_id = snapshot.pk
+    return snapshot.pk
+
+
+_indeks = None
+_indeks_per_snapshot = {}
+_kunci_indeks = threading.Lock()
+_lokal = threading.local()
+
+
+def _baca_versi():
+    baris = VersiBasisPengetahuan.objects.filter(pk=1).values_list('versi', 'token', 'snapshot_id').first()
+    return baris if baris is not None else (0, '', None)
+
+
+def versi_basis_pengetahuan():
+    """
+    Baca versi basis pengetahuan yang terlihat oleh semua worker
+
+    Returns:
+        Tuple (versi, token); (0, '') jika basis pengetahuan belum pernah berubah
+    """
+    return _baca_versi()[:2]
+
+
+def naikkan_versi_basis_pengetahuan():
+    """
+    Naikkan versi basis pengetahuan sehingga semua worker mengompilasi ulang indeksnya
+
+    Tidak melakukan apa pun di dalam blok perubahan_massal(); kenaikan versi
+    dilakukan sekali saat blok tersebut selesai.
+    """
+    if getattr(_lokal, 'tunda', 0):
+        return
+
+    token = uuid.uuid4().hex
+    diperbarui = VersiBasisPengetahuan.objects.filter(pk=1).update(
+        versi=F('versi') + 1,
+        token=token,
+        snapshot=None,
+        diperbarui=timezone.now()
+    )
+    if not diperbarui:
+        VersiBasisPengetahuan.objects.get_or_create(pk=1, defaults={'versi': 1, 'token': token})
+
+
+@contextmanager
+def perubahan_massal():
+    """
+    Context manager untuk operasi massal (bulk_create, update, loader basis pengetahuan)
+
+    Sinyal per baris di dalam blok ini tidak menaikkan versi satu per satu;
+    versi dinaikkan tepat sekali di akhir blok terluar yang selesai tanpa
+    exception. Blok yang gagal (transaksinya akan di-rollback) tidak menulis
+    versi sehingga exception aslinya tidak tertutup. Operasi yang tidak
+    memicu sinyal (bulk_create, QuerySet.update) juga harus dibungkus blok ini.
+    """
+    _lokal.tunda = getattr(_lokal, 'tunda', 0) + 1
+    try:
+        yield
+    finally:
+        _lokal.tunda -= 1
+    if _lokal.tunda == 0:
+        naikkan_versi_basis_pengetahuan()
+
+
+def dapatkan_indeks():
+    """
+    Ambil IndeksAturan milik proses ini, muat ulang bila versinya berubah
+
+    Versi yang sudah memiliki snapshot dimuat dari snapshot tersebut; bila
+    belum, indeks dikompilasi dari tabel lalu snapshot-nya disimpan.
+
+    Returns:
+        Objek IndeksAturan
+    """
+    global _indeks
+    *versi, snapshot_id = _baca_versi()
+    versi = tuple(versi)
+    indeks = _indeks
+    if indeks is None or indeks.versi != versi:
+        with _kunci_indeks:
+            if _indeks is None or _indeks.versi != versi:
+                if snapshot_id is not None:
+                    _indeks = IndeksAturan.dari_snapshot(_baca_snapshot(snapshot_id), versi, snapshot_id)
+                else:
+                    _indeks = kompilasi_basis_pengetahuan()
+                    simpan_snapshot(_indeks)
+            indeks = _indeks
+    return indeks
+
+
+def indeks_snapshot(snapshot_id):
+    """
+    IndeksAturan persis seperti saat snapshot dibuat, untuk audit dan diagnosa ulang
+
+    Snapshot tidak pernah berubah sehingga hasilnya disimpan per proses.
+
+    Args:
+        snapshot_id: id SnapshotBasisPengetahuan (misal Konsultasi.snapshotBasisPengetahuan_id)
+
+    Returns:
+        Objek IndeksAturan
+    """
+    indeks = _indeks_per_snapshot.get(snapshot_id)
+    if indeks is None:
+        indeks = IndeksAturan.dari_snapshot(_baca_snapshot(snapshot_id), snapshot_id=snapshot_id)
+        with _kunci_indeks:
+            indeks = _indeks_per_snapshot.setdefault(snapshot_id, indeks)
+    return indeks
+
+
+def peringkat_kelompok_terdekat(kode_gejala_input, batas=3, snapshot_id=None):
+    """
+    Peringkat kelompok aturan terdekat untuk gejala yang tidak cocok persis
+
+    Args:
+        kode_gejala_input: Iterable kode gejala
+        batas: Jumlah maksimal kelompok yang dikembalikan
+        snapshot_id: Snapshot basis pengetahuan yang dipakai saat diagnosa;
+            None untuk basis pengetahuan terkini
+
+    Returns:
+        List KecocokanParsial
+    """
+    indeks = indeks_snapshot(snapshot_id) if snapshot_id is not None else dapatkan_indeks()
+    return indeks.peringkat(kode_gejala_input, batas=batas)
+
+
+def reset_indeks():
+    """
+    Buang IndeksAturan milik proses ini sehingga akan dikompilasi ulang saat dibutuhkan
+    """
+    global _indeks
+    with _kunci_indeks:
+        _indeks = None
+        _indeks_per_snapshot.clear()
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.27 on 2026-10-17 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_notifikasi_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersiBasisPengetahuan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('versi', models.PositiveBigIntegerField(default=0)),
+                ('token', models.CharField(blank=True, default='', max_length=32)),
+                ('diperbarui', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Versi Basis Pengetahuan',
+            },
+        ),
+    ]
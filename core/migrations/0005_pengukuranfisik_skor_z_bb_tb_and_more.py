@@ -0,0 +1,43 @@
+# Generated by Django 4.2.27 on 2026-10-17 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_versibasispengetahuan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pengukuranfisik',
+            name='skor_Z_BB_TB',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=5, null=True, verbose_name='Z-Score BB/TB'),
+        ),
+        migrations.AddField(
+            model_name='pengukuranfisik',
+            name='skor_Z_IMT_U',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=5, null=True, verbose_name='Z-Score IMT/U'),
+        ),
+        migrations.AddField(
+            model_name='pengukuranfisik',
+            name='skor_Z_LK_U',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=5, null=True, verbose_name='Z-Score LK/U'),
+        ),
+        migrations.AddField(
+            model_name='pengukuranfisik',
+            name='skor_Z_LLA_U',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=5, null=True, verbose_name='Z-Score LLA/U'),
+        ),
+        migrations.AlterField(
+            model_name='pengukuranfisik',
+            name='skor_Z_BB_U',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=5, null=True, verbose_name='Z-Score BB/U'),
+        ),
+        migrations.AlterField(
+            model_name='pengukuranfisik',
+            name='skor_Z_TB_U',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=5, null=True, verbose_name='Z-Score TB/U'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-17 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_pengukuranfisik_skor_z_bb_tb_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notifikasi',
+            index=models.Index(fields=['pasien', 'sudahTerkirim', 'jadwalNotifikasi'], name='notifikasi_belum_dibaca_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.27 on 2026-10-17 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_notifikasi_notifikasi_belum_dibaca_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pasien',
+            index=models.Index(fields=['nama', 'id'], name='pasien_nama_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pengukuranfisik',
+            index=models.Index(fields=['tanggalUkur', 'id'], name='pengukuran_tanggal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pengukuranfisik',
+            index=models.Index(fields=['pasien', 'tanggalUkur'], name='pengukuran_pasien_tanggal_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.27 on 2026-10-17 11:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_pasien_pasien_nama_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TugasPdf',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('jenis', models.CharField(choices=[('riwayat', 'Riwayat Pengukuran'), ('hasil_diagnosa', 'Hasil Diagnosa')], max_length=20)),
+                ('status', models.CharField(choices=[('antri', 'Dalam Antrian'), ('diproses', 'Sedang Diproses'), ('selesai', 'Selesai'), ('gagal', 'Gagal')], default='antri', max_length=10)),
+                ('kunci', models.CharField(blank=True, default='', max_length=64)),
+                ('pesanError', models.TextField(blank=True, default='')),
+                ('dibuat', models.DateTimeField(auto_now_add=True)),
+                ('dimulai', models.DateTimeField(blank=True, null=True)),
+                ('selesai', models.DateTimeField(blank=True, null=True)),
+                ('konsultasi', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.konsultasi')),
+                ('pasien', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.pasien')),
+            ],
+            options={
+                'verbose_name_plural': 'Antrian PDF',
+                'indexes': [models.Index(fields=['status', 'dibuat'], name='tugaspdf_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-17 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_tugaspdf'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pengukuranfisik',
+            name='diperbarui',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
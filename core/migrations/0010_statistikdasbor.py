@@ -0,0 +1,65 @@
+# Generated by Django 4.2.27 on 2026-10-17 12:12
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+
+def isi_statistik_awal(apps, schema_editor):
+    # Sama dengan core.statistik.bangun_ulang_statistik, memakai model historis
+    StatistikDasbor = apps.get_model('core', 'StatistikDasbor')
+    Konsultasi = apps.get_model('core', 'Konsultasi')
+    PengukuranFisik = apps.get_model('core', 'PengukuranFisik')
+
+    baris = [
+        StatistikDasbor(jenis='total', kunci=kunci, jumlah=apps.get_model('core', nama).objects.count())
+        for nama, kunci in (
+            ('Pasien', 'pasien'), ('Konsultasi', 'konsultasi'), ('Gejala', 'gejala'),
+            ('Kondisi', 'kondisi'), ('Aturan', 'aturan'),
+        )
+    ]
+    for data in (
+        Konsultasi.objects.annotate(bulan=TruncMonth('tanggalKonsultasi'))
+        .values('bulan', 'hasilKondisi_id').annotate(jumlah=Count('id')).order_by()
+    ):
+        baris.append(StatistikDasbor(
+            jenis='konsultasi_kondisi', bulan=data['bulan'].date(),
+            kunci=data['hasilKondisi_id'] or '', jumlah=data['jumlah'],
+        ))
+    for data in (
+        PengukuranFisik.objects.filter(skor_Z_TB_U__isnull=False).annotate(bulan=TruncMonth('tanggalUkur'))
+        .values('bulan').annotate(diukur=Count('id'), stunting=Count('id', filter=Q(skor_Z_TB_U__lt=-2))).order_by()
+    ):
+        baris.append(StatistikDasbor(jenis='pengukuran_tb_u', bulan=data['bulan'], kunci='diukur', jumlah=data['diukur']))
+        if data['stunting']:
+            baris.append(StatistikDasbor(jenis='pengukuran_tb_u', bulan=data['bulan'], kunci='stunting', jumlah=data['stunting']))
+    StatistikDasbor.objects.bulk_create(baris)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_pengukuranfisik_diperbarui'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistikDasbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jenis', models.CharField(max_length=30)),
+                ('bulan', models.DateField(blank=True, null=True)),
+                ('kunci', models.CharField(blank=True, default='', max_length=30)),
+                ('jumlah', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Statistik Dasbor',
+                'indexes': [models.Index(fields=['bulan'], name='statistik_dasbor_bulan_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='statistikdasbor',
+            constraint=models.UniqueConstraint(fields=('jenis', 'bulan', 'kunci'), name='statistik_dasbor_unik'),
+        ),
+        migrations.RunPython(isi_statistik_awal, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-17 12:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_statistikdasbor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotBasisPengetahuan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(max_length=64, unique=True)),
+                ('isi', models.BinaryField()),
+                ('dibuat', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Snapshot Basis Pengetahuan',
+            },
+        ),
+        migrations.AddField(
+            model_name='konsultasi',
+            name='snapshotBasisPengetahuan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='core.snapshotbasispengetahuan', verbose_name='Snapshot Basis Pengetahuan'),
+        ),
+        migrations.AddField(
+            model_name='versibasispengetahuan',
+            name='snapshot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.snapshotbasispengetahuan'),
+        ),
+    ]
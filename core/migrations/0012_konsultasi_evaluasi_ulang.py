@@ -0,0 +1,24 @@
+# Generated by Django 4.2.27 on 2026-10-17 12:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_snapshotbasispengetahuan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='konsultasi',
+            name='hasilEvaluasiUlang',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.kondisi', verbose_name='Hasil Evaluasi Ulang'),
+        ),
+        migrations.AddField(
+            model_name='konsultasi',
+            name='snapshotEvaluasiUlang',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.snapshotbasispengetahuan', verbose_name='Snapshot Evaluasi Ulang'),
+        ),
+    ]
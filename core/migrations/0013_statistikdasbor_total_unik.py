@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-17 12:53
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def gabungkan_total_ganda(apps, schema_editor):
+    # Insert pertama yang bersamaan dapat membuat dua baris total; masing-masing menyimpan sebagian penambahan
+    StatistikDasbor = apps.get_model('core', 'StatistikDasbor')
+    total = StatistikDasbor.objects.filter(bulan__isnull=True)
+    for data in total.values('jenis', 'kunci').annotate(jumlah=Sum('jumlah')).order_by():
+        baris = list(total.filter(jenis=data['jenis'], kunci=data['kunci']).order_by('id'))
+        if len(baris) > 1:
+            StatistikDasbor.objects.filter(pk__in=[obj.pk for obj in baris[1:]]).delete()
+            baris[0].jumlah = data['jumlah']
+            baris[0].save(update_fields=['jumlah'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_konsultasi_evaluasi_ulang'),
+    ]
+
+    operations = [
+        migrations.RunPython(gabungkan_total_ganda, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='statistikdasbor',
+            constraint=models.UniqueConstraint(condition=models.Q(('bulan__isnull', True)), fields=('jenis', 'kunci'), name='statistik_dasbor_total_unik'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.27 on 2026-10-17 13:02
+
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def hitung_ulang_per_anak(apps, schema_editor):
+    # Sama dengan core.statistik._rekap_pengukuran: pengukuran TB/U terakhir tiap anak per bulan
+    StatistikDasbor = apps.get_model('core', 'StatistikDasbor')
+    PengukuranFisik = apps.get_model('core', 'PengukuranFisik')
+
+    terakhir = {}
+    for pasien_id, tanggal, skor in (
+        PengukuranFisik.objects.filter(skor_Z_TB_U__isnull=False).order_by('tanggalUkur', 'id')
+        .values_list('pasien_id', 'tanggalUkur', 'skor_Z_TB_U').iterator(chunk_size=2000)
+    ):
+        terakhir[(pasien_id, tanggal.replace(day=1))] = skor
+    rekap = defaultdict(lambda: [0, 0])
+    for (_, bulan), skor in terakhir.items():
+        rekap[bulan][0] += 1
+        rekap[bulan][1] += skor < -2
+
+    StatistikDasbor.objects.filter(jenis='pengukuran_tb_u').delete()
+    baris = []
+    for bulan, (diukur, stunting) in rekap.items():
+        baris.append(StatistikDasbor(jenis='pengukuran_tb_u', bulan=bulan, kunci='diukur', jumlah=diukur))
+        if stunting:
+            baris.append(StatistikDasbor(jenis='pengukuran_tb_u', bulan=bulan, kunci='stunting', jumlah=stunting))
+    StatistikDasbor.objects.bulk_create(baris)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_statistikdasbor_total_unik'),
+    ]
+
+    operations = [
+        migrations.RunPython(hitung_ulang_per_anak, migrations.RunPython.noop),
+    ]
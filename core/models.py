@@ -1,3 +1,4 @@
+import uuid
 from django.db import models
 from django.contrib.auth.models import User # Model Pengguna bawaan Django (untuk Admin/Pakar)
 from django.db.models.signals import post_save
@@ -26,6 +27,10 @@ class Pasien(models.Model):
 
     class Meta:
         verbose_name_plural = "Pasien"
+        indexes = [
+            # Kunci paginasi keyset dan pencarian awalan nama di daftar pasien pakar
+            models.Index(fields=['nama', 'id'], name='pasien_nama_idx'),
+        ]
 
     def __str__(self):
         return f"Pasien: {self.nama} ({self.namaPengguna})"
@@ -95,6 +100,37 @@ class Aturan(models.Model):
     def __str__(self):
         return f"Aturan {self.kodeKelompokAturan}: JIKA {self.gejala.kodeGejala} MAKA {self.kondisi.kodeKondisi}"
 
+class SnapshotBasisPengetahuan(models.Model):
+    # Salinan kelompok aturan yang tidak pernah diubah, dikenali dari hash isinya.
+    # Setiap Konsultasi merujuk snapshot yang dipakai saat diagnosa (lihat core/mesin_inferensi.py).
+    hash = models.CharField(max_length=64, unique=True)
+    # JSON kanonik terkompresi zlib: gejala, nama kondisi dan kelompok aturan berurutan prioritas
+    isi = models.BinaryField()
+    dibuat = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "Snapshot Basis Pengetahuan"
+
+    def __str__(self):
+        return f"Snapshot {self.hash[:12]}"
+
+class VersiBasisPengetahuan(models.Model):
+    # Satu baris penanda versi basis pengetahuan yang dibaca oleh semua worker.
+    # Dinaikkan setiap kali Gejala, Kondisi, atau Aturan berubah (lihat core/signals.py).
+    versi = models.PositiveBigIntegerField(default=0)
+    # Token acak yang diganti setiap kenaikan versi, agar nomor versi yang terpakai
+    # oleh transaksi yang di-rollback tidak dianggap sama dengan versi berikutnya
+    token = models.CharField(max_length=32, blank=True, default='')
+    # Snapshot isi versi ini; dikosongkan saat versi naik dan diisi oleh worker pertama yang mengompilasinya
+    snapshot = models.ForeignKey(SnapshotBasisPengetahuan, on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    diperbarui = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Versi Basis Pengetahuan"
+
+    def __str__(self):
+        return f"Basis Pengetahuan versi {self.versi}"
+
 ## =======================================================
 ## 3. PENCATATAN KONSULTASI (Input/Output Mesin Inferensi)
 ## =======================================================
@@ -105,6 +141,18 @@ class Konsultasi(models.Model):
     
     # Hasil akhir diagnosa (Output Mesin Inferensi)
     hasilKondisi = models.ForeignKey(Kondisi, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Hasil Diagnosa")
+    # Basis pengetahuan yang dipakai saat diagnosa; kosong untuk konsultasi sebelum snapshot ada
+    snapshotBasisPengetahuan = models.ForeignKey(
+        SnapshotBasisPengetahuan, on_delete=models.PROTECT, null=True, blank=True, verbose_name="Snapshot Basis Pengetahuan"
+    )
+    # Hasil diagnosa ulang terhadap aturan yang lebih baru (lihat core/diagnosa_ulang.py); hasilKondisi tidak diubah
+    hasilEvaluasiUlang = models.ForeignKey(
+        Kondisi, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Hasil Evaluasi Ulang"
+    )
+    snapshotEvaluasiUlang = models.ForeignKey(
+        SnapshotBasisPengetahuan, on_delete=models.PROTECT, null=True, blank=True, related_name='+',
+        verbose_name="Snapshot Evaluasi Ulang"
+    )
 
     class Meta:
         verbose_name_plural = "Konsultasi"
@@ -141,12 +189,25 @@ class PengukuranFisik(models.Model):
     imunisasi = models.CharField(max_length=100, blank=True, null=True, verbose_name="Status Imunisasi")
     
     # Kolom untuk menyimpan hasil perhitungan Z-Score
-    skor_Z_BB_U = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="Z-Score BB/U")
-    skor_Z_TB_U = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="Z-Score TB/U")
+    skor_Z_BB_U = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, db_index=True, verbose_name="Z-Score BB/U")
+    skor_Z_TB_U = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, db_index=True, verbose_name="Z-Score TB/U")
+    skor_Z_BB_TB = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, db_index=True, verbose_name="Z-Score BB/TB")
+    skor_Z_IMT_U = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, db_index=True, verbose_name="Z-Score IMT/U")
+    skor_Z_LK_U = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, db_index=True, verbose_name="Z-Score LK/U")
+    skor_Z_LLA_U = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, db_index=True, verbose_name="Z-Score LLA/U")
+    
+    # Waktu perubahan terakhir; dipakai ETag seri pertumbuhan. bulk_update/update() harus mengisinya sendiri.
+    diperbarui = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['tanggalUkur']
         verbose_name_plural = "Pengukuran Fisik"
+        indexes = [
+            # Kunci paginasi keyset daftar pengukuran (tanggalUkur DESC, id DESC)
+            models.Index(fields=['tanggalUkur', 'id'], name='pengukuran_tanggal_idx'),
+            # Riwayat dan filter per pasien diurutkan berdasarkan tanggal
+            models.Index(fields=['pasien', 'tanggalUkur'], name='pengukuran_pasien_tanggal_idx'),
+        ]
     
     def __str__(self):
         return f"Pengukuran {self.pasien.nama} pada {self.tanggalUkur}"
@@ -166,4 +227,87 @@ class Notifikasi(models.Model):
 
     class Meta:
         ordering = ['-jadwalNotifikasi']
-        verbose_name_plural = "Daftar Notifikasi"
\ No newline at end of file
+        verbose_name_plural = "Daftar Notifikasi"
+        indexes = [
+            # Dipakai badge notifikasi: pasien_id = ? AND sudahTerkirim = 0 AND jadwalNotifikasi <= now
+            models.Index(fields=['pasien', 'sudahTerkirim', 'jadwalNotifikasi'], name='notifikasi_belum_dibaca_idx'),
+        ]
+
+## =======================================================
+## 6. ANTRIAN LAPORAN PDF
+## =======================================================
+
+class TugasPdf(models.Model):
+    # Antrian render PDF di latar belakang (dikerjakan oleh `manage.py run_pdf_worker`).
+    # Memakai tabel database sehingga tidak membutuhkan broker eksternal.
+    JENIS_RIWAYAT = 'riwayat'
+    JENIS_HASIL_DIAGNOSA = 'hasil_diagnosa'
+    PILIHAN_JENIS = [
+        (JENIS_RIWAYAT, 'Riwayat Pengukuran'),
+        (JENIS_HASIL_DIAGNOSA, 'Hasil Diagnosa'),
+    ]
+
+    STATUS_ANTRI = 'antri'
+    STATUS_DIPROSES = 'diproses'
+    STATUS_SELESAI = 'selesai'
+    STATUS_GAGAL = 'gagal'
+    PILIHAN_STATUS = [
+        (STATUS_ANTRI, 'Dalam Antrian'),
+        (STATUS_DIPROSES, 'Sedang Diproses'),
+        (STATUS_SELESAI, 'Selesai'),
+        (STATUS_GAGAL, 'Gagal'),
+    ]
+
+    # UUID agar tautan status/unduhan tidak bisa ditebak
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    jenis = models.CharField(max_length=20, choices=PILIHAN_JENIS)
+    pasien = models.ForeignKey(Pasien, on_delete=models.CASCADE)
+    konsultasi = models.ForeignKey(Konsultasi, on_delete=models.CASCADE, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=PILIHAN_STATUS, default=STATUS_ANTRI)
+
+    # Sidik jari laporan yang dihasilkan (kunci berkas di cache PDF)
+    kunci = models.CharField(max_length=64, blank=True, default='')
+    pesanError = models.TextField(blank=True, default='')
+    dibuat = models.DateTimeField(auto_now_add=True)
+    dimulai = models.DateTimeField(null=True, blank=True)
+    selesai = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Antrian PDF"
+        indexes = [
+            # Worker mengambil tugas tertua berstatus 'antri'
+            models.Index(fields=['status', 'dibuat'], name='tugaspdf_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"PDF {self.get_jenis_display()} {self.pasien.nama} ({self.get_status_display()})"
+
+
+## =======================================================
+## 7. STATISTIK DASBOR PAKAR
+## =======================================================
+
+class StatistikDasbor(models.Model):
+    # Tabel rekap yang diperbarui bertahap oleh sinyal (lihat core/statistik.py),
+    # sehingga dasbor pakar tidak perlu COUNT(*) pada tabel Konsultasi dan Pengukuran.
+    jenis = models.CharField(max_length=30)
+    # Awal bulan untuk rekap bulanan; kosong untuk total keseluruhan
+    bulan = models.DateField(null=True, blank=True)
+    kunci = models.CharField(max_length=30, blank=True, default='')
+    jumlah = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Statistik Dasbor"
+        constraints = [
+            models.UniqueConstraint(fields=['jenis', 'bulan', 'kunci'], name='statistik_dasbor_unik'),
+            # NULL tidak pernah sama di indeks unik, sehingga baris total (bulan kosong) perlu constraint sendiri
+            models.UniqueConstraint(
+                fields=['jenis', 'kunci'], condition=models.Q(bulan__isnull=True), name='statistik_dasbor_total_unik'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['bulan'], name='statistik_dasbor_bulan_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.jenis} {self.bulan or ''} {self.kunci}: {self.jumlah}"
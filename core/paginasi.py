@@ -0,0 +1,187 @@
+"""
+Paginasi Keyset (Seek) untuk Daftar Panel Pakar
+
+Halaman tidak dipilih dengan OFFSET, melainkan dengan kursor berisi nilai
+kunci urutan baris terakhir/pertama halaman sebelumnya:
+
+    WHERE (tanggalUkur, id) < (:tanggal, :id) ORDER BY tanggalUkur DESC, id DESC LIMIT n
+
+Biaya setiap halaman tetap (satu index seek + n baris) berapa pun jumlah
+datanya. Kunci urutan harus unik (selalu akhiri dengan primary key) agar
+tidak ada baris yang terlewat atau muncul dua kali.
+"""
+import base64
+import binascii
+import json
+import operator
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+UKURAN_HALAMAN = 50
+UKURAN_HALAMAN_MAKS = 200
+
+
+class HalamanKeyset:
+    """
+    Satu halaman hasil paginasi keyset
+
+    Attributes:
+        object_list: Baris pada halaman ini
+        url_berikutnya: Query string halaman berikutnya, atau None
+        url_sebelumnya: Query string halaman sebelumnya, atau None
+        ukuran: Jumlah baris maksimal per halaman
+    """
+
+    def __init__(self, object_list, url_berikutnya, url_sebelumnya, ukuran):
+        self.object_list = object_list
+        self.url_berikutnya = url_berikutnya
+        self.url_sebelumnya = url_sebelumnya
+        self.ukuran = ukuran
+
+    @property
+    def has_next(self):
+        return self.url_berikutnya is not None
+
+    @property
+    def has_previous(self):
+        return self.url_sebelumnya is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def encode_kursor(nilai):
+    data = json.dumps(nilai, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_kursor(kursor, model, urutan):
+    """
+    Baca kursor dari query string dan ubah setiap nilai ke tipe field kuncinya
+
+    Args:
+        kursor: Nilai parameter GET `setelah`/`sebelum`
+        model: Model yang dipaginasi
+        urutan: List kunci urutan yang dipakai paginasi_keyset
+
+    Returns:
+        List nilai kunci, atau None jika kursor kosong/rusak (dianggap halaman pertama)
+    """
+    if not kursor:
+        return None
+    try:
+        nilai = json.loads(base64.urlsafe_b64decode(kursor + '=' * (-len(kursor) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(nilai, list) or len(nilai) != len(urutan):
+        return None
+    # Kursor buatan tangan (misal tanggal tidak sah) tidak boleh sampai ke query sebagai 500
+    try:
+        nilai = [model._meta.get_field(_nama_field(kunci)).to_python(v) for kunci, v in zip(urutan, nilai)]
+    except (ValidationError, TypeError, ValueError):
+        return None
+    if any(v is None for v in nilai):
+        return None
+    return nilai
+
+
+def _nama_field(kunci):
+    return kunci.lstrip('-')
+
+
+def _balik_urutan(urutan):
+    return [kunci[1:] if kunci.startswith('-') else f'-{kunci}' for kunci in urutan]
+
+
+def _filter_setelah(urutan, nilai):
+    # (a, b) > (x, y)  ==>  a > x OR (a = x AND b > y), arah per kolom mengikuti urutan
+    kondisi = []
+    sama = Q()
+    for kunci, v in zip(urutan, nilai):
+        lookup = 'lt' if kunci.startswith('-') else 'gt'
+        kondisi.append(sama & Q(**{f'{_nama_field(kunci)}__{lookup}': v}))
+        sama &= Q(**{_nama_field(kunci): v})
+    return reduce(operator.or_, kondisi)
+
+
+def _nilai_kunci(obj, urutan):
+    return [getattr(obj, _nama_field(kunci)) for kunci in urutan]
+
+
+def paginasi_keyset(queryset, urutan, setelah=None, sebelum=None, ukuran=UKURAN_HALAMAN):
+    """
+    Ambil satu halaman queryset dengan paginasi keyset
+
+    Args:
+        queryset: QuerySet yang sudah difilter
+        urutan: List kunci urutan unik, misal ['-tanggalUkur', '-id']
+        setelah: Nilai kunci baris terakhir halaman sebelumnya (maju)
+        sebelum: Nilai kunci baris pertama halaman berikutnya (mundur)
+        ukuran: Jumlah baris per halaman
+
+    Returns:
+        Tuple (list baris, kursor berikutnya, kursor sebelumnya); kursor None jika tidak ada
+    """
+    if sebelum is not None:
+        urutan_balik = _balik_urutan(urutan)
+        baris = list(queryset.filter(_filter_setelah(urutan_balik, sebelum)).order_by(*urutan_balik)[:ukuran + 1])
+        ada_sebelumnya = len(baris) > ukuran
+        baris = baris[:ukuran][::-1]
+        ada_berikutnya = True
+    else:
+        if setelah is not None:
+            queryset = queryset.filter(_filter_setelah(urutan, setelah))
+        baris = list(queryset.order_by(*urutan)[:ukuran + 1])
+        ada_berikutnya = len(baris) > ukuran
+        baris = baris[:ukuran]
+        ada_sebelumnya = setelah is not None
+
+    if not baris:
+        return baris, None, None
+    kursor_berikutnya = encode_kursor(_nilai_kunci(baris[-1], urutan)) if ada_berikutnya else None
+    kursor_sebelumnya = encode_kursor(_nilai_kunci(baris[0], urutan)) if ada_sebelumnya else None
+    return baris, kursor_berikutnya, kursor_sebelumnya
+
+
+def halaman_dari_request(request, queryset, urutan):
+    """
+    Paginasi keyset berdasarkan parameter GET `setelah`, `sebelum` dan `ukuran`
+
+    Parameter filter lain di query string dipertahankan pada tautan halaman.
+
+    Returns:
+        Objek HalamanKeyset
+    """
+    try:
+        ukuran = int(request.GET.get('ukuran', UKURAN_HALAMAN))
+    except ValueError:
+        ukuran = UKURAN_HALAMAN
+    ukuran = max(1, min(ukuran, UKURAN_HALAMAN_MAKS))
+
+    setelah = decode_kursor(request.GET.get('setelah'), queryset.model, urutan)
+    sebelum = decode_kursor(request.GET.get('sebelum'), queryset.model, urutan)
+    baris, kursor_berikutnya, kursor_sebelumnya = paginasi_keyset(
+        queryset, urutan, setelah=setelah, sebelum=sebelum, ukuran=ukuran
+    )
+
+    def url_dengan(nama, kursor):
+        if kursor is None:
+            return None
+        params = request.GET.copy()
+        params.pop('setelah', None)
+        params.pop('sebelum', None)
+        params[nama] = kursor
+        return f'?{params.urlencode()}'
+
+    return HalamanKeyset(
+        baris,
+        url_dengan('setelah', kursor_berikutnya),
+        url_dengan('sebelum', kursor_sebelumnya),
+        ukuran,
+    )
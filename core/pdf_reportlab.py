@@ -0,0 +1,247 @@
+"""
+Mesin PDF ReportLab - Gambar Laporan Langsung dengan Platypus
+
+Alternatif untuk jalur HTML -> CSS -> PDF xhtml2pdf. Laporan disusun langsung
+dari data model sebagai flowable platypus, sehingga tidak ada parsing HTML/CSS
+per dokumen. Isi dan tata letak mengikuti template di templates/pdf/ agar kedua
+mesin menghasilkan laporan yang setara; perubahan isi laporan harus dilakukan
+di kedua tempat.
+
+Dipilih dengan settings.PDF_ENGINE = 'reportlab' (lihat laporan_pdf.render_pdf).
+"""
+from io import BytesIO
+
+from django.utils import timezone
+from django.utils.html import escape
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+GAYA_TEKS = ParagraphStyle('teks', fontName='Helvetica', fontSize=10, leading=13)
+GAYA_JUDUL = ParagraphStyle('judul', parent=GAYA_TEKS, fontName='Helvetica-Bold', fontSize=16, leading=20, alignment=TA_CENTER)
+GAYA_SUBJUDUL = ParagraphStyle('subjudul', parent=GAYA_JUDUL, fontSize=13, leading=17)
+GAYA_SEL = ParagraphStyle('sel', parent=GAYA_TEKS, alignment=TA_CENTER)
+GAYA_KAKI = ParagraphStyle('kaki', parent=GAYA_TEKS, fontSize=8, alignment=TA_CENTER)
+
+TANDA_TANGAN = '<br/><br/><br/><br/><br/>(___________________________)'
+
+REKOMENDASI = {
+    'Normal': [
+        'Pertahankan pola asuh dan asupan gizi yang baik',
+        'Lanjutkan pemberian ASI eksklusif sampai usia 6 bulan',
+        'Berikan MP-ASI yang bergizi seimbang mulai usia 6 bulan',
+        'Jaga kebersihan dan lakukan stimulasi tumbuh kembang secara rutin',
+        'Lakukan pengukuran pertumbuhan secara berkala setiap bulan',
+    ],
+    'Risiko Stunting': [
+        'Segera konsultasikan dengan tenaga kesehatan terdekat',
+        'Tingkatkan frekuensi dan kualitas pemberian makan',
+        'Berikan suplemen gizi sesuai anjuran dokter',
+        'Pastikan anak mendapat ASI eksklusif dan MP-ASI yang cukup',
+        'Pantau pertumbuhan anak secara intensif setiap 2 minggu sekali',
+    ],
+    None: [
+        'Segera bawa anak ke fasilitas kesehatan untuk penanganan lebih lanjut',
+        'Ikuti program intervensi gizi khusus dari tenaga kesehatan',
+        'Berikan makanan tambahan dengan kualitas dan kuantitas yang lebih tinggi',
+        'Pastikan anak mendapat suplemen gizi dan vitamin sesuai rekomendasi',
+        'Lakukan monitoring tumbuh kembang secara ketat bersama tenaga kesehatan',
+    ],
+}
+
+# (latar, teks, garis) kotak hasil diagnosis, sama dengan kelas status-* di template
+WARNA_STATUS = {
+    'Normal': ('#d4edda', '#155724', '#c3e6cb'),
+    'Risiko Stunting': ('#fff3cd', '#856404', '#ffeaa7'),
+    None: ('#f8d7da', '#721c24', '#f5c6cb'),
+}
+
+
+def _p(teks, gaya=GAYA_TEKS):
+    return Paragraph(teks, gaya)
+
+
+def _tanggal(nilai):
+    return nilai.strftime('%d/%m/%Y') if nilai else ''
+
+
+def _zscore(nilai):
+    return f'{nilai:.2f}' if nilai else '-'
+
+
+def _status_gizi(pengukuran):
+    # Urutan cabang sengaja sama dengan template riwayat_pengukuran_pdf.html
+    bb_u, tb_u = pengukuran.skor_Z_BB_U, pengukuran.skor_Z_TB_U
+    if not (bb_u and tb_u):
+        return 'Belum Dihitung'
+    if bb_u > -2 and tb_u > -2:
+        return 'Normal'
+    return 'Risiko Stunting'
+
+
+def _kop(judul):
+    kop = Table(
+        [[_p(judul, GAYA_JUDUL)], [_p('Sistem Diagnosis Stunting', GAYA_SUBJUDUL)]],
+        colWidths=['100%']
+    )
+    kop.setStyle(TableStyle([('LINEBELOW', (0, -1), (-1, -1), 2, colors.black)]))
+    return [kop, Spacer(1, 0.5 * cm)]
+
+
+def _tabel_info(baris, lebar_kolom):
+    tabel = Table(baris, colWidths=lebar_kolom, hAlign='LEFT')
+    tabel.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 2),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ]))
+    return tabel
+
+
+def _tanda_tangan(pembuka):
+    tabel = Table([[_p(pembuka + TANDA_TANGAN, GAYA_SEL)]], colWidths=[8 * cm], hAlign='RIGHT')
+    tabel.setStyle(TableStyle([('TOPPADDING', (0, 0), (-1, -1), 30)]))
+    return [Spacer(1, cm), tabel]
+
+
+def _bangun(story, margin, kaki=None):
+    hasil = BytesIO()
+    dokumen = SimpleDocTemplate(
+        hasil, pagesize=A4,
+        leftMargin=margin[1], rightMargin=margin[1], topMargin=margin[0], bottomMargin=margin[0],
+    )
+
+    def gambar_kaki(canvas, doc):
+        if kaki:
+            canvas.saveState()
+            canvas.setFont('Helvetica', 8)
+            canvas.drawCentredString(A4[0] / 2, margin[0] / 2, kaki(doc.page))
+            canvas.restoreState()
+
+    dokumen.build(story, onFirstPage=gambar_kaki, onLaterPages=gambar_kaki)
+    return hasil.getvalue()
+
+
+def render_riwayat(context):
+    """
+    Gambar laporan riwayat pengukuran (setara pdf/riwayat_pengukuran_pdf.html)
+
+    Args:
+        context: dict dengan 'pasien' dan 'pengukuran_list'
+
+    Returns:
+        Bytes PDF
+    """
+    pasien = context['pasien']
+    pengukuran_list = context['pengukuran_list']
+    sekarang = timezone.localtime()
+
+    story = _kop('LAPORAN RIWAYAT PENGUKURAN PERTUMBUHAN')
+    story.append(_tabel_info([
+        [_p(f'<b>Nama Anak:</b> {escape(pasien.nama)}'), _p(f'<b>Tanggal Lahir:</b> {_tanggal(pasien.tanggalLahir)}')],
+        [_p(f'<b>Jenis Kelamin:</b> {pasien.get_jenisKelamin_display()}'), _p(f'<b>Usia Saat Ini:</b> {pasien.usia_sekarang} bulan')],
+        [_p(f'<b>Nama Orang Tua:</b> {escape(pasien.namaWali or "")}'), _p(f'<b>Tanggal Cetak:</b> {sekarang:%d/%m/%Y}')],
+    ], ['50%', '50%']))
+    story.append(Spacer(1, 0.5 * cm))
+
+    if pengukuran_list:
+        header = ['No', 'Tanggal Pengukuran', 'Berat Badan (kg)', 'Tinggi Badan (cm)',
+                  'Z-Score BB/U', 'Z-Score TB/U', 'Status Gizi']
+        data = [[_p(f'<b>{judul}</b>', GAYA_SEL) for judul in header]]
+        for nomor, pengukuran in enumerate(pengukuran_list, start=1):
+            data.append([
+                str(nomor),
+                _tanggal(pengukuran.tanggalUkur),
+                str(pengukuran.beratBadan),
+                str(pengukuran.tinggiBadan),
+                _zscore(pengukuran.skor_Z_BB_U),
+                _zscore(pengukuran.skor_Z_TB_U),
+                _status_gizi(pengukuran),
+            ])
+        lebar = A4[0] - 2 * cm
+        tabel = Table(data, colWidths=[lebar * persen for persen in (.05, .25, .12, .12, .12, .12, .22)], repeatRows=1)
+        tabel.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f2f2f2')),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]))
+        story.append(tabel)
+    else:
+        story.append(_p('Tidak ada data pengukuran tersedia.'))
+
+    story.extend(_tanda_tangan('Mengetahui,'))
+    return _bangun(story, (1 * cm, 1 * cm), kaki=lambda halaman: f'Dicetak pada {sekarang:%d/%m/%Y %H:%M}')
+
+
+def render_hasil_diagnosa(context):
+    """
+    Gambar surat keterangan hasil diagnosis (setara pdf/hasil_diagnosa_pdf.html)
+
+    Args:
+        context: dict dengan 'konsultasi' (pasien dan hasilKondisi ter-select_related)
+
+    Returns:
+        Bytes PDF
+    """
+    konsultasi = context['konsultasi']
+    pasien = konsultasi.pasien
+    kondisi = konsultasi.hasilKondisi
+    sekarang = timezone.localtime()
+    # Template HTML membaca atribut yang sama; bila tidak ada, hasilnya teks kosong
+    hasil_diagnosis = getattr(konsultasi, 'hasilDiagnosis', '') or ''
+    catatan = getattr(konsultasi, 'catatan', '') or ''
+    kategori = hasil_diagnosis if hasil_diagnosis in REKOMENDASI else None
+
+    story = _kop('SURAT KETERANGAN HASIL DIAGNOSIS STUNTING')
+    story.append(_p('<u><b>SURAT KETERANGAN</b></u>', GAYA_SUBJUDUL))
+    story.append(Spacer(1, 0.5 * cm))
+
+    info = _tabel_info([
+        [_p('<b>Nama Anak:</b>'), _p(escape(pasien.nama)), _p('<b>Tanggal Lahir:</b>'), _p(_tanggal(pasien.tanggalLahir))],
+        [_p('<b>Jenis Kelamin:</b>'), _p(pasien.get_jenisKelamin_display()), _p('<b>Usia:</b>'), _p(f'{pasien.usia_sekarang} bulan')],
+        [_p('<b>Nama Orang Tua:</b>'), _p(escape(pasien.namaWali or '')),
+         _p('<b>Tanggal Diagnosis:</b>'), _p(_tanggal(timezone.localtime(konsultasi.tanggalKonsultasi)))],
+    ], ['20%', '30%', '22%', '28%'])
+    info.setStyle(TableStyle([('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f5f5f5'))]))
+    story.extend([info, Spacer(1, 0.5 * cm)])
+
+    latar, warna_teks, garis = WARNA_STATUS[kategori]
+    gaya_hasil = ParagraphStyle('hasil', parent=GAYA_SEL, textColor=colors.HexColor(warna_teks))
+    nama_kondisi = escape(kondisi.namaKondisi) if kondisi else ''
+    kotak = Table([
+        [_p('<b>HASIL DIAGNOSIS</b>', gaya_hasil)],
+        [_p(f'<b>{escape(hasil_diagnosis)}</b>', ParagraphStyle('status', parent=gaya_hasil, fontSize=16, leading=20))],
+        [_p('Berdasarkan hasil analisis sistem pakar, kondisi pertumbuhan anak saat ini adalah '
+            f'<b>{nama_kondisi}</b>.', gaya_hasil)],
+    ], colWidths=['100%'])
+    kotak.setStyle(TableStyle([
+        ('BOX', (0, 0), (-1, -1), 2, colors.HexColor(garis)),
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor(latar)),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    story.extend([kotak, Spacer(1, 0.5 * cm)])
+
+    story.append(_p('<b>REKOMENDASI</b>'))
+    story.append(ListFlowable(
+        [ListItem(_p(teks), leftIndent=15) for teks in REKOMENDASI[kategori]],
+        bulletType='bullet', start='•', leftIndent=15,
+    ))
+    story.append(Spacer(1, 0.5 * cm))
+    story.append(_p('<b>CATATAN MEDIS</b>'))
+    story.append(_p(escape(catatan)))
+
+    story.extend(_tanda_tangan('Dokter/Petugas Kesehatan,'))
+    return _bangun(
+        story, (2.5 * cm, 1.5 * cm),
+        kaki=lambda halaman: f'Dicetak pada {sekarang:%d/%m/%Y %H:%M} | Halaman {halaman}'
+    )
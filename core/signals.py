@@ -0,0 +1,65 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Gejala, Kondisi, Aturan, Notifikasi
+from .mesin_inferensi import naikkan_versi_basis_pengetahuan
+from .statistik import (
+    MODEL_BERNILAI, MODEL_STATISTIK, bulan_pengukuran, hitung_ulang_bulan_pengukuran, kontribusi,
+    perbarui_statistik, pindahkan_kondisi_terhapus,
+)
+from .utils import reset_cache_notifikasi
+
+# Setiap perubahan basis pengetahuan (view pakar, admin Jazzmin, management command)
+# menaikkan versi agar indeks aturan di semua worker dikompilasi ulang.
+# Catatan: bulk_create dan QuerySet.update tidak memicu sinyal ini,
+# bungkus operasi tersebut dengan mesin_inferensi.perubahan_massal().
+
+@receiver(post_save, sender=Gejala)
+@receiver(post_save, sender=Kondisi)
+@receiver(post_save, sender=Aturan)
+@receiver(post_delete, sender=Gejala)
+@receiver(post_delete, sender=Kondisi)
+@receiver(post_delete, sender=Aturan)
+def basis_pengetahuan_berubah(sender, **kwargs):
+    naikkan_versi_basis_pengetahuan()
+
+
+# Notifikasi yang diubah lewat admin atau kode lain juga harus langsung terlihat di badge
+@receiver(post_save, sender=Notifikasi)
+@receiver(post_delete, sender=Notifikasi)
+def notifikasi_berubah(sender, instance, **kwargs):
+    reset_cache_notifikasi(instance.pasien_id)
+
+
+# Statistik dasbor pakar diperbarui bertahap (lihat core/statistik.py).
+# Keadaan lama dibaca sebelum disimpan karena sumbangannya bergantung pada nilai field.
+def statistik_sebelum_simpan(sender, instance, raw=False, **kwargs):
+    instance._kontribusi_lama = None
+    instance._bulan_lama = set()
+    if not raw and instance.pk is not None:
+        lama = sender.objects.filter(pk=instance.pk).first()
+        instance._kontribusi_lama = kontribusi(lama) if lama else []
+        instance._bulan_lama = bulan_pengukuran(lama) if lama else set()
+
+
+def statistik_setelah_simpan(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        perbarui_statistik([], kontribusi(instance))
+    elif sender in MODEL_BERNILAI and instance._kontribusi_lama is not None:
+        perbarui_statistik(instance._kontribusi_lama, kontribusi(instance))
+    hitung_ulang_bulan_pengukuran(bulan_pengukuran(instance) | getattr(instance, '_bulan_lama', set()))
+
+
+def statistik_setelah_hapus(sender, instance, **kwargs):
+    perbarui_statistik(kontribusi(instance), [])
+    hitung_ulang_bulan_pengukuran(bulan_pengukuran(instance))
+    if sender is Kondisi:
+        pindahkan_kondisi_terhapus(instance.kodeKondisi)
+
+
+for model in MODEL_BERNILAI:
+    pre_save.connect(statistik_sebelum_simpan, sender=model, dispatch_uid=f'statistik_pre_save_{model.__name__}')
+for model in MODEL_STATISTIK:
+    post_save.connect(statistik_setelah_simpan, sender=model, dispatch_uid=f'statistik_post_save_{model.__name__}')
+    post_delete.connect(statistik_setelah_hapus, sender=model, dispatch_uid=f'statistik_post_delete_{model.__name__}')
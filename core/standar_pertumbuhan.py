@@ -0,0 +1,242 @@
+"""
+Mesin Z-Score Standar Pertumbuhan Anak WHO 2006 (metode LMS)
+
+Tabel LMS WHO Child Growth Standards (core/data/who/, tabel harian 0-1826 hari
+dari paket igrowup WHO) dimuat sekali per proses ke dalam array NumPy kontigu
+berdimensi (jenis kelamin, indeks umur). Z-score dapat dihitung untuk satu
+nilai atau seluruh array sekaligus tanpa menyentuh database.
+
+Tabel BB/PB dan BB/TB berindeks panjang/tinggi badan (langkah 0.1 cm). Tabel
+lingkar kepala hanya tersedia per bulan sehingga indeksnya dikonversi ke hari
+(1 bulan = 30.4375 hari) dan diinterpolasi linear seperti tabel lainnya.
+
+Rumus LMS:
+    z = ((y / M) ** L - 1) / (L * S)        jika L != 0
+    z = ln(y / M) / S                       jika L == 0
+
+Untuk indikator berbasis berat, WHO menerapkan "restricted application of the
+LMS method": di luar ±3 SD, z-score dihitung linear terhadap jarak antara
+SD2 dan SD3 agar ekor distribusi yang miring tidak menghasilkan z ekstrem.
+"""
+import csv
+import os
+from functools import lru_cache
+
+import numpy as np
+
+DIREKTORI_TABEL = os.path.join(os.path.dirname(__file__), 'data', 'who')
+
+# Baris 0 = Laki-laki, baris 1 = Perempuan (sesuai pilihan Pasien.jenisKelamin)
+JENIS_KELAMIN = ('L', 'P')
+
+# indikator -> (nama berkas tabel, pakai restricted LMS di luar ±3 SD)
+INDIKATOR = {
+    'bb_u': ('wfa', True),     # Berat Badan menurut Umur
+    'tb_u': ('lhfa', False),   # Panjang/Tinggi Badan menurut Umur
+    'bb_pb': ('wfl', True),    # Berat Badan menurut Panjang Badan (45-110 cm)
+    'bb_tb': ('wfh', True),    # Berat Badan menurut Tinggi Badan (65-120 cm)
+    'imt_u': ('bmi', True),    # Indeks Massa Tubuh menurut Umur
+    'lk_u': ('hcfa', False),   # Lingkar Kepala menurut Umur
+    'lla_u': ('acfa', True),   # Lingkar Lengan Atas menurut Umur (mulai 3 bulan)
+}
+
+# Batas z-score yang secara biologis tidak wajar menurut WHO (flag data)
+BATAS_WAJAR = {
+    'bb_u': (-6.0, 5.0),
+    'tb_u': (-6.0, 6.0),
+    'bb_pb': (-5.0, 5.0),
+    'bb_tb': (-5.0, 5.0),
+    'imt_u': (-5.0, 5.0),
+    'lk_u': (-5.0, 5.0),
+    'lla_u': (-5.0, 5.0),
+}
+
+# Di bawah umur ini (24 bulan) anak diukur berbaring: BB/TB memakai tabel BB/PB
+BATAS_UMUR_PANJANG_BADAN = 731
+
+
+class TabelLMS:
+    """
+    Tabel LMS satu indikator dengan indeks berjarak seragam (hari atau cm)
+
+    Attributes:
+        x0: Nilai indeks pertama (misal 0 hari atau 45.0 cm)
+        langkah: Jarak antar indeks (1 hari atau 0.1 cm)
+        L, M, S: Array float64 kontigu berbentuk (2, jumlah_indeks)
+        dibatasi: True jika z-score di luar ±3 SD memakai restricted LMS
+    """
+
+    def __init__(self, x0, langkah, L, M, S, dibatasi):
+        self.x0 = x0
+        self.langkah = langkah
+        self.L = np.ascontiguousarray(L, dtype=np.float64)
+        self.M = np.ascontiguousarray(M, dtype=np.float64)
+        self.S = np.ascontiguousarray(S, dtype=np.float64)
+        self.dibatasi = dibatasi
+
+    @property
+    def x_maks(self):
+        return self.x0 + self.langkah * (self.L.shape[1] - 1)
+
+    def lms(self, jk, x):
+        """
+        Ambil nilai L, M, S dengan interpolasi linear antar indeks tabel
+
+        Args:
+            jk: Array indeks jenis kelamin (0 = L, 1 = P)
+            x: Array umur (hari) atau panjang/tinggi (cm)
+
+        Returns:
+            Tuple array (L, M, S); NaN untuk x di luar jangkauan tabel
+        """
+        x = np.asarray(x, dtype=np.float64)
+        n = self.L.shape[1]
+        posisi = np.round((x - self.x0) / self.langkah, 9)
+        valid = (posisi >= 0) & (posisi <= n - 1)
+        posisi = np.where(valid, posisi, 0.0)
+
+        i0 = np.minimum(np.floor(posisi).astype(np.intp), n - 2)
+        frac = posisi - i0
+        hasil = []
+        for tabel in (self.L, self.M, self.S):
+            nilai = tabel[jk, i0] * (1 - frac) + tabel[jk, i0 + 1] * frac
+            hasil.append(np.where(valid, nilai, np.nan))
+        return tuple(hasil)
+
+    def zscore(self, jk, x, y):
+        """
+        Hitung z-score nilai pengukuran y pada indeks x
+
+        Returns:
+            Array z-score; NaN jika x di luar tabel atau y tidak valid
+        """
+        L, M, S = self.lms(jk, x)
+        y = np.asarray(y, dtype=np.float64)
+        y = np.where(y > 0, y, np.nan)
+        return _zscore_lms(y, L, M, S, self.dibatasi)
+
+
+def _nilai_sd(L, M, S, k):
+    # Nilai pengukuran pada k SD: M * (1 + L*S*k) ** (1/L), atau M * exp(S*k) jika L == 0
+    L_aman = np.where(L == 0, 1.0, L)
+    return np.where(L == 0, M * np.exp(S * k), M * (1 + L_aman * S * k) ** (1 / L_aman))
+
+
+def _zscore_lms(y, L, M, S, dibatasi):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        L_aman = np.where(L == 0, 1.0, L)
+        z = np.where(L == 0, np.log(y / M) / S, ((y / M) ** L_aman - 1) / (L_aman * S))
+
+        if dibatasi:
+            sd3 = _nilai_sd(L, M, S, 3)
+            sd2 = _nilai_sd(L, M, S, 2)
+            sd3_neg = _nilai_sd(L, M, S, -3)
+            sd2_neg = _nilai_sd(L, M, S, -2)
+            z = np.where(z > 3, 3 + (y - sd3) / (sd3 - sd2), z)
+            z = np.where(z < -3, -3 + (y - sd3_neg) / (sd2_neg - sd3_neg), z)
+    return z
+
+
+@lru_cache(maxsize=None)
+def muat_tabel(indikator):
+    """
+    Muat tabel LMS satu indikator dari CSV ke array NumPy (sekali per proses)
+
+    Args:
+        indikator: Kunci pada INDIKATOR (misal 'bb_u')
+
+    Returns:
+        Objek TabelLMS
+    """
+    nama_berkas, dibatasi = INDIKATOR[indikator]
+    per_jk = {jk: [] for jk in JENIS_KELAMIN}
+    with open(os.path.join(DIREKTORI_TABEL, f'{nama_berkas}.csv'), newline='') as f:
+        reader = csv.reader(f)
+        next(reader)  # header: jenis_kelamin, indeks, l, m, s
+        for jk, x, l, m, s in reader:
+            per_jk[jk].append((float(x), float(l), float(m), float(s)))
+
+    data = np.array([per_jk[jk] for jk in JENIS_KELAMIN], dtype=np.float64)
+    x = data[0, :, 0]
+    langkah = round(float(x[1] - x[0]), 6)
+    if not np.allclose(np.diff(x), langkah) or not np.array_equal(x, data[1, :, 0]):
+        raise ValueError(f"Indeks tabel WHO {nama_berkas} tidak berjarak seragam")
+
+    return TabelLMS(float(x[0]), langkah, data[:, :, 1], data[:, :, 2], data[:, :, 3], dibatasi)
+
+
+def indeks_jenis_kelamin(jenis_kelamin):
+    """
+    Ubah 'L'/'P' (skalar atau array) menjadi indeks baris tabel (0/1)
+    """
+    return (np.asarray(jenis_kelamin) == 'P').astype(np.intp)
+
+
+def hitung_zscore(indikator, jenis_kelamin, indeks, nilai):
+    """
+    Hitung z-score WHO untuk satu nilai atau array nilai
+
+    Args:
+        indikator: Kunci pada INDIKATOR, misal 'bb_u' (nilai = berat kg)
+        jenis_kelamin: 'L'/'P' atau array-nya
+        indeks: Umur dalam hari, atau panjang/tinggi badan (cm) untuk 'bb_pb'/'bb_tb'
+        nilai: Hasil pengukuran (skalar atau array)
+
+    Returns:
+        float (untuk input skalar) atau array float64; NaN bila indeks di luar
+        jangkauan tabel (misal umur > 1826 hari) atau nilai tidak valid
+    """
+    tabel = muat_tabel(indikator)
+    z = tabel.zscore(indeks_jenis_kelamin(jenis_kelamin), indeks, nilai)
+    return float(z) if np.ndim(z) == 0 else z
+
+
+def hitung_semua_zscore(jenis_kelamin, umur_hari, berat, tinggi, lingkar_kepala=None, lingkar_lengan=None):
+    """
+    Hitung seluruh indikator antropometri dalam satu lintasan array
+
+    Args:
+        jenis_kelamin: Array 'L'/'P'
+        umur_hari: Array umur dalam hari
+        berat: Array berat badan (kg)
+        tinggi: Array panjang/tinggi badan (cm)
+        lingkar_kepala: Array lingkar kepala (cm), NaN jika tidak diukur
+        lingkar_lengan: Array lingkar lengan atas (cm), NaN jika tidak diukur
+
+    Returns:
+        dict indikator ('bb_u', 'tb_u', 'bb_tb', 'imt_u', 'lk_u', 'lla_u') -> array z-score
+    """
+    jk = indeks_jenis_kelamin(jenis_kelamin)
+    umur_hari = np.asarray(umur_hari, dtype=np.float64)
+    berat = np.asarray(berat, dtype=np.float64)
+    tinggi = np.asarray(tinggi, dtype=np.float64)
+    kosong = np.full(np.shape(umur_hari), np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        imt = berat / (tinggi / 100) ** 2
+
+    # BB/TB tidak bergantung umur, tetapi standar WHO hanya berlaku untuk balita
+    dalam_jangkauan_umur = (umur_hari >= 0) & (umur_hari <= muat_tabel('bb_u').x_maks)
+    berbaring = umur_hari < BATAS_UMUR_PANJANG_BADAN
+    bb_tb = np.where(
+        berbaring,
+        muat_tabel('bb_pb').zscore(jk, tinggi, berat),
+        muat_tabel('bb_tb').zscore(jk, tinggi, berat),
+    )
+    return {
+        'bb_u': muat_tabel('bb_u').zscore(jk, umur_hari, berat),
+        'tb_u': muat_tabel('tb_u').zscore(jk, umur_hari, tinggi),
+        'bb_tb': np.where(dalam_jangkauan_umur, bb_tb, np.nan),
+        'imt_u': muat_tabel('imt_u').zscore(jk, umur_hari, imt),
+        'lk_u': muat_tabel('lk_u').zscore(jk, umur_hari, kosong if lingkar_kepala is None else lingkar_kepala),
+        'lla_u': muat_tabel('lla_u').zscore(jk, umur_hari, kosong if lingkar_lengan is None else lingkar_lengan),
+    }
+
+
+def zscore_wajar(indikator, z):
+    """
+    True jika z-score berada dalam batas biologis wajar menurut WHO
+    """
+    bawah, atas = BATAS_WAJAR[indikator]
+    z = np.asarray(z, dtype=np.float64)
+    return (z >= bawah) & (z <= atas)
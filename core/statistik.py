@@ -0,0 +1,244 @@
+"""
+Statistik Dasbor Pakar - Tabel Rekap yang Diperbarui Bertahap
+
+Dasbor tidak lagi menjalankan COUNT(*) pada tabel yang terus bertambah.
+Angkanya dibaca dari tabel kecil StatistikDasbor yang berisi:
+
+    total                (bulan kosong)   kunci: pasien/konsultasi/gejala/kondisi/aturan
+    konsultasi_kondisi   per bulan        kunci: kodeKondisi hasil ('' = tidak terdiagnosis)
+    pengukuran_tb_u      per bulan        kunci: 'diukur' (anak dengan TB/U terhitung), 'stunting' (TB/U < -2 SD)
+
+Setiap Konsultasi dan objek basis pengetahuan menyumbang +1 ke sejumlah baris
+(lihat kontribusi()). Sinyal di core/signals.py menerapkan selisih sumbangan
+lama dan baru saat objek disimpan atau dihapus.
+
+Prevalensi stunting dihitung per anak, bukan per pengukuran: setiap anak
+dinilai dari pengukuran TB/U terakhirnya di bulan itu. Angka ini tidak dapat
+dijumlahkan bertahap, sehingga perubahan pengukuran menghitung ulang baris
+bulan yang terdampak saja (lihat hitung_ulang_bulan_pengukuran()). Operasi yang tidak memicu sinyal (bulk_create, QuerySet.update,
+bulk_update) harus memanggil catat_objek_baru() atau bangun_ulang_statistik();
+`manage.py rebuild_dashboard_stats` dapat dijadwalkan untuk memperbaiki selisih.
+"""
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Aturan, Gejala, Kondisi, Konsultasi, Pasien, PengukuranFisik, StatistikDasbor
+
+JENIS_TOTAL = 'total'
+JENIS_KONSULTASI_KONDISI = 'konsultasi_kondisi'
+JENIS_PENGUKURAN_TB_U = 'pengukuran_tb_u'
+
+KUNCI_DIUKUR = 'diukur'
+KUNCI_STUNTING = 'stunting'
+BATAS_STUNTING = -2
+
+MODEL_TOTAL = {
+    Pasien: 'pasien',
+    Konsultasi: 'konsultasi',
+    Gejala: 'gejala',
+    Kondisi: 'kondisi',
+    Aturan: 'aturan',
+}
+
+# Model yang sumbangannya bergantung pada nilai field, sehingga keadaan lamanya perlu dibaca sebelum disimpan
+MODEL_BERNILAI = (Konsultasi, PengukuranFisik)
+MODEL_STATISTIK = (*MODEL_TOTAL, PengukuranFisik)
+
+
+def awal_bulan(tanggal):
+    return tanggal.replace(day=1)
+
+
+def kontribusi(obj):
+    """
+    Baris statistik yang mendapat +1 dari sebuah objek
+
+    Returns:
+        List tuple (jenis, bulan, kunci)
+    """
+    hasil = []
+    if type(obj) in MODEL_TOTAL:
+        hasil.append((JENIS_TOTAL, None, MODEL_TOTAL[type(obj)]))
+    if isinstance(obj, Konsultasi):
+        bulan = awal_bulan(timezone.localtime(obj.tanggalKonsultasi).date())
+        hasil.append((JENIS_KONSULTASI_KONDISI, bulan, obj.hasilKondisi_id or ''))
+    return hasil
+
+
+def bulan_pengukuran(obj):
+    """
+    Bulan rekap TB/U yang bergantung pada sebuah objek
+
+    Returns:
+        Set awal bulan; kosong untuk selain PengukuranFisik atau bila TB/U belum terhitung
+    """
+    if isinstance(obj, PengukuranFisik) and obj.skor_Z_TB_U is not None:
+        return {awal_bulan(obj.tanggalUkur)}
+    return set()
+
+
+def _tambah(jenis, bulan, kunci, selisih):
+    filter_baris = StatistikDasbor.objects.filter(jenis=jenis, bulan=bulan, kunci=kunci)
+    if filter_baris.update(jumlah=F('jumlah') + selisih):
+        return
+    try:
+        with transaction.atomic():
+            StatistikDasbor.objects.create(jenis=jenis, bulan=bulan, kunci=kunci, jumlah=selisih)
+    except IntegrityError:
+        # Baris yang sama baru saja dibuat oleh request lain
+        filter_baris.update(jumlah=F('jumlah') + selisih)
+
+
+def _atur(jenis, bulan, kunci, jumlah):
+    filter_baris = StatistikDasbor.objects.filter(jenis=jenis, bulan=bulan, kunci=kunci)
+    if not jumlah:
+        filter_baris.delete()
+        return
+    if filter_baris.update(jumlah=jumlah):
+        return
+    try:
+        with transaction.atomic():
+            StatistikDasbor.objects.create(jenis=jenis, bulan=bulan, kunci=kunci, jumlah=jumlah)
+    except IntegrityError:
+        filter_baris.update(jumlah=jumlah)
+
+
+def _rekap_pengukuran(queryset):
+    """
+    Jumlah anak diukur dan anak stunting per bulan dari pengukuran TB/U terakhir tiap anak
+
+    Returns:
+        dict awal bulan -> [diukur, stunting]
+    """
+    terakhir = {}
+    baris = (
+        queryset.filter(skor_Z_TB_U__isnull=False).order_by('tanggalUkur', 'id')
+        .values_list('pasien_id', 'tanggalUkur', 'skor_Z_TB_U')
+    )
+    for pasien_id, tanggal, skor in baris.iterator(chunk_size=2000):
+        terakhir[(pasien_id, awal_bulan(tanggal))] = skor
+    rekap = defaultdict(lambda: [0, 0])
+    for (_, bulan), skor in terakhir.items():
+        rekap[bulan][0] += 1
+        rekap[bulan][1] += skor < BATAS_STUNTING
+    return rekap
+
+
+def hitung_ulang_bulan_pengukuran(bulan_set):
+    """
+    Hitung ulang baris rekap TB/U bulan tertentu dari pengukuran bulan tersebut (indeks tanggalUkur)
+    """
+    for bulan in bulan_set:
+        rekap = _rekap_pengukuran(PengukuranFisik.objects.filter(
+            tanggalUkur__gte=bulan, tanggalUkur__lt=_mundur_bulan(bulan, -1)
+        ))
+        diukur, stunting = rekap.get(bulan, (0, 0))
+        _atur(JENIS_PENGUKURAN_TB_U, bulan, KUNCI_DIUKUR, diukur)
+        _atur(JENIS_PENGUKURAN_TB_U, bulan, KUNCI_STUNTING, stunting)
+
+
+def perbarui_statistik(lama, baru):
+    """
+    Terapkan selisih sumbangan sebuah objek sebelum dan sesudah berubah
+
+    Args:
+        lama: kontribusi() sebelum perubahan ([] untuk objek baru)
+        baru: kontribusi() sesudah perubahan ([] untuk objek yang dihapus)
+    """
+    selisih = Counter(baru)
+    selisih.subtract(Counter(lama))
+    for (jenis, bulan, kunci), nilai in selisih.items():
+        if nilai:
+            _tambah(jenis, bulan, kunci, nilai)
+
+
+def catat_objek_baru(objek_list):
+    """
+    Catat objek yang dibuat tanpa sinyal (bulk_create)
+    """
+    perbarui_statistik([], [baris for obj in objek_list for baris in kontribusi(obj)])
+    hitung_ulang_bulan_pengukuran(set().union(*(bulan_pengukuran(obj) for obj in objek_list)))
+
+
+def pindahkan_kondisi_terhapus(kode_kondisi):
+    """
+    Konsultasi kondisi yang dihapus menjadi tidak terdiagnosis (on_delete=SET_NULL tanpa sinyal per baris)
+    """
+    for baris in StatistikDasbor.objects.filter(jenis=JENIS_KONSULTASI_KONDISI, kunci=kode_kondisi):
+        _tambah(JENIS_KONSULTASI_KONDISI, baris.bulan, '', baris.jumlah)
+        baris.delete()
+
+
+@transaction.atomic
+def bangun_ulang_statistik():
+    """
+    Hitung ulang seluruh tabel rekap dari data sumber (beberapa GROUP BY)
+
+    Returns:
+        Jumlah baris rekap
+    """
+    baris = [
+        StatistikDasbor(jenis=JENIS_TOTAL, bulan=None, kunci=kunci, jumlah=model.objects.count())
+        for model, kunci in MODEL_TOTAL.items()
+    ]
+    konsultasi = (
+        Konsultasi.objects.annotate(bulan=TruncMonth('tanggalKonsultasi'))
+        .values('bulan', 'hasilKondisi_id').annotate(jumlah=Count('id')).order_by()
+    )
+    for data in konsultasi:
+        baris.append(StatistikDasbor(
+            jenis=JENIS_KONSULTASI_KONDISI, bulan=data['bulan'].date(),
+            kunci=data['hasilKondisi_id'] or '', jumlah=data['jumlah'],
+        ))
+    for bulan, (diukur, stunting) in _rekap_pengukuran(PengukuranFisik.objects.all()).items():
+        baris.append(StatistikDasbor(jenis=JENIS_PENGUKURAN_TB_U, bulan=bulan, kunci=KUNCI_DIUKUR, jumlah=diukur))
+        if stunting:
+            baris.append(StatistikDasbor(jenis=JENIS_PENGUKURAN_TB_U, bulan=bulan, kunci=KUNCI_STUNTING, jumlah=stunting))
+
+    StatistikDasbor.objects.all().delete()
+    StatistikDasbor.objects.bulk_create(baris)
+    return len(baris)
+
+
+def _mundur_bulan(bulan, jumlah):
+    indeks = bulan.year * 12 + bulan.month - 1 - jumlah
+    return date(indeks // 12, indeks % 12 + 1, 1)
+
+
+def statistik_dasbor(jumlah_bulan=12):
+    """
+    Baca statistik dasbor dari tabel rekap dengan satu query
+
+    Returns:
+        dict dengan 'total' (dict kunci -> jumlah), 'kode_kondisi' (kode yang muncul,
+        '' terakhir) dan 'bulanan' (list dict per bulan, terbaru dahulu: 'bulan',
+        'konsultasi' dict kode -> jumlah, 'total_konsultasi', 'diukur', 'stunting',
+        'prevalensi_stunting' persen atau None)
+    """
+    bulan_awal = _mundur_bulan(awal_bulan(timezone.localdate()), jumlah_bulan - 1)
+    total = {kunci: 0 for kunci in MODEL_TOTAL.values()}
+    bulanan = {}
+    for baris in StatistikDasbor.objects.filter(Q(jenis=JENIS_TOTAL) | Q(bulan__gte=bulan_awal)):
+        if baris.jenis == JENIS_TOTAL:
+            total[baris.kunci] = baris.jumlah
+            continue
+        data = bulanan.setdefault(baris.bulan, {'bulan': baris.bulan, 'konsultasi': {}, 'diukur': 0, 'stunting': 0})
+        if baris.jenis == JENIS_KONSULTASI_KONDISI:
+            data['konsultasi'][baris.kunci] = baris.jumlah
+        elif baris.jenis == JENIS_PENGUKURAN_TB_U:
+            data[baris.kunci] = baris.jumlah
+
+    kode_kondisi = sorted({kode for data in bulanan.values() for kode in data['konsultasi']}, key=lambda kode: (kode == '', kode))
+    for data in bulanan.values():
+        data['total_konsultasi'] = sum(data['konsultasi'].values())
+        data['prevalensi_stunting'] = round(100 * data['stunting'] / data['diukur'], 1) if data['diukur'] else None
+    return {
+        'total': total,
+        'kode_kondisi': kode_kondisi,
+        'bulanan': sorted(bulanan.values(), key=lambda data: data['bulan'], reverse=True),
+    }
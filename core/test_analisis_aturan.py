@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User, Group
+from django.contrib.messages import get_messages
+from django.test import TestCase
+from django.urls import reverse
+from .models import Kondisi, Gejala, Aturan
+from .mesin_inferensi import reset_indeks
+from .analisis_aturan import analisis_kelompok, periksa_perubahan
+
+class AnalisisAturanTest(TestCase):
+    def setUp(self):
+        reset_indeks()
+        self.stunting = Kondisi.objects.create(kodeKondisi="K01", namaKondisi="Stunting", deskripsi="-", solusi="-")
+        self.wasting = Kondisi.objects.create(kodeKondisi="K02", namaKondisi="Wasting", deskripsi="-", solusi="-")
+        for kode in ["G01", "G02", "G03", "G04"]:
+            Gejala.objects.create(kodeGejala=kode, namaGejala=f"Gejala {kode}")
+        for kode in ["G01", "G02"]:
+            Aturan.objects.create(kondisi=self.stunting, gejala_id=kode, kodeKelompokAturan="R01")
+        for kode in ["G03", "G04"]:
+            Aturan.objects.create(kondisi=self.wasting, gejala_id=kode, kodeKelompokAturan="R02")
+
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+
+    def tearDown(self):
+        reset_indeks()
+
+    def test_duplikat_tidak_terjangkau_dan_subset(self):
+        hasil = analisis_kelompok({
+            ('K01', 'R01'): frozenset({'G01', 'G02'}),
+            ('K02', 'R02'): frozenset({'G02', 'G01'}),
+            ('K01', 'R03'): frozenset({'G01'}),
+            ('K01', 'R04'): frozenset({'G01'}),
+            ('K03', 'R05'): frozenset(f'G{i:02d}' for i in range(1, 15)),
+        })
+        self.assertEqual(len(hasil.duplikat), 2)
+        self.assertEqual(hasil.duplikat[0].kelompok, [('K01', 'R01'), ('K02', 'R02')])
+        self.assertTrue(hasil.duplikat[0].lintas_kondisi)
+        self.assertFalse(hasil.duplikat[1].lintas_kondisi)
+        self.assertEqual(
+            [(item.kelompok, item.pemenang) for item in hasil.tidak_terjangkau],
+            [(('K02', 'R02'), ('K01', 'R01')), (('K01', 'R04'), ('K01', 'R03'))],
+        )
+        # Kelompok besar (di atas batas enumerasi) dibandingkan langsung
+        self.assertEqual(
+            sorted((item.kecil, item.besar) for item in hasil.subset),
+            [(('K01', 'R01'), ('K03', 'R05')), (('K01', 'R03'), ('K01', 'R01')), (('K01', 'R03'), ('K03', 'R05'))],
+        )
+
+    def test_periksa_perubahan_hanya_melaporkan_kelompok_baru(self):
+        kelompok = {('K01', 'R01'): frozenset({'G01', 'G02'}), ('K02', 'R02'): frozenset({'G01', 'G02'})}
+        hasil = periksa_perubahan(kelompok, {('K02', 'R02'): frozenset({'G03'})}, kode_kondisi='K02')
+        self.assertEqual((hasil.duplikat, hasil.subset), ([], []))
+
+    def test_tambah_aturan_duplikat_kondisi_lain_ditolak(self):
+        response = self.client.post(reverse('create_rule_group'), {
+            'kondisi': 'K02', 'kode_kelompok': 'R03', 'gejala': ['G02', 'G01'],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('R01 (K01)', response.context['error'])
+        self.assertFalse(Aturan.objects.filter(kodeKelompokAturan='R03').exists())
+
+    def test_edit_aturan_ditolak_tanpa_menghapus_aturan_lama(self):
+        response = self.client.post(reverse('edit_rule_pakar', args=['K02']), {
+            'rule_group_0': '1', 'kode_kelompok_0': 'R02', 'gejala_0': ['G01', 'G02'],
+        })
+        self.assertIn('diagnosa ganda', response.context['error'])
+        self.assertEqual(set(Aturan.objects.filter(kondisi=self.wasting).values_list('gejala_id', flat=True)), {'G03', 'G04'})
+
+        response = self.client.post(reverse('edit_rule_pakar', args=['K02']), {
+            'rule_group_0': '1', 'kode_kelompok_0': 'R02', 'gejala_0': ['G01', 'G02', 'G03'],
+        })
+        self.assertRedirects(response, reverse('list_rules_pakar'))
+        pesan = [str(item) for item in get_messages(response.wsgi_request)]
+        self.assertIn('Gejala kelompok R01 (K01) adalah bagian dari R02 (K02) (tambahan: G03)', pesan)
+
+    def test_halaman_analisis(self):
+        Aturan.objects.create(kondisi=self.wasting, gejala_id="G01", kodeKelompokAturan="R03")
+        response = self.client.get(reverse('analisis_aturan_pakar'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['jumlah_konflik'], 0)
+        self.assertEqual(len(response.context['analisis'].subset), 1)
+        self.assertContains(response, 'Relasi Subset/Superset')
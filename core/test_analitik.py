@@ -0,0 +1,92 @@
+from datetime import date
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+from django.urls import reverse
+from .models import Pasien, PengukuranFisik
+from . import analitik
+
+class AnalitikPrevalensiTest(TestCase):
+    def setUp(self):
+        self.budi = Pasien.objects.create(
+            namaPengguna="budi", nama="Budi", jenisKelamin="L", tanggalLahir=date(2023, 1, 1), kataSandi="x"
+        )
+        self.sari = Pasien.objects.create(
+            namaPengguna="sari", nama="Sari", jenisKelamin="P", tanggalLahir=date(2021, 6, 1), kataSandi="x"
+        )
+        # Budi umur 0-5 bulan lalu 6-11 bulan; Sari umur 19 dan 20 bulan
+        self.ukur(self.budi, date(2023, 3, 10), tb_u=-2.5, bb_u=-1.0, bb_tb=-2.1)
+        self.ukur(self.budi, date(2023, 8, 10), tb_u=-1.0, bb_u=-2.2, bb_tb=None)
+        self.ukur(self.sari, date(2023, 1, 15), tb_u=-3.0, bb_u=-2.5, bb_tb=0.3)
+        self.ukur(self.sari, date(2023, 2, 15), tb_u=None, bb_u=None, bb_tb=None)
+
+    def ukur(self, pasien, tanggal, tb_u, bb_u, bb_tb):
+        PengukuranFisik.objects.create(
+            pasien=pasien, tanggalUkur=tanggal, beratBadan=8, tinggiBadan=70,
+            skor_Z_TB_U=tb_u, skor_Z_BB_U=bb_u, skor_Z_BB_TB=bb_tb,
+        )
+
+    def test_total_tanpa_dimensi(self):
+        [total] = analitik.hitung_prevalensi(analitik.ambil_kolom(), ())
+        self.assertEqual(total['jumlah_pengukuran'], 4)
+        self.assertEqual((total['stunting_diukur'], total['stunting_kasus'], total['stunting_persen']), (3, 2, 66.7))
+        self.assertEqual((total['gizi_kurang_diukur'], total['gizi_kurang_kasus']), (3, 2))
+        self.assertEqual((total['wasting_diukur'], total['wasting_kasus'], total['wasting_persen']), (2, 1, 50.0))
+
+    def test_per_bulan_dan_jenis_kelamin(self):
+        hasil = analitik.hitung_prevalensi(analitik.ambil_kolom(), ('bulan', 'jenis_kelamin'))
+        self.assertEqual(
+            [(baris['bulan'], baris['jenis_kelamin'], baris['stunting_diukur'], baris['stunting_kasus']) for baris in hasil],
+            [
+                ('2023-01', 'Perempuan', 1, 1),
+                ('2023-02', 'Perempuan', 0, 0),
+                ('2023-03', 'Laki-laki', 1, 1),
+                ('2023-08', 'Laki-laki', 1, 0),
+            ],
+        )
+        self.assertIsNone(hasil[1]['stunting_persen'])
+
+    def test_per_kelompok_umur_dan_rentang_tanggal(self):
+        data = analitik.ambil_kolom(dari=date(2023, 2, 1))
+        hasil = analitik.hitung_prevalensi(data, ('kelompok_umur',))
+        self.assertEqual(
+            [(baris['kelompok_umur'], baris['jumlah_pengukuran']) for baris in hasil],
+            [('0-5 bulan', 1), ('6-11 bulan', 1), ('12-23 bulan', 1)],
+        )
+
+    def test_tanpa_data(self):
+        self.assertEqual(analitik.hitung_prevalensi(analitik.ambil_kolom(dari=date(2030, 1, 1))), [])
+
+    def test_halaman_dan_ekspor_csv(self):
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+        url = reverse('analitik_pengukuran_pakar')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['baris_list']), 4)
+        self.assertEqual(response.context['total'][0]['jumlah_pengukuran'], 4)
+
+        response = self.client.get(url, {'dimensi': 'jenis_kelamin', 'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        baris = response.content.decode().splitlines()
+        self.assertEqual(baris[0], ','.join(analitik.kolom_csv(('jenis_kelamin',))))
+        self.assertEqual(baris[1], 'Laki-laki,2,2,1,50.0,2,1,50.0,1,1,100.0')
+        self.assertEqual(baris[2], 'Perempuan,2,1,1,100.0,1,1,100.0,1,0,0.0')
+
+    def test_ekspor_csv_tanpa_dimensi_memakai_default_bulan(self):
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+        url = reverse('analitik_pengukuran_pakar')
+
+        response = self.client.get(url, {'format': 'csv'})
+        baris = response.content.decode().splitlines()
+        self.assertEqual(baris[0], ','.join(analitik.kolom_csv(('bulan',))))
+        self.assertEqual(len(baris), 1 + len(self.client.get(url).context['baris_list']))
+
+        # Form tanpa centang mengirim dimensi kosong: total saja, juga pada tautan CSV-nya
+        response = self.client.get(url, {'dimensi': ''})
+        self.assertEqual(response.context['dimensi'], ())
+        response = self.client.get(f"{url}?{response.context['query_csv']}&format=csv")
+        self.assertEqual(response.content.decode().splitlines()[0], ','.join(analitik.kolom_csv(())))
@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from .models import Pasien, PengukuranFisik, TugasPdf
+from . import antrian_pdf, laporan_pdf
+from .management.commands.run_pdf_worker import Command as PerintahWorkerPdf
+
+class AntrianPdfTest(TestCase):
+    def setUp(self):
+        self.direktori = tempfile.mkdtemp()
+        self.override = override_settings(PDF_CACHE_DIR=self.direktori)
+        self.override.enable()
+
+        self.pasien = Pasien(
+            namaPengguna="testuser",
+            nama="Test User",
+            jenisKelamin="L",
+            tanggalLahir=date(2020, 1, 1)
+        )
+        self.pasien.set_password("testpassword")
+        self.pasien.save()
+        PengukuranFisik.objects.create(
+            pasien=self.pasien, tanggalUkur=date(2021, 1, 1), beratBadan=9.5, tinggiBadan=75.0
+        )
+        self.client.post(reverse('login_pasien'), {
+            'nama_pengguna': 'testuser',
+            'kata_sandi': 'testpassword'
+        })
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.direktori, ignore_errors=True)
+
+    def test_permintaan_hanya_mengantre_tanpa_render(self):
+        with mock.patch.object(laporan_pdf, 'render_pdf') as render:
+            response = self.client.get(reverse('antre_riwayat_pdf'))
+        render.assert_not_called()
+        tugas = TugasPdf.objects.get()
+        self.assertEqual(tugas.status, TugasPdf.STATUS_ANTRI)
+        self.assertRedirects(response, reverse('status_tugas_pdf', kwargs={'tugas_id': tugas.id}))
+
+    def test_permintaan_ganda_memakai_tugas_yang_sama(self):
+        self.client.get(reverse('antre_riwayat_pdf'))
+        self.client.get(reverse('antre_riwayat_pdf'))
+        self.assertEqual(TugasPdf.objects.count(), 1)
+
+    def test_klaim_tidak_mengambil_tugas_dua_kali(self):
+        tugas = antrian_pdf.antrekan_pdf(TugasPdf.JENIS_RIWAYAT, self.pasien.id)
+        self.assertEqual(antrian_pdf.klaim_tugas(5), [tugas.id])
+        self.assertEqual(antrian_pdf.klaim_tugas(5), [])
+
+    def test_status_json_lalu_unduh(self):
+        tugas = antrian_pdf.antrekan_pdf(TugasPdf.JENIS_RIWAYAT, self.pasien.id)
+        url_status = reverse('status_tugas_pdf', kwargs={'tugas_id': tugas.id})
+        data = self.client.get(url_status, {'format': 'json'}).json()
+        self.assertEqual(data['status'], TugasPdf.STATUS_ANTRI)
+        self.assertFalse(data['siap'])
+
+        antrian_pdf.klaim_tugas(1)
+        self.assertEqual(antrian_pdf.kerjakan_tugas(tugas.id), TugasPdf.STATUS_SELESAI)
+
+        data = self.client.get(url_status, {'format': 'json'}).json()
+        self.assertTrue(data['siap'])
+        with mock.patch.object(laporan_pdf, 'render_pdf') as render:
+            response = self.client.get(data['url_unduh'])
+        render.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+    def test_berkas_tergusur_diantrekan_ulang(self):
+        tugas = antrian_pdf.antrekan_pdf(TugasPdf.JENIS_RIWAYAT, self.pasien.id)
+        antrian_pdf.klaim_tugas(1)
+        antrian_pdf.kerjakan_tugas(tugas.id)
+        tugas.refresh_from_db()
+        os.remove(os.path.join(self.direktori, f'{tugas.kunci}.pdf'))
+
+        response = self.client.get(reverse('unduh_tugas_pdf', kwargs={'tugas_id': tugas.id}))
+        self.assertRedirects(response, reverse('status_tugas_pdf', kwargs={'tugas_id': tugas.id}), fetch_redirect_response=False)
+        tugas.refresh_from_db()
+        self.assertEqual(tugas.status, TugasPdf.STATUS_ANTRI)
+
+    def test_render_gagal_dicatat(self):
+        tugas = antrian_pdf.antrekan_pdf(TugasPdf.JENIS_RIWAYAT, self.pasien.id)
+        antrian_pdf.klaim_tugas(1)
+        with mock.patch.object(laporan_pdf, 'render_pdf', side_effect=ValueError("Gagal membuat PDF")):
+            antrian_pdf.kerjakan_tugas(tugas.id)
+        data = self.client.get(reverse('status_tugas_pdf', kwargs={'tugas_id': tugas.id}), {'format': 'json'}).json()
+        self.assertEqual(data['status'], TugasPdf.STATUS_GAGAL)
+        self.assertEqual(data['pesan_error'], "Gagal membuat PDF")
+
+    def test_tugas_pasien_lain_tidak_bisa_diakses(self):
+        lain = Pasien.objects.create(namaPengguna="lain", nama="Lain", jenisKelamin="P", tanggalLahir=date(2020, 1, 1))
+        tugas = antrian_pdf.antrekan_pdf(TugasPdf.JENIS_RIWAYAT, lain.id)
+        response = self.client.get(reverse('status_tugas_pdf', kwargs={'tugas_id': tugas.id}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_worker_inline_mengosongkan_antrian(self):
+        tugas = antrian_pdf.antrekan_pdf(TugasPdf.JENIS_RIWAYAT, self.pasien.id)
+        call_command('run_pdf_worker', workers=0, once=True, stdout=StringIO())
+        tugas.refresh_from_db()
+        self.assertEqual(tugas.status, TugasPdf.STATUS_SELESAI)
+        self.assertTrue(antrian_pdf.tugas_siap_diunduh(tugas))
+
+    def test_pool_rusak_dibuat_ulang_dan_tugas_dikembalikan(self):
+        class PoolRusakSekali:
+            # Pool pertama rusak seperti setelah proses anak mati; pool berikutnya merender di proses ini
+            dibuat = 0
+
+            def __init__(self):
+                PoolRusakSekali.dibuat += 1
+                self.rusak = PoolRusakSekali.dibuat == 1
+
+            def submit(self, fungsi, *args):
+                if self.rusak:
+                    raise BrokenProcessPool('proses anak mati')
+                future = Future()
+                future.set_result(fungsi(*args))
+                return future
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                pass
+
+        tugas = [
+            antrian_pdf.antrekan_pdf(TugasPdf.JENIS_RIWAYAT, self.pasien.id),
+            TugasPdf.objects.create(jenis=TugasPdf.JENIS_RIWAYAT, pasien=self.pasien),
+        ]
+        with mock.patch.object(PerintahWorkerPdf, 'buat_pool', side_effect=lambda jumlah: PoolRusakSekali()):
+            call_command('run_pdf_worker', workers=2, once=True, interval=0, stdout=StringIO())
+        self.assertEqual(PoolRusakSekali.dibuat, 2)
+        for item in tugas:
+            item.refresh_from_db()
+            self.assertEqual(item.status, TugasPdf.STATUS_SELESAI)
+
+    def test_pemulihan_melewati_tugas_yang_masih_dirender(self):
+        lama, macet = [TugasPdf.objects.create(jenis=TugasPdf.JENIS_RIWAYAT, pasien=self.pasien) for _ in range(2)]
+        TugasPdf.objects.update(status=TugasPdf.STATUS_DIPROSES, dimulai=timezone.now() - timedelta(hours=1))
+        self.assertEqual(antrian_pdf.pulihkan_tugas_macet(kecuali=[lama.id]), 1)
+        self.assertEqual(TugasPdf.objects.get(id=lama.id).status, TugasPdf.STATUS_DIPROSES)
+        self.assertEqual(TugasPdf.objects.get(id=macet.id).status, TugasPdf.STATUS_ANTRI)
+
+    def test_pdf_di_cache_langsung_diunduh(self):
+        self.client.get(reverse('cetak_riwayat_pdf'))
+        response = self.client.get(reverse('antre_riwayat_pdf'))
+        self.assertRedirects(response, reverse('cetak_riwayat_pdf'), fetch_redirect_response=False)
+        self.assertFalse(TugasPdf.objects.exists())
@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import yaml
+from datetime import date
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from .models import Aturan, Gejala, Kondisi, Konsultasi, Pasien, StatistikDasbor
+from .mesin_inferensi import versi_basis_pengetahuan
+from . import basis_pengetahuan
+
+class PemuatBasisPengetahuanTest(TestCase):
+    def setUp(self):
+        self.direktori = tempfile.mkdtemp()
+        with open(basis_pengetahuan.BERKAS_DEFAULT, encoding='utf-8') as f:
+            self.data = yaml.safe_load(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.direktori, ignore_errors=True)
+
+    def tulis(self, data, nama='kb.yaml'):
+        path = os.path.join(self.direktori, nama)
+        with open(path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(data, f, allow_unicode=True)
+        return path
+
+    def muat(self, path, **opsi):
+        keluaran = io.StringIO()
+        call_command('load_knowledge_base', path, stdout=keluaran, **opsi)
+        return keluaran.getvalue()
+
+    def test_berkas_bawaan_dimuat_lalu_idempoten(self):
+        self.muat(basis_pengetahuan.BERKAS_DEFAULT)
+        self.assertEqual((Gejala.objects.count(), Kondisi.objects.count(), Aturan.objects.count()), (25, 6, 29))
+        self.assertEqual(StatistikDasbor.objects.get(jenis='total', kunci='aturan').jumlah, 29)
+        versi = versi_basis_pengetahuan()
+
+        # Muat ulang: hanya baca dan bandingkan, tidak ada tulis dan versi tidak naik
+        with self.assertNumQueries(3 + 2):  # tiga tabel basis pengetahuan; savepoint dan release
+            keluaran = self.muat(basis_pengetahuan.BERKAS_DEFAULT)
+        self.assertIn('Tidak ada perubahan', keluaran)
+        self.assertEqual(versi_basis_pengetahuan(), versi)
+
+    def test_selisih_tidak_menghapus_riwayat_konsultasi(self):
+        self.muat(basis_pengetahuan.BERKAS_DEFAULT)
+        pasien = Pasien.objects.create(
+            namaPengguna="anak", nama="Anak", jenisKelamin="L", tanggalLahir=date(2022, 1, 1), kataSandi="x"
+        )
+        k01 = Konsultasi.objects.create(pasien=pasien, hasilKondisi_id='K01')
+        k05 = Konsultasi.objects.create(pasien=pasien, hasilKondisi_id='K05')
+        versi = versi_basis_pengetahuan()[0]
+
+        self.data['gejala'].append({'kode': 'G26', 'nama': 'Gejala baru'})
+        self.data['gejala'][0]['nama'] = 'Tinggi badan sangat pendek (TB/U < -3 SD)'
+        self.data['kondisi'] = [k for k in self.data['kondisi'] if k['kode'] != 'K05']
+        self.data['aturan'] = [a for a in self.data['aturan'] if a['kondisi'] != 'K05']
+        self.data['aturan'][0]['gejala'].append('G26')
+        keluaran = self.muat(self.tulis(self.data))
+
+        self.assertIn('Gejala   +1 ~1 -0', keluaran)
+        self.assertIn('Kondisi  +0 ~0 -1', keluaran)
+        self.assertIn('Aturan   +1 ~0 -8', keluaran)
+        self.assertIn('Hasil diagnosa 1 konsultasi dikosongkan', keluaran)
+        self.assertEqual(Gejala.objects.get(pk='G01').namaGejala, 'Tinggi badan sangat pendek (TB/U < -3 SD)')
+        self.assertTrue(Aturan.objects.filter(kodeKelompokAturan='R01', gejala_id='G26').exists())
+        k01.refresh_from_db()
+        k05.refresh_from_db()
+        self.assertEqual(k01.hasilKondisi_id, 'K01')
+        self.assertIsNone(k05.hasilKondisi_id)
+        self.assertEqual(versi_basis_pengetahuan()[0], versi + 1)
+        self.assertEqual(StatistikDasbor.objects.get(jenis='total', kunci='aturan').jumlah, 22)
+
+    def test_dry_run_dan_berkas_json(self):
+        path = os.path.join(self.direktori, 'kb.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f)
+        keluaran = self.muat(path, dry_run=True)
+        self.assertIn('Gejala   +25 ~0 -0', keluaran)
+        self.assertIn('Dry run', keluaran)
+        self.assertFalse(Gejala.objects.exists())
+
+    def test_rujukan_tidak_dikenal_ditolak(self):
+        self.data['aturan'][0]['gejala'].append('G99')
+        with self.assertRaisesMessage(CommandError, 'Aturan R01 merujuk gejala tidak dikenal: G99'):
+            self.muat(self.tulis(self.data))
+        self.assertFalse(Gejala.objects.exists())
@@ -0,0 +1,87 @@
+import io
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from .models import Pasien, Kondisi, Gejala, Aturan, Konsultasi, DetailKonsultasi
+from .mesin_inferensi import reset_indeks
+from .views import jalankan_inferensi_batch
+from .diagnosa_ulang import diagnosa_ulang
+
+class DiagnosaUlangTest(TestCase):
+    def setUp(self):
+        reset_indeks()
+        self.pasien = Pasien.objects.create(
+            namaPengguna="budi", nama="Budi", jenisKelamin="L", tanggalLahir="2020-01-01", kataSandi="x"
+        )
+        self.stunting = Kondisi.objects.create(kodeKondisi="K01", namaKondisi="Stunting", deskripsi="-", solusi="-")
+        self.wasting = Kondisi.objects.create(kodeKondisi="K02", namaKondisi="Wasting", deskripsi="-", solusi="-")
+        for kode in ["G01", "G02", "G04", "G05"]:
+            Gejala.objects.create(kodeGejala=kode, namaGejala=f"Gejala {kode}")
+        for kode in ["G01", "G02"]:
+            Aturan.objects.create(kondisi=self.stunting, gejala_id=kode, kodeKelompokAturan="R01")
+        for kode in ["G04", "G05"]:
+            Aturan.objects.create(kondisi=self.wasting, gejala_id=kode, kodeKelompokAturan="R02")
+
+        jalankan_inferensi_batch(
+            [(self.pasien.id, ["G01", "G02"])] * 10
+            + [(self.pasien.id, ["G01"])] * 5
+            + [(self.pasien.id, ["G04", "G05"])] * 3
+        )
+        # Konsultasi dari sebelum snapshot ada
+        self.lama = Konsultasi.objects.create(pasien=self.pasien, hasilKondisi=self.wasting)
+        DetailKonsultasi.objects.bulk_create([
+            DetailKonsultasi(konsultasi=self.lama, gejala_id=kode) for kode in ["G04", "G05"]
+        ])
+
+        # Pakar menambah kelompok aturan: G01 saja kini berarti Stunting
+        Aturan.objects.create(kondisi=self.stunting, gejala_id="G01", kodeKelompokAturan="R03")
+
+    def tearDown(self):
+        reset_indeks()
+
+    def test_hanya_konsultasi_terdampak_dicocokkan_per_himpunan_gejala(self):
+        hasil = diagnosa_ulang()
+        # 10 + 5 menyentuh G01, ditambah konsultasi tanpa snapshot
+        self.assertEqual(hasil['dievaluasi'], 16)
+        self.assertEqual(hasil['himpunan_gejala'], 3)
+        self.assertEqual(hasil['tidak_terdampak'], 3)
+        self.assertEqual(hasil['perubahan'], [(None, 'K01', 5)])
+
+        tidak_cocok_dulu = Konsultasi.objects.filter(hasilKondisi__isnull=True)
+        self.assertEqual(tidak_cocok_dulu.count(), 5)
+        self.assertEqual(set(tidak_cocok_dulu.values_list('hasilEvaluasiUlang_id', flat=True)), {'K01'})
+        self.assertFalse(Konsultasi.objects.filter(snapshotEvaluasiUlang__isnull=True).exists())
+        # Konsultasi yang tidak terdampak membawa hasil lamanya
+        self.assertEqual(
+            set(Konsultasi.objects.filter(hasilKondisi=self.wasting).values_list('hasilEvaluasiUlang_id', flat=True)), {'K02'}
+        )
+
+        # Tidak ada perubahan aturan lagi: tidak ada yang dievaluasi
+        hasil = diagnosa_ulang()
+        self.assertEqual((hasil['dievaluasi'], hasil['tidak_terdampak']), (0, 0))
+
+    def test_dry_run_tidak_menyimpan(self):
+        hasil = diagnosa_ulang(simpan=False)
+        self.assertEqual((hasil['dievaluasi'], hasil['tidak_terdampak'], hasil['berubah']), (16, 3, 5))
+        self.assertFalse(Konsultasi.objects.filter(snapshotEvaluasiUlang__isnull=False).exists())
+
+    def test_perintah_dan_halaman_pakar(self):
+        keluaran = io.StringIO()
+        call_command('rediagnose_consultations', stdout=keluaran)
+        self.assertIn('16 konsultasi dievaluasi ulang (3 himpunan gejala berbeda)', keluaran.getvalue())
+        self.assertIn('- -> K01: 5 konsultasi', keluaran.getvalue())
+
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+
+        Aturan.objects.filter(kodeKelompokAturan="R03").delete()
+        response = self.client.get(reverse('diagnosa_ulang_pakar'))
+        self.assertEqual(response.context['jumlah_tertunda'], 19)
+        self.assertEqual(len(response.context['konsultasi_list']), 5)
+
+        response = self.client.post(reverse('diagnosa_ulang_pakar'))
+        self.assertEqual(response.context['hasil']['perubahan'], [])
+        self.assertEqual(response.context['jumlah_tertunda'], 0)
+        self.assertEqual(len(response.context['konsultasi_list']), 0)
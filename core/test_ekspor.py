@@ -0,0 +1,68 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import date
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from .models import Pasien, PengukuranFisik, Konsultasi, Kondisi
+from .ekspor import alirkan_csv, queryset_ekspor
+
+class EksporDataTest(TestCase):
+    def setUp(self):
+        self.kondisi = Kondisi.objects.create(kodeKondisi="K01", namaKondisi="Stunting", deskripsi="-", solusi="-")
+        self.budi = Pasien.objects.create(
+            namaPengguna="budi", nama="Budi", jenisKelamin="L", tanggalLahir=date(2022, 1, 1), kataSandi="x"
+        )
+        self.sari = Pasien.objects.create(
+            namaPengguna="sari", nama="Sari, S.", jenisKelamin="P", tanggalLahir=date(2021, 6, 1), kataSandi="x"
+        )
+        PengukuranFisik.objects.create(pasien=self.budi, tanggalUkur=date(2023, 1, 1), beratBadan=9.6, tinggiBadan=76, skor_Z_TB_U=-2.5)
+        PengukuranFisik.objects.create(pasien=self.budi, tanggalUkur=date(2023, 2, 1), beratBadan=9.9, tinggiBadan=77)
+        PengukuranFisik.objects.create(pasien=self.sari, tanggalUkur=date(2023, 1, 15), beratBadan=10, tinggiBadan=80)
+        Konsultasi.objects.create(pasien=self.budi, hasilKondisi=self.kondisi)
+        Konsultasi.objects.create(pasien=self.sari)
+
+    def baca(self, dataset, chunk=2, **filter):
+        isi = b''.join(alirkan_csv(dataset, queryset_ekspor(dataset, **filter), chunk)).decode('utf-8-sig')
+        return list(csv.reader(io.StringIO(isi)))
+
+    def test_pengukuran_datar_dengan_data_pasien(self):
+        with self.assertNumQueries(1):
+            baris = self.baca('pengukuran')
+        self.assertEqual(baris[0][:7], ['id', 'tanggal_ukur', 'pasien_id', 'nama_pengguna', 'nama', 'jenis_kelamin', 'tanggal_lahir'])
+        self.assertEqual(len(baris), 4)
+        self.assertEqual(baris[1][1:8], ['2023-01-01', str(self.budi.id), 'budi', 'Budi', 'L', '2022-01-01', '9.60'])
+        self.assertEqual(baris[1][baris[0].index('z_tb_u')], '-2.50')
+        self.assertEqual(baris[2][baris[0].index('z_tb_u')], '')
+        self.assertEqual(baris[3][4], 'Sari, S.')
+
+    def test_filter_tanggal_jenis_kelamin_dan_kondisi(self):
+        self.assertEqual(len(self.baca('pengukuran', sampai=date(2023, 1, 31))), 3)
+        self.assertEqual(len(self.baca('pengukuran', jenis_kelamin='P')), 2)
+        # Pengukuran anak yang pernah didiagnosis K01
+        self.assertEqual([b[3] for b in self.baca('pengukuran', kondisi='K01')[1:]], ['budi', 'budi'])
+
+        konsultasi = self.baca('konsultasi', kondisi='K01')
+        self.assertEqual(konsultasi[0][-2:], ['kode_kondisi', 'nama_kondisi'])
+        self.assertEqual([b[-2:] for b in konsultasi[1:]], [['K01', 'Stunting']])
+        self.assertEqual([b[3] for b in self.baca('konsultasi', kondisi='-')[1:]], ['sari'])
+
+    def test_unduh_streaming_dan_perintah(self):
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+
+        self.assertEqual(self.client.get(reverse('ekspor_data_pakar')).status_code, 200)
+        response = self.client.get(reverse('unduh_ekspor_pakar', args=['konsultasi']), {'jenis_kelamin': 'L'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="konsultasi_semua.csv"')
+        self.assertEqual(len(b''.join(response.streaming_content).decode('utf-8-sig').splitlines()), 2)
+
+        with tempfile.TemporaryDirectory() as direktori:
+            path = os.path.join(direktori, 'pengukuran.csv')
+            call_command('export_records', 'pengukuran', path, since='2023-01-10', stdout=io.StringIO())
+            with open(path, encoding='utf-8-sig') as f:
+                self.assertEqual(len(f.read().splitlines()), 3)
@@ -0,0 +1,78 @@
+from datetime import date
+from django.test import TestCase
+from django.urls import reverse
+from .models import Pasien, PengukuranFisik
+from . import kurva_referensi
+
+class SeriPertumbuhanTest(TestCase):
+    def setUp(self):
+        self.pasien = Pasien(
+            namaPengguna="testuser",
+            nama="Test User",
+            jenisKelamin="L",
+            tanggalLahir=date(2020, 1, 1)
+        )
+        self.pasien.set_password("testpassword")
+        self.pasien.save()
+        self.kedua = PengukuranFisik.objects.create(
+            pasien=self.pasien, tanggalUkur=date(2021, 2, 1), beratBadan=10, tinggiBadan=76, skor_Z_BB_U=-1.25
+        )
+        self.pertama = PengukuranFisik.objects.create(
+            pasien=self.pasien, tanggalUkur=date(2021, 1, 1), beratBadan=9.5, tinggiBadan=75
+        )
+        self.client.post(reverse('login_pasien'), {
+            'nama_pengguna': 'testuser',
+            'kata_sandi': 'testpassword'
+        })
+        self.url = reverse('data_grafik_riwayat', kwargs={'pasien_id': self.pasien.id})
+
+    def test_seri_berbentuk_kolom_urut_tanggal(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['tanggal'], ['2021-01-01', '2021-02-01'])
+        self.assertEqual(data['umur_bulan'], [12.02, 13.04])
+        self.assertEqual(data['bb_u'], [None, -1.25])
+        self.assertEqual(data['berat_badan'], [9.5, 10.0])
+        self.assertEqual(data['tinggi_badan'], [75.0, 76.0])
+
+    def test_304_jika_tidak_berubah(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(2):  # sesi dan agregat ETag
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_berubah_saat_data_berubah(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.pertama.beratBadan = 9.7
+        self.pertama.save()
+        etag_ubah = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)['ETag']
+        self.assertNotEqual(etag_ubah, etag)
+
+        self.pertama.delete()
+        etag_hapus = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag_ubah)['ETag']
+        self.assertNotEqual(etag_hapus, etag_ubah)
+
+        PengukuranFisik.objects.create(pasien=self.pasien, tanggalUkur=date(2021, 1, 1), beratBadan=9.5, tinggiBadan=75)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag_hapus)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['tanggal']), 2)
+
+    def test_pasien_lain_ditolak(self):
+        lain = Pasien.objects.create(namaPengguna="lain", nama="Lain", jenisKelamin="P", tanggalLahir=date(2020, 1, 1))
+        response = self.client.get(reverse('data_grafik_riwayat', kwargs={'pasien_id': lain.id}))
+        self.assertEqual(response.status_code, 403)
+
+    def test_halaman_grafik_tanpa_data_inline(self):
+        response = self.client.get(reverse('tampilkan_grafik_riwayat', kwargs={'pasien_id': self.pasien.id}))
+        self.assertContains(response, self.url)
+        self.assertContains(response, kurva_referensi.url_kurva('bb_u', 'L'))
+        self.assertNotContains(response, '2021-01-01')
+
+    def test_etag_berubah_saat_tanggal_lahir_dikoreksi(self):
+        etag = self.client.get(self.url)['ETag']
+        Pasien.objects.filter(pk=self.pasien.pk).update(tanggalLahir=date(2020, 2, 1))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['umur_bulan'], [11.01, 12.02])
@@ -0,0 +1,144 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User, Group
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from .models import Pasien, PengukuranFisik, StatistikDasbor
+from .impor_pengukuran import baca_csv, bersihkan_laporan, impor_dengan_laporan, impor_pengukuran, path_laporan
+
+class ImporPengukuranTest(TestCase):
+    def setUp(self):
+        self.direktori = tempfile.mkdtemp()
+        self.override = override_settings(IMPOR_LAPORAN_DIR=self.direktori)
+        self.override.enable()
+        self.budi = Pasien.objects.create(
+            namaPengguna="budi", nama="Budi Santoso", jenisKelamin="L", tanggalLahir=date(2022, 1, 1), kataSandi="x"
+        )
+        self.sari = Pasien.objects.create(
+            namaPengguna="sari", nama="Sari", jenisKelamin="P", tanggalLahir=date(2021, 6, 1), kataSandi="x"
+        )
+        PengukuranFisik.objects.create(pasien=self.sari, tanggalUkur=date(2023, 1, 5), beratBadan=10, tinggiBadan=80)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.direktori, ignore_errors=True)
+
+    def csv(self, *baris):
+        judul = 'Nama Pengguna,Nama,Tanggal Lahir,Tanggal Ukur,Berat Badan,Tinggi Badan,Lingkar Kepala\n'
+        return io.BytesIO((judul + '\n'.join(baris) + '\n').encode('utf-8-sig'))
+
+    def test_impor_per_chunk_dengan_zscore_dan_laporan_kesalahan(self):
+        berkas = self.csv(
+            'budi,,,2023-01-01,"9,6",76.0,46',
+            ',budi  santoso,01/01/2022,2023-02-01,9.9,77.5,',
+            'sari,,,2023-01-05,10,80,',          # sudah ada
+            'budi,,,2023-01-01,9.6,76,',         # duplikat dalam berkas
+            'tono,,,2023-01-01,9.6,76,',         # tidak ditemukan
+            'budi,,,2021-12-01,9.6,76,',         # sebelum lahir
+            'budi,,,2023-03-01,abc,76,',         # bukan angka
+            'budi,,,2023-04-01,96,76,',          # z-score tidak wajar (salah satuan)
+        )
+        laporan = io.StringIO()
+        # indeks pasien; chunk 1: cek duplikat, savepoint, bulk insert, hitung ulang 2 bulan baru (baca
+        # pengukuran bulan itu, buat baris 'diukur', hapus 'stunting' = 6 query/bulan), release;
+        # chunk 2: cek duplikat saja karena tidak ada baris valid
+        with self.assertNumQueries(1 + (4 + 2 * 6) + 1):
+            hasil = impor_pengukuran(baca_csv(berkas), laporan, ukuran_chunk=4)
+
+        self.assertEqual((hasil['dibaca'], hasil['diimpor'], hasil['gagal']), (8, 2, 6))
+        self.assertEqual([item['baris'] for item in hasil['contoh_kesalahan']], [4, 5, 6, 7, 8, 9])
+        baris_laporan = laporan.getvalue().splitlines()
+        self.assertEqual(len(baris_laporan), 7)
+        self.assertTrue(baris_laporan[3].startswith('6,"Nama pengguna ""tono"" tidak ditemukan",tono,'))
+
+        pertama = PengukuranFisik.objects.get(pasien=self.budi, tanggalUkur=date(2023, 1, 1))
+        self.assertEqual(pertama.beratBadan, Decimal('9.60'))
+        self.assertIsNotNone(pertama.skor_Z_TB_U)
+        self.assertIsNotNone(pertama.skor_Z_LK_U)
+        self.assertIsNone(pertama.skor_Z_LLA_U)
+        self.assertTrue(PengukuranFisik.objects.filter(pasien=self.budi, tanggalUkur=date(2023, 2, 1)).exists())
+        self.assertEqual(StatistikDasbor.objects.get(jenis='total', kunci='pasien').jumlah, 2)
+
+    def test_nama_dan_tanggal_lahir_ganda_ditolak(self):
+        Pasien.objects.create(
+            namaPengguna="budi2", nama="Budi Santoso", jenisKelamin="L", tanggalLahir=date(2022, 1, 1), kataSandi="x"
+        )
+        hasil = impor_pengukuran(baca_csv(self.csv(',Budi Santoso,2022-01-01,2023-02-01,9.9,77.5,')))
+        self.assertEqual(hasil['diimpor'], 0)
+        self.assertIn('Lebih dari satu anak', hasil['contoh_kesalahan'][0]['kesalahan'])
+
+    def test_dry_run_tidak_menyimpan(self):
+        hasil = impor_pengukuran(baca_csv(self.csv('budi,,,2023-01-01,9.6,76,')), simpan=False)
+        self.assertEqual(hasil['diimpor'], 1)
+        self.assertFalse(PengukuranFisik.objects.filter(pasien=self.budi).exists())
+
+    def test_perintah_impor(self):
+        path = f'{self.direktori}/register.csv'
+        with open(path, 'wb') as f:
+            f.write(self.csv('budi,,,2023-01-01,9.6,76,', 'tono,,,2023-01-01,9.6,76,').getvalue())
+        keluaran = io.StringIO()
+        call_command('import_measurements', path, errors=f'{self.direktori}/kesalahan.csv', stdout=keluaran)
+        self.assertIn('2 baris dibaca, 1 diimpor, 1 gagal', keluaran.getvalue())
+        with open(f'{self.direktori}/kesalahan.csv') as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+
+    def test_unggah_dan_unduh_laporan(self):
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+
+        berkas = SimpleUploadedFile('register.csv', self.csv('budi,,,2023-01-01,9.6,76,', 'tono,,,2023-01-01,9.6,76,').getvalue())
+        response = self.client.post(reverse('impor_pengukuran_pakar'), {'berkas': berkas})
+        hasil = response.context['hasil']
+        self.assertEqual((hasil['diimpor'], hasil['gagal']), (1, 1))
+
+        response = self.client.get(reverse('unduh_laporan_impor', args=[hasil['token_laporan']]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'tidak ditemukan', b''.join(response.streaming_content))
+
+        berkas = SimpleUploadedFile('register.txt', b'x')
+        response = self.client.post(reverse('impor_pengukuran_pakar'), {'berkas': berkas})
+        self.assertEqual(response.context['error'], 'Format berkas harus .csv atau .xlsx')
+
+    def test_berkas_rusak_ditampilkan_sebagai_kesalahan(self):
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+
+        # Sel melebihi csv.field_size_limit() memicu csv.Error
+        berkas = SimpleUploadedFile('register.csv', self.csv('budi,' + 'x' * 200000).getvalue())
+        response = self.client.post(reverse('impor_pengukuran_pakar'), {'berkas': berkas})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Berkas CSV tidak dapat dibaca', response.context['error'])
+
+        # Tanpa openpyxl pesannya meminta paket tersebut; dengan openpyxl berkas bukan zip ditolak
+        berkas = SimpleUploadedFile('register.xlsx', b'bukan berkas zip')
+        response = self.client.post(reverse('impor_pengukuran_pakar'), {'berkas': berkas})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('XLSX', response.context['error'])
+        self.assertFalse(PengukuranFisik.objects.filter(pasien=self.budi).exists())
+
+    def test_laporan_lama_dibuang(self):
+        lama, baru = path_laporan('a' * 32), path_laporan('b' * 32)
+        for path in (lama, baru):
+            with open(path, 'w') as f:
+                f.write('baris,pesan\n')
+        dua_minggu_lalu = time.time() - 14 * 24 * 60 * 60
+        os.utime(lama, (dua_minggu_lalu, dua_minggu_lalu))
+
+        self.assertEqual(bersihkan_laporan(), 1)
+        self.assertEqual((os.path.exists(lama), os.path.exists(baru)), (False, True))
+
+        # Impor berikutnya membersihkan laporan yang melewati batas umur
+        with self.settings(IMPOR_LAPORAN_MAX_AGE=0):
+            os.utime(baru, (dua_minggu_lalu, dua_minggu_lalu))
+            hasil = impor_dengan_laporan(self.csv('tono,,,2023-01-01,9.6,76,'), 'register.csv')
+        self.assertFalse(os.path.exists(baru))
+        self.assertTrue(os.path.exists(path_laporan(hasil['token_laporan'])))
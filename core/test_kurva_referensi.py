@@ -0,0 +1,45 @@
+import json
+import os
+import shutil
+import tempfile
+from django.test import SimpleTestCase
+from . import kurva_referensi
+
+class KurvaReferensiTest(SimpleTestCase):
+    def test_nilai_sesuai_tabel_who(self):
+        kurva = kurva_referensi.hitung_kurva('bb_u', 'L')
+        self.assertEqual(kurva['umur_bulan'][:2], [0, 1])
+        self.assertAlmostEqual(kurva['sd']['0'][0], 3.35)   # median berat lahir laki-laki 3.3464 kg
+        self.assertAlmostEqual(kurva['sd']['-2'][24], 9.67)
+        self.assertEqual(set(kurva['sd']), {'-3', '-2', '0', '2', '3'})
+
+    def test_di_luar_tabel_bernilai_none(self):
+        # Tabel lingkar lengan atas baru dimulai pada umur 3 bulan
+        kurva = kurva_referensi.hitung_kurva('lla_u', 'P')
+        self.assertEqual(kurva['sd']['0'][:3], [None, None, None])
+        self.assertIsNotNone(kurva['sd']['0'][3])
+
+    def test_titik_60_bulan_terisi(self):
+        # 60 bulan = 1826.25 hari, sedikit melewati akhir tabel WHO (1826 hari)
+        for indikator in kurva_referensi.INDIKATOR_UMUR:
+            for jenis_kelamin in ('L', 'P'):
+                kurva = kurva_referensi.hitung_kurva(indikator, jenis_kelamin)
+                for garis in kurva['sd'].values():
+                    self.assertIsNotNone(garis[60], f'{indikator}_{jenis_kelamin}')
+
+    def test_berkas_statis_sesuai_tabel(self):
+        # Berkas di core/static/core/referensi/ harus dibangun ulang bila tabel WHO berubah
+        self.assertEqual(kurva_referensi.kurva_usang(), [])
+
+    def test_tulis_menghapus_versi_lama(self):
+        direktori = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, direktori, ignore_errors=True)
+        with open(os.path.join(direktori, 'bb_u_L.lama.json'), 'w') as f:
+            f.write('{}')
+        ditulis = kurva_referensi.tulis_semua_kurva(direktori)
+        self.assertEqual(sorted(os.listdir(direktori)), sorted(ditulis))
+        with open(os.path.join(direktori, kurva_referensi.nama_berkas_kurva('tb_u', 'P'))) as f:
+            self.assertEqual(json.load(f)['versi'], kurva_referensi.versi_tabel('tb_u'))
+
+    def test_url_memuat_versi_tabel(self):
+        self.assertIn(kurva_referensi.versi_tabel('bb_u'), kurva_referensi.url_kurva('bb_u', 'L'))
@@ -0,0 +1,93 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from io import StringIO
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pypdf import PdfReader
+from .models import Pasien, PengukuranFisik
+from . import laporan_massal
+
+class LaporanMassalTest(TestCase):
+    def setUp(self):
+        self.direktori = tempfile.mkdtemp()
+        self.override = override_settings(PDF_CACHE_DIR=self.direktori, PDF_RENDER_WORKERS=0)
+        self.override.enable()
+
+        self.pasien = Pasien.objects.bulk_create([
+            Pasien(
+                namaPengguna=f"anak{i}",
+                nama=f"Anak {i}",
+                jenisKelamin="L" if i % 2 else "P",
+                tanggalLahir=date(2021, 1, 1),
+                kataSandi="x"
+            )
+            for i in range(4)
+        ])
+        # Tiga anak diukur pada sesi 2024-03-05, satu anak hanya pada sesi sebelumnya
+        for pasien in self.pasien[:3]:
+            PengukuranFisik.objects.create(pasien=pasien, tanggalUkur=date(2024, 2, 5), beratBadan=10, tinggiBadan=80)
+            PengukuranFisik.objects.create(pasien=pasien, tanggalUkur=date(2024, 3, 5), beratBadan=11, tinggiBadan=82)
+        PengukuranFisik.objects.create(pasien=self.pasien[3], tanggalUkur=date(2024, 2, 5), beratBadan=10, tinggiBadan=80)
+
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.direktori, ignore_errors=True)
+
+    def test_data_dimuat_dengan_query_tetap(self):
+        with CaptureQueriesContext(connection) as queries:
+            laporan_list = laporan_massal.muat_laporan_massal(laporan_massal.pilih_pasien(dari=date(2024, 1, 1)))
+        self.assertEqual(len(laporan_list), 4)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual([len(laporan.context['pengukuran_list']) for laporan in laporan_list], [2, 2, 2, 1])
+
+    def test_filter_sesi_dan_pasien(self):
+        sesi = laporan_massal.pilih_pasien(dari=date(2024, 3, 5), sampai=date(2024, 3, 5))
+        self.assertEqual(list(sesi), self.pasien[:3])
+        sebagian = laporan_massal.pilih_pasien(dari=date(2024, 3, 5), pasien_ids=[self.pasien[1].id, self.pasien[3].id])
+        self.assertEqual(list(sebagian), [self.pasien[1]])
+
+    def test_pdf_gabungan_satu_dokumen(self):
+        response = self.client.get(reverse('cetak_massal_pdf_pakar'), {'dari': '2024-03-05', 'sampai': '2024-03-05'})
+        self.assertEqual(response.status_code, 200)
+        isi = b''.join(response.streaming_content)
+        self.assertTrue(isi.startswith(b'%PDF'))
+        self.assertGreaterEqual(len(PdfReader(io.BytesIO(isi)).pages), 3)
+
+    def test_zip_satu_pdf_per_anak(self):
+        response = self.client.get(reverse('cetak_massal_pdf_pakar'), {'dari': '2024-03-05', 'format': 'zip'})
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as arsip:
+            nama = sorted(arsip.namelist())
+        self.assertEqual(nama, [f'riwayat_{pasien.id}_{pasien.nama}.pdf' for pasien in self.pasien[:3]])
+
+    def test_tanpa_filter_dialihkan(self):
+        response = self.client.get(reverse('cetak_massal_pdf_pakar'))
+        self.assertRedirects(response, reverse('list_pengukuran_pakar'))
+
+    def test_laporan_dari_cache_tidak_dirender_ulang(self):
+        laporan_list = laporan_massal.muat_laporan_massal(laporan_massal.pilih_pasien(dari=date(2024, 3, 5)))
+        self.assertEqual(laporan_massal.render_massal(laporan_list), 3)
+        self.assertEqual(laporan_massal.render_massal(laporan_list), 0)
+
+    def test_render_di_process_pool(self):
+        laporan_list = laporan_massal.muat_laporan_massal(laporan_massal.pilih_pasien(dari=date(2024, 1, 1)))
+        self.assertEqual(laporan_massal.render_massal(laporan_list, workers=2), 4)
+        for laporan in laporan_list:
+            self.assertTrue(os.path.exists(laporan_massal.path_cache(laporan.kunci)))
+
+    def test_command_menulis_zip(self):
+        tujuan = os.path.join(self.direktori, 'sesi.zip')
+        call_command('export_session_pdf', tujuan, since='2024-03-05', format='zip', workers=0, stdout=StringIO())
+        with zipfile.ZipFile(tujuan) as arsip:
+            self.assertEqual(len(arsip.namelist()), 3)
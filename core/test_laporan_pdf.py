@@ -0,0 +1,152 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from pypdf import PdfReader
+from .models import Pasien, PengukuranFisik, Konsultasi, Kondisi
+from . import laporan_pdf
+
+class LaporanPdfCacheTest(TestCase):
+    def setUp(self):
+        self.direktori = tempfile.mkdtemp()
+        self.override = override_settings(PDF_CACHE_DIR=self.direktori)
+        self.override.enable()
+
+        self.pasien = Pasien(
+            namaPengguna="testuser",
+            nama="Test User",
+            jenisKelamin="L",
+            tanggalLahir=date(2020, 1, 1)
+        )
+        self.pasien.set_password("testpassword")
+        self.pasien.save()
+        self.pengukuran = PengukuranFisik.objects.create(
+            pasien=self.pasien, tanggalUkur=date(2021, 1, 1), beratBadan=9.5, tinggiBadan=75.0
+        )
+        self.client.post(reverse('login_pasien'), {
+            'nama_pengguna': 'testuser',
+            'kata_sandi': 'testpassword'
+        })
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.direktori, ignore_errors=True)
+
+    def test_pdf_riwayat_dirender_sekali(self):
+        with mock.patch.object(laporan_pdf, 'render_pdf', wraps=laporan_pdf.render_pdf) as render:
+            pertama = self.client.get(reverse('cetak_riwayat_pdf'))
+            kedua = self.client.get(reverse('cetak_riwayat_pdf'))
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(pertama['Content-Type'], 'application/pdf')
+        self.assertEqual(pertama.content, kedua.content)
+        self.assertTrue(pertama.content.startswith(b'%PDF'))
+        self.assertEqual(pertama['ETag'], kedua['ETag'])
+        self.assertIn('Last-Modified', pertama)
+
+    def test_etag_menghasilkan_304(self):
+        etag = self.client.get(reverse('cetak_riwayat_pdf'))['ETag']
+        with mock.patch.object(laporan_pdf, 'render_pdf') as render:
+            response = self.client.get(reverse('cetak_riwayat_pdf'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        render.assert_not_called()
+
+    def test_perubahan_data_mengganti_sidik_jari(self):
+        etag_lama = self.client.get(reverse('cetak_riwayat_pdf'))['ETag']
+        self.pengukuran.beratBadan = 10.0
+        self.pengukuran.save()
+        response = self.client.get(reverse('cetak_riwayat_pdf'), HTTP_IF_NONE_MATCH=etag_lama)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag_lama)
+
+    def test_pdf_hasil_diagnosa_ikut_versi_basis_pengetahuan(self):
+        kondisi = Kondisi.objects.create(kodeKondisi="K01", namaKondisi="Stunting", deskripsi="-", solusi="-")
+        konsultasi = Konsultasi.objects.create(pasien=self.pasien, hasilKondisi=kondisi)
+        url = reverse('cetak_hasil_diagnosa_pdf', kwargs={'konsultasi_id': konsultasi.id})
+        etag_lama = self.client.get(url)['ETag']
+        Kondisi.objects.create(kodeKondisi="K02", namaKondisi="Normal", deskripsi="-", solusi="-")
+        self.assertNotEqual(self.client.get(url)['ETag'], etag_lama)
+
+    def test_eviksi_lru(self):
+        for i, kunci in enumerate(['a', 'b', 'c']):
+            laporan_pdf.simpan_cache(kunci, b'x' * 100)
+            waktu = time.time() - 100 + i
+            os.utime(os.path.join(self.direktori, f'{kunci}.pdf'), (waktu, waktu))
+        # 'a' baru saja diakses sehingga 'b' yang paling lama tidak dipakai
+        laporan_pdf.baca_cache('a')
+
+        self.assertEqual(laporan_pdf.bersihkan_cache(batas_byte=250), 1)
+        self.assertEqual(sorted(os.listdir(self.direktori)), ['a.pdf', 'c.pdf'])
+
+
+class MesinReportlabTest(TestCase):
+    def setUp(self):
+        self.direktori = tempfile.mkdtemp()
+        self.override = override_settings(PDF_CACHE_DIR=self.direktori, PDF_ENGINE='reportlab')
+        self.override.enable()
+
+        self.pasien = Pasien(
+            namaPengguna="testuser",
+            nama="Test User",
+            jenisKelamin="L",
+            tanggalLahir=date(2020, 1, 1),
+            namaWali="Budi"
+        )
+        self.pasien.set_password("testpassword")
+        self.pasien.save()
+        PengukuranFisik.objects.create(
+            pasien=self.pasien, tanggalUkur=date(2021, 1, 1), beratBadan=9.5, tinggiBadan=75.0,
+            skor_Z_BB_U=-0.5, skor_Z_TB_U=-2.5
+        )
+        self.client.post(reverse('login_pasien'), {
+            'nama_pengguna': 'testuser',
+            'kata_sandi': 'testpassword'
+        })
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.direktori, ignore_errors=True)
+
+    def teks_pdf(self, isi):
+        return '\n'.join(halaman.extract_text() for halaman in PdfReader(io.BytesIO(isi)).pages)
+
+    def test_riwayat_digambar_tanpa_xhtml2pdf(self):
+        with mock.patch.object(laporan_pdf, 'render_html_pdf') as render_html:
+            response = self.client.get(reverse('cetak_riwayat_pdf'))
+        render_html.assert_not_called()
+        teks = self.teks_pdf(response.content)
+        self.assertIn('LAPORAN RIWAYAT PENGUKURAN PERTUMBUHAN', teks)
+        self.assertIn('Test User', teks)
+        self.assertIn('01/01/2021', teks)
+        self.assertIn('Risiko Stunting', teks)
+
+    def test_hasil_diagnosa_digambar(self):
+        kondisi = Kondisi.objects.create(kodeKondisi="K01", namaKondisi="Stunting Ringan", deskripsi="-", solusi="-")
+        konsultasi = Konsultasi.objects.create(pasien=self.pasien, hasilKondisi=kondisi)
+        response = self.client.get(reverse('cetak_hasil_diagnosa_pdf', kwargs={'konsultasi_id': konsultasi.id}))
+        teks = self.teks_pdf(response.content)
+        self.assertIn('SURAT KETERANGAN HASIL DIAGNOSIS STUNTING', teks)
+        self.assertIn('Stunting Ringan', teks)
+        self.assertIn('Halaman 1', teks)
+
+    def test_kunci_cache_berbeda_per_mesin(self):
+        kunci_reportlab = laporan_pdf.laporan_riwayat(self.pasien.id).kunci
+        with override_settings(PDF_ENGINE='xhtml2pdf'):
+            kunci_xhtml2pdf = laporan_pdf.laporan_riwayat(self.pasien.id).kunci
+        self.assertNotEqual(kunci_reportlab, kunci_xhtml2pdf)
+
+    def test_template_tanpa_penggambar_memakai_html(self):
+        with mock.patch.object(laporan_pdf, 'render_html_pdf', return_value=b'%PDF') as render_html:
+            self.assertEqual(laporan_pdf.render_pdf('pdf/lain.html', {}), b'%PDF')
+        render_html.assert_called_once_with('pdf/lain.html', {})
+
+    def test_command_benchmark(self):
+        keluaran = StringIO()
+        call_command('benchmark_pdf', repeat=1, stdout=keluaran)
+        self.assertIn('Riwayat pengukuran: ReportLab', keluaran.getvalue())
@@ -0,0 +1,207 @@
+import json
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+from .models import Pasien, Kondisi, Gejala, Aturan, Konsultasi, DetailKonsultasi
+from .mesin_inferensi import dapatkan_indeks, reset_indeks, versi_basis_pengetahuan, perubahan_massal
+from .views import jalankan_inferensi, jalankan_inferensi_batch
+
+class MesinInferensiTest(TestCase):
+    def setUp(self):
+        reset_indeks()
+
+        self.pasien = Pasien(
+            namaPengguna="testuser",
+            nama="Test User",
+            jenisKelamin="L",
+            tanggalLahir="2020-01-01"
+        )
+        self.pasien.set_password("testpassword")
+        self.pasien.save()
+
+        self.stunting = Kondisi.objects.create(
+            kodeKondisi="K01",
+            namaKondisi="Stunting",
+            deskripsi="Tinggi badan kurang",
+            solusi="Perbaiki gizi"
+        )
+        self.normal = Kondisi.objects.create(
+            kodeKondisi="K06",
+            namaKondisi="Normal",
+            deskripsi="Pertumbuhan normal",
+            solusi="Pertahankan"
+        )
+        for kode in ["G01", "G02", "G21", "G22"]:
+            Gejala.objects.create(kodeGejala=kode, namaGejala=f"Gejala {kode}")
+
+        for kode in ["G01", "G02"]:
+            Aturan.objects.create(kondisi=self.stunting, gejala_id=kode, kodeKelompokAturan="R01")
+        for kode in ["G21", "G22"]:
+            Aturan.objects.create(kondisi=self.normal, gejala_id=kode, kodeKelompokAturan="R06")
+
+    def tearDown(self):
+        reset_indeks()
+
+    def test_indeks_memetakan_kelompok_ke_kondisi(self):
+        indeks = dapatkan_indeks()
+        self.assertEqual(indeks.cocokkan(["G02", "G01"]), self.stunting)
+        self.assertEqual(indeks.cocokkan({"G21", "G22"}), self.normal)
+        self.assertIsNone(indeks.cocokkan(["G01"]))
+
+    def test_indeks_dikompilasi_sekali_per_proses(self):
+        indeks = dapatkan_indeks()
+        # Hanya membaca satu baris versi basis pengetahuan
+        with self.assertNumQueries(1):
+            self.assertIs(dapatkan_indeks(), indeks)
+
+    def test_jalankan_inferensi_exact_match(self):
+        konsultasi = jalankan_inferensi(self.pasien.id, ["G01", "G02"])
+        konsultasi.refresh_from_db()
+        self.assertEqual(konsultasi.hasilKondisi, self.stunting)
+        self.assertEqual(konsultasi.detailkonsultasi_set.count(), 2)
+
+    def test_jalankan_inferensi_tanpa_kecocokan(self):
+        konsultasi = jalankan_inferensi(self.pasien.id, ["G01", "G21"])
+        konsultasi.refresh_from_db()
+        self.assertIsNone(konsultasi.hasilKondisi)
+
+    def test_perubahan_aturan_menaikkan_versi(self):
+        versi_awal = versi_basis_pengetahuan()
+        Aturan.objects.create(kondisi=self.normal, gejala_id="G01", kodeKelompokAturan="R07")
+        self.assertGreater(versi_basis_pengetahuan()[0], versi_awal[0])
+
+    def test_indeks_dikompilasi_ulang_setelah_perubahan(self):
+        self.assertIsNone(dapatkan_indeks().cocokkan(["G01"]))
+        Aturan.objects.create(kondisi=self.stunting, gejala_id="G01", kodeKelompokAturan="R02")
+        self.assertEqual(dapatkan_indeks().cocokkan(["G01"]), self.stunting)
+
+    def test_perubahan_massal_menaikkan_versi_sekali(self):
+        versi_awal = versi_basis_pengetahuan()[0]
+        with perubahan_massal():
+            Aturan.objects.filter(kondisi=self.normal).delete()
+            Gejala.objects.create(kodeGejala="G30", namaGejala="Gejala baru")
+        self.assertEqual(versi_basis_pengetahuan()[0], versi_awal + 1)
+
+    def test_perubahan_massal_gagal_tidak_menaikkan_versi(self):
+        versi_awal = versi_basis_pengetahuan()[0]
+        with self.assertRaises(ValueError), perubahan_massal():
+            Gejala.objects.create(kodeGejala="G30", namaGejala="Gejala baru")
+            raise ValueError('berkas basis pengetahuan tidak valid')
+        self.assertEqual(versi_basis_pengetahuan()[0], versi_awal)
+        # Penghitung kedalaman tetap dipulihkan: blok berikutnya menaikkan versi seperti biasa
+        with perubahan_massal():
+            Gejala.objects.create(kodeGejala="G31", namaGejala="Gejala lain")
+        self.assertEqual(versi_basis_pengetahuan()[0], versi_awal + 1)
+
+    def test_kelompok_dikodekan_sebagai_bitmask(self):
+        indeks = dapatkan_indeks()
+        mask, tidak_dikenal = indeks.encode(["G01", "G02"])
+        self.assertEqual(tidak_dikenal, 0)
+        self.assertEqual(indeks.pola[mask], self.stunting)
+        self.assertEqual(indeks.decode(mask), ["G01", "G02"])
+        # Gejala di luar basis pengetahuan tidak pernah cocok persis
+        self.assertIsNone(indeks.cocokkan(["G01", "G02", "G99"]))
+
+    def test_peringkat_kelompok_terdekat(self):
+        peringkat = dapatkan_indeks().peringkat(["G01", "G02", "G21"])
+        self.assertEqual(peringkat[0].kondisi, self.stunting)
+        self.assertAlmostEqual(peringkat[0].jaccard, 2 / 3)
+        self.assertEqual(peringkat[0].cakupan, 1.0)
+        self.assertEqual(peringkat[0].gejala_kurang, [])
+        # Kelompok R06 hanya beririsan satu gejala (Jaccard 1/4) sehingga tidak ikut
+        self.assertEqual(len(peringkat), 1)
+
+    def test_hasil_diagnosa_menampilkan_kelompok_terdekat(self):
+        self.client.post(reverse('login_pasien'), {
+            'nama_pengguna': 'testuser',
+            'kata_sandi': 'testpassword'
+        })
+        konsultasi = jalankan_inferensi(self.pasien.id, ["G01"])
+        response = self.client.get(reverse('tampilkan_hasil_diagnosa', kwargs={'konsultasi_id': konsultasi.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['diagnosis_parsial'])
+        self.assertContains(response, "Kelompok Aturan Terdekat")
+        self.assertContains(response, "G02")
+
+    def test_kelompok_terdekat_memakai_snapshot_konsultasi(self):
+        self.client.post(reverse('login_pasien'), {
+            'nama_pengguna': 'testuser',
+            'kata_sandi': 'testpassword'
+        })
+        konsultasi = jalankan_inferensi(self.pasien.id, ["G01"])
+        # Aturan berubah setelah konsultasi: menurut aturan terkini G01 paling dekat ke Normal
+        Aturan.objects.filter(kondisi=self.stunting).delete()
+        for kode in ["G01", "G02"]:
+            Aturan.objects.create(kondisi=self.normal, gejala_id=kode, kodeKelompokAturan="R07")
+
+        response = self.client.get(reverse('tampilkan_hasil_diagnosa', kwargs={'konsultasi_id': konsultasi.id}))
+        self.assertEqual(response.context['kondisi'], self.stunting)
+        self.assertContains(response, "Perbaiki gizi")
+
+    def test_jumlah_query_tetap_berapa_pun_gejala(self):
+        dapatkan_indeks()
+        # Baris rekap statistik bulan ini dibuat oleh konsultasi pertama tiap hasil
+        jalankan_inferensi(self.pasien.id, ["G01", "G02"])
+        jalankan_inferensi(self.pasien.id, ["G01", "G02", "G21", "G22", "G99"])
+        # pasien, versi, validasi IN, savepoint, INSERT konsultasi, 2 UPDATE statistik dasbor,
+        # bulk INSERT detail, release
+        with self.assertNumQueries(9):
+            jalankan_inferensi(self.pasien.id, ["G01", "G02"])
+        with self.assertNumQueries(9):
+            jalankan_inferensi(self.pasien.id, ["G01", "G02", "G21", "G22", "G99"])
+
+    def test_gejala_tidak_dikenal_dilewati(self):
+        konsultasi = jalankan_inferensi(self.pasien.id, ["G01", "G99", "G01"])
+        self.assertIsNone(konsultasi.hasilKondisi)
+        self.assertEqual(
+            list(konsultasi.detailkonsultasi_set.values_list('gejala_id', flat=True)),
+            ["G01"]
+        )
+
+    def test_inferensi_batch(self):
+        hasil = jalankan_inferensi_batch([
+            (self.pasien.id, ["G01", "G02"]),
+            (self.pasien.id, ["G21", "G22", "G99"]),
+            (self.pasien.id, ["G21", "G22"]),
+            (9999, ["G01"]),
+        ])
+        self.assertEqual([item['kode_kondisi'] for item in hasil], ["K01", None, "K06", None])
+        self.assertEqual(hasil[3]['error'], 'Pasien tidak ditemukan')
+        self.assertIsNone(hasil[3]['konsultasi_id'])
+        self.assertEqual(Konsultasi.objects.count(), 3)
+        self.assertEqual(DetailKonsultasi.objects.filter(konsultasi_id=hasil[1]['konsultasi_id']).count(), 2)
+
+    def test_inferensi_batch_jumlah_query_tetap(self):
+        dapatkan_indeks()
+        jalankan_inferensi_batch([(self.pasien.id, ["G01", "G02"])])
+        # Rekap statistik dasbor diperbarui sekali per kondisi, bukan per konsultasi
+        with self.assertNumQueries(9):
+            jalankan_inferensi_batch([(self.pasien.id, ["G01", "G02"])] * 50)
+
+    def test_view_inferensi_batch_json(self):
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.create(name='Pakar Diagnosa'))
+        self.client.login(username='pakar', password='password123')
+
+        response = self.client.post(
+            reverse('inferensi_batch_pakar'),
+            data=json.dumps({'data': [{'pasien_id': self.pasien.id, 'gejala': ['G01', 'G02']}]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['hasil'][0]['kode_kondisi'], 'K01')
+
+        # String gejala dipisah seperti kolom CSV, bukan dipecah per karakter
+        response = self.client.post(
+            reverse('inferensi_batch_pakar'),
+            data=json.dumps([{'pasien_id': self.pasien.id, 'gejala': 'G01;G02'}]),
+            content_type='application/json'
+        )
+        self.assertEqual(response.json()['hasil'][0]['kode_kondisi'], 'K01')
+
+        response = self.client.post(
+            reverse('inferensi_batch_pakar'),
+            data=json.dumps([{'pasien_id': self.pasien.id, 'gejala': {'G01': True}}]),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
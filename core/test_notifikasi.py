@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from .models import Pasien, PengukuranFisik, Notifikasi
+from .utils import buat_jadwal_notifikasi, hitung_notifikasi_belum_dibaca
+
+class NotifikasiCounterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pasien = Pasien(
+            namaPengguna="testuser",
+            nama="Test User",
+            jenisKelamin="L",
+            tanggalLahir="2020-01-01"
+        )
+        self.pasien.set_password("testpassword")
+        self.pasien.save()
+
+    def tearDown(self):
+        cache.clear()
+
+    def buat_notifikasi(self, jadwal):
+        return Notifikasi.objects.create(
+            pasien=self.pasien, judul="Info", pesan="Pesan", jadwalNotifikasi=jadwal
+        )
+
+    def test_jumlah_di_cache(self):
+        self.buat_notifikasi(timezone.now() - timedelta(hours=1))
+        self.buat_notifikasi(timezone.now() + timedelta(days=1))
+        self.assertEqual(hitung_notifikasi_belum_dibaca(self.pasien.id), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(hitung_notifikasi_belum_dibaca(self.pasien.id), 1)
+
+    def test_buat_jadwal_notifikasi_mereset_cache(self):
+        self.assertEqual(hitung_notifikasi_belum_dibaca(self.pasien.id), 0)
+        pengukuran = PengukuranFisik.objects.create(
+            pasien=self.pasien, tanggalUkur=date.today(), beratBadan=12.5, tinggiBadan=85.0
+        )
+        buat_jadwal_notifikasi(pengukuran)
+        # Tips gizi langsung jatuh tempo, jadwal pengukuran ulang baru 30 hari lagi
+        self.assertEqual(hitung_notifikasi_belum_dibaca(self.pasien.id), 1)
+
+    def test_membuka_daftar_notifikasi_mereset_badge(self):
+        self.buat_notifikasi(timezone.now() - timedelta(hours=1))
+        self.client.post(reverse('login_pasien'), {
+            'nama_pengguna': 'testuser',
+            'kata_sandi': 'testpassword'
+        })
+        response = self.client.get(reverse('dashboard_pasien'))
+        self.assertEqual(response.context['notif_count'], 1)
+
+        self.client.get(reverse('daftar_notifikasi'))
+        response = self.client.get(reverse('dashboard_pasien'))
+        self.assertEqual(response.context['notif_count'], 0)
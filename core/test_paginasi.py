@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+from django.urls import reverse
+from .models import Pasien, PengukuranFisik
+from .paginasi import paginasi_keyset, decode_kursor, encode_kursor
+
+class PaginasiKeysetTest(TestCase):
+    def setUp(self):
+        self.pasien = Pasien.objects.bulk_create([
+            Pasien(
+                namaPengguna=f"anak{i:03d}",
+                nama=f"Anak {i % 7}",  # Nama sengaja berulang agar id menjadi pemutus urutan
+                jenisKelamin="L" if i % 2 else "P",
+                tanggalLahir=date(2021, 1, 1),
+                kataSandi="x"
+            )
+            for i in range(25)
+        ])
+        hari_ini = date(2024, 1, 1)
+        self.pengukuran = PengukuranFisik.objects.bulk_create([
+            PengukuranFisik(
+                pasien=self.pasien[i % 3],
+                tanggalUkur=hari_ini - timedelta(days=i // 2),  # Dua pengukuran per tanggal
+                beratBadan=10, tinggiBadan=80,
+                skor_Z_TB_U=-2.5 if i % 4 == 0 else 0
+            )
+            for i in range(30)
+        ])
+
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+
+    def semua_halaman(self, queryset, urutan, ukuran):
+        hasil = []
+        setelah = None
+        while True:
+            baris, berikutnya, _ = paginasi_keyset(queryset, urutan, setelah=setelah, ukuran=ukuran)
+            hasil.extend(baris)
+            if berikutnya is None:
+                return hasil
+            setelah = decode_kursor(berikutnya, queryset.model, urutan)
+
+    def test_maju_mencakup_semua_baris_tanpa_duplikat(self):
+        urutan = ['-tanggalUkur', '-id']
+        hasil = self.semua_halaman(PengukuranFisik.objects.all(), urutan, ukuran=4)
+        self.assertEqual(hasil, list(PengukuranFisik.objects.order_by(*urutan)))
+
+        hasil = self.semua_halaman(Pasien.objects.all(), ['nama', 'id'], ukuran=4)
+        self.assertEqual(hasil, list(Pasien.objects.order_by('nama', 'id')))
+
+    def test_mundur_kembali_ke_halaman_sebelumnya(self):
+        urutan = ['nama', 'id']
+        halaman1, kursor2, _ = paginasi_keyset(Pasien.objects.all(), urutan, ukuran=10)
+        halaman2, _, kursor_kembali = paginasi_keyset(
+            Pasien.objects.all(), urutan, setelah=decode_kursor(kursor2, Pasien, urutan), ukuran=10
+        )
+        kembali, _, sebelumnya = paginasi_keyset(
+            Pasien.objects.all(), urutan, sebelum=decode_kursor(kursor_kembali, Pasien, urutan), ukuran=10
+        )
+        self.assertEqual(kembali, halaman1)
+        self.assertIsNone(sebelumnya)
+
+    def test_view_pengukuran_satu_halaman_dan_filter(self):
+        response = self.client.get(reverse('list_pengukuran_pakar'), {'ukuran': 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['pengukuran_list']), 10)
+        self.assertTrue(response.context['halaman'].has_next)
+
+        response = self.client.get(reverse('list_pengukuran_pakar'), {'status': 'stunting'})
+        self.assertEqual(len(response.context['pengukuran_list']), 8)
+
+        response = self.client.get(reverse('list_pengukuran_pakar'), {
+            'pasien': self.pasien[0].id, 'dari': '2023-12-25'
+        })
+        self.assertTrue(all(p.pasien_id == self.pasien[0].id for p in response.context['pengukuran_list']))
+        self.assertTrue(all(p.tanggalUkur >= date(2023, 12, 25) for p in response.context['pengukuran_list']))
+
+    def test_kursor_bertipe_salah_dianggap_halaman_pertama(self):
+        urutan = ['-tanggalUkur', '-id']
+        kursor = encode_kursor(['2023-12-31', '7'])
+        self.assertEqual(decode_kursor(kursor, PengukuranFisik, urutan), [date(2023, 12, 31), 7])
+        for nilai in (['bukan-tanggal', 1], ['2023-12-31', 'x'], [None, 1], [{'a': 1}, 1]):
+            self.assertIsNone(decode_kursor(encode_kursor(nilai), PengukuranFisik, urutan))
+
+        response = self.client.get(reverse('list_pengukuran_pakar'), {
+            'setelah': encode_kursor(['2023-13-45', 1]), 'ukuran': 10
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['pengukuran_list']), 10)
+
+    def test_view_pasien_pencarian_dan_kursor_rusak(self):
+        response = self.client.get(reverse('list_patients_pakar'), {'q': 'anak00', 'setelah': 'bukan-kursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['pasien_list']), 10)
+
+        response = self.client.get(reverse('list_patients_pakar'), {'jenis_kelamin': 'P', 'ukuran': 5})
+        url_berikutnya = response.context['halaman'].url_berikutnya
+        self.assertIn('jenis_kelamin=P', url_berikutnya)
+        self.assertIn('setelah=', url_berikutnya)
+
+    def test_jumlah_query_tidak_bergantung_halaman(self):
+        url = reverse('list_pengukuran_pakar')
+        response = self.client.get(url, {'ukuran': 5})
+        halaman_berikut = response.context['halaman'].url_berikutnya
+        with self.assertNumQueries(4):  # session, user, cek grup pakar, satu query halaman
+            self.client.get(url + halaman_berikut)
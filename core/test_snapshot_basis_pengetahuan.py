@@ -0,0 +1,58 @@
+from django.test import TestCase
+from .models import Pasien, Kondisi, Gejala, Aturan, SnapshotBasisPengetahuan, VersiBasisPengetahuan
+from .mesin_inferensi import dapatkan_indeks, indeks_snapshot, reset_indeks
+from .views import jalankan_inferensi, jalankan_inferensi_batch
+
+class SnapshotBasisPengetahuanTest(TestCase):
+    def setUp(self):
+        reset_indeks()
+        self.pasien = Pasien.objects.create(
+            namaPengguna="budi", nama="Budi", jenisKelamin="L", tanggalLahir="2020-01-01", kataSandi="x"
+        )
+        self.stunting = Kondisi.objects.create(kodeKondisi="K01", namaKondisi="Stunting", deskripsi="-", solusi="Perbaiki gizi")
+        for kode in ["G01", "G02", "G03"]:
+            Gejala.objects.create(kodeGejala=kode, namaGejala=f"Gejala {kode}")
+        for kode in ["G01", "G02"]:
+            Aturan.objects.create(kondisi=self.stunting, gejala_id=kode, kodeKelompokAturan="R01")
+
+    def tearDown(self):
+        reset_indeks()
+
+    def test_konsultasi_merujuk_snapshot_versi_saat_diagnosa(self):
+        konsultasi = jalankan_inferensi(self.pasien.id, ["G01", "G02"])
+        snapshot_lama = konsultasi.snapshotBasisPengetahuan_id
+        self.assertIsNotNone(snapshot_lama)
+        self.assertEqual(VersiBasisPengetahuan.objects.get(pk=1).snapshot_id, snapshot_lama)
+
+        # Pakar mengganti kelompok aturan (seperti edit_rule_pakar: hapus lalu buat ulang)
+        Aturan.objects.filter(kondisi=self.stunting).delete()
+        Aturan.objects.create(kondisi=self.stunting, gejala_id="G03", kodeKelompokAturan="R01")
+        self.assertIsNone(VersiBasisPengetahuan.objects.get(pk=1).snapshot_id)
+
+        baru = jalankan_inferensi_batch([(self.pasien.id, ["G01", "G02"])])
+        self.assertIsNone(baru[0]['kode_kondisi'])
+        self.assertEqual(SnapshotBasisPengetahuan.objects.count(), 2)
+
+        # Diagnosa lama dapat diputar ulang dengan aturan yang berlaku saat itu
+        self.assertEqual(indeks_snapshot(snapshot_lama).cocokkan(["G01", "G02"]), self.stunting)
+        self.assertIsNone(indeks_snapshot(snapshot_lama).cocokkan(["G03"]))
+
+    def test_isi_sama_memakai_snapshot_yang_sama(self):
+        snapshot = dapatkan_indeks().snapshot_id
+        # Mengubah deskripsi menaikkan versi tetapi isi kelompok aturan tidak berubah
+        self.stunting.deskripsi = "Tinggi badan kurang"
+        self.stunting.save()
+        self.assertEqual(dapatkan_indeks().snapshot_id, snapshot)
+        self.assertEqual(SnapshotBasisPengetahuan.objects.count(), 1)
+
+    def test_worker_lain_memuat_indeks_dari_snapshot(self):
+        dapatkan_indeks()
+        reset_indeks()
+        # Baris versi lalu blob snapshot, tanpa membaca tabel Aturan
+        with self.assertNumQueries(2):
+            indeks = dapatkan_indeks()
+        kondisi = indeks.cocokkan(["G02", "G01"])
+        self.assertEqual(kondisi, self.stunting)
+        self.assertEqual(kondisi.namaKondisi, "Stunting")
+        # Field yang tidak ada di snapshot dibaca dari database bila dibutuhkan
+        self.assertEqual(kondisi.solusi, "Perbaiki gizi")
@@ -0,0 +1,206 @@
+import math
+from datetime import date
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Pasien, PengukuranFisik
+from .standar_pertumbuhan import hitung_semua_zscore, hitung_zscore, muat_tabel, zscore_wajar
+from .utils import KOLOM_ZSCORE, hitung_dan_simpan_zscore
+
+
+def nilai_sd(L, M, S, k):
+    return M * (1 + L * S * k) ** (1 / L)
+
+
+class StandarPertumbuhanTest(TestCase):
+    def test_median_who_menghasilkan_z_nol(self):
+        # Laki-laki umur 0 hari: M = 3.3464 kg (BB/U), Perempuan 0 hari: M = 49.1477 cm (TB/U)
+        self.assertAlmostEqual(hitung_zscore('bb_u', 'L', 0, 3.3464), 0.0, places=6)
+        self.assertAlmostEqual(hitung_zscore('tb_u', 'P', 0, 49.1477), 0.0, places=6)
+
+    def test_rumus_lms(self):
+        L, M, S = 0.3487, 3.3464, 0.14602
+        z = hitung_zscore('bb_u', 'L', 0, 3.0)
+        self.assertAlmostEqual(z, ((3.0 / M) ** L - 1) / (L * S), places=6)
+
+    def test_aturan_z_ekstrem_bb_u(self):
+        L, M, S = 0.3487, 3.3464, 0.14602
+        sd2, sd3 = nilai_sd(L, M, S, 2), nilai_sd(L, M, S, 3)
+        self.assertAlmostEqual(hitung_zscore('bb_u', 'L', 0, 6.0), 3 + (6.0 - sd3) / (sd3 - sd2), places=6)
+
+        sd2_neg, sd3_neg = nilai_sd(L, M, S, -2), nilai_sd(L, M, S, -3)
+        self.assertAlmostEqual(hitung_zscore('bb_u', 'L', 0, 1.8), -3 + (1.8 - sd3_neg) / (sd2_neg - sd3_neg), places=6)
+
+    def test_interpolasi_antar_hari(self):
+        tabel = muat_tabel('tb_u')
+        L, M, S = tabel.lms(np.intp(0), 730.5)
+        self.assertAlmostEqual(float(M), (87.8018 + 87.1303) / 2, places=6)
+
+    def test_array_dan_di_luar_jangkauan(self):
+        z = hitung_zscore('bb_u', ['L', 'P', 'L', 'L'], [0, 365, 1827, 100], [3.3464, 9.0, 10.0, -1])
+        self.assertEqual(z.shape, (4,))
+        self.assertAlmostEqual(z[0], 0.0, places=6)
+        self.assertTrue(np.isnan(z[2]))
+        self.assertTrue(np.isnan(z[3]))
+        self.assertTrue(math.isnan(hitung_zscore('tb_u', 'L', -1, 50.0)))
+
+    def test_indikator_tambahan(self):
+        # Median WHO laki-laki: BB/PB 45 cm = 2.441 kg, IMT/U 0 hari = 13.4069, LK/U 0 bulan = 34.4618 cm,
+        # LLA/U 91 hari = 13.4779 cm
+        self.assertAlmostEqual(hitung_zscore('bb_pb', 'L', 45.0, 2.441), 0.0, places=6)
+        self.assertAlmostEqual(hitung_zscore('lk_u', 'L', 0, 34.4618), 0.0, places=6)
+        self.assertAlmostEqual(hitung_zscore('lla_u', 'L', 91, 13.4779), 0.0, places=6)
+        self.assertTrue(math.isnan(hitung_zscore('lla_u', 'L', 90, 13.0)))
+
+        tinggi = 50.0
+        hasil = hitung_semua_zscore(['L'], [0], [13.4069 * (tinggi / 100) ** 2], [tinggi], [np.nan], [None])
+        self.assertAlmostEqual(hasil['imt_u'][0], 0.0, places=6)
+        self.assertTrue(np.isnan(hasil['lk_u'][0]))
+        self.assertTrue(np.isnan(hasil['lla_u'][0]))
+
+    def test_bb_tb_memilih_tabel_panjang_atau_tinggi(self):
+        hasil = hitung_semua_zscore(['L', 'L'], [700, 800], [10.0, 10.0], [80.0, 80.0])
+        self.assertAlmostEqual(hasil['bb_tb'][0], hitung_zscore('bb_pb', 'L', 80.0, 10.0))
+        self.assertAlmostEqual(hasil['bb_tb'][1], hitung_zscore('bb_tb', 'L', 80.0, 10.0))
+
+    def test_batas_wajar(self):
+        self.assertEqual(list(zscore_wajar('bb_u', [-6.5, 0.0, 5.5])), [False, True, False])
+
+    def test_hitung_dan_simpan_zscore_memakai_tabel_who(self):
+        pasien = Pasien(namaPengguna="anak", nama="Anak", jenisKelamin="L", tanggalLahir=date(2020, 1, 1))
+        pasien.set_password("testpassword")
+        pasien.save()
+        pengukuran = PengukuranFisik.objects.create(
+            pasien=pasien, tanggalUkur=date(2021, 1, 1), beratBadan=12.5, tinggiBadan=85.0
+        )
+        hitung_dan_simpan_zscore(pengukuran.id)
+        pengukuran.refresh_from_db()
+
+        umur_hari = (date(2021, 1, 1) - date(2020, 1, 1)).days
+        self.assertAlmostEqual(float(pengukuran.skor_Z_BB_U), round(hitung_zscore('bb_u', 'L', umur_hari, 12.5), 2))
+        # Tidak lagi dipotong ke ±3
+        self.assertGreater(float(pengukuran.skor_Z_TB_U), 3.0)
+        self.assertIsNotNone(pengukuran.skor_Z_BB_TB)
+        self.assertIsNotNone(pengukuran.skor_Z_IMT_U)
+        # Lingkar kepala/lengan tidak diukur
+        self.assertIsNone(pengukuran.skor_Z_LK_U)
+        self.assertIsNone(pengukuran.skor_Z_LLA_U)
+
+    def test_berat_ekstrem_disimpan_kosong_dan_ditolak(self):
+        pasien = Pasien(namaPengguna="anak", nama="Anak", jenisKelamin="L", tanggalLahir=date(2020, 1, 1))
+        pasien.set_password("testpassword")
+        pasien.save()
+        # Sekitar 5 bulan, 65 cm, 999 kg: BB/U sekitar 2000 SD, tidak muat di DecimalField(5, 2)
+        pengukuran = PengukuranFisik.objects.create(
+            pasien=pasien, tanggalUkur=date(2020, 6, 1), beratBadan=999, tinggiBadan=65.0
+        )
+        with self.assertRaisesMessage(ValueError, 'Z-score tidak wajar (bb_u, bb_tb, imt_u)'):
+            hitung_dan_simpan_zscore(pengukuran.id)
+        pengukuran.refresh_from_db()
+        self.assertIsNone(pengukuran.skor_Z_BB_U)
+        self.assertIsNotNone(pengukuran.skor_Z_TB_U)
+
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+        response = self.client.post(reverse('create_pengukuran_pakar'), {
+            'pasien': pasien.id, 'tanggal_ukur': '2020-06-02', 'berat_badan': '999', 'tinggi_badan': '65',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Z-score tidak wajar', response.context['error'])
+        self.assertFalse(PengukuranFisik.objects.filter(tanggalUkur=date(2020, 6, 2)).exists())
+
+    def test_lingkar_kepala_dan_lengan_ekstrem_disimpan_kosong(self):
+        pasien = Pasien(namaPengguna="anak", nama="Anak", jenisKelamin="P", tanggalLahir=date(2020, 1, 1))
+        pasien.set_password("testpassword")
+        pasien.save()
+        # Salah satuan (mm, bukan cm)
+        pengukuran = PengukuranFisik.objects.create(
+            pasien=pasien, tanggalUkur=date(2021, 1, 1), beratBadan=9.0, tinggiBadan=74.0,
+            lingkarKepala=450, lingkarLengan=150
+        )
+        with self.assertRaisesMessage(ValueError, 'Z-score tidak wajar (lk_u, lla_u)'):
+            hitung_dan_simpan_zscore(pengukuran.id)
+        pengukuran.refresh_from_db()
+        self.assertIsNone(pengukuran.skor_Z_LK_U)
+        self.assertIsNone(pengukuran.skor_Z_LLA_U)
+        self.assertIsNotNone(pengukuran.skor_Z_BB_U)
+
+    def test_filter_indikator_memakai_kolom_terindeks(self):
+        pasien = Pasien(namaPengguna="anak", nama="Anak", jenisKelamin="P", tanggalLahir=date(2020, 1, 1))
+        pasien.set_password("testpassword")
+        pasien.save()
+        kurus = PengukuranFisik.objects.create(
+            pasien=pasien, tanggalUkur=date(2021, 1, 1), beratBadan=6.5, tinggiBadan=75.0, lingkarLengan=11.0
+        )
+        normal = PengukuranFisik.objects.create(
+            pasien=pasien, tanggalUkur=date(2021, 2, 1), beratBadan=9.5, tinggiBadan=75.0, lingkarLengan=15.0
+        )
+        for pengukuran in (kurus, normal):
+            hitung_dan_simpan_zscore(pengukuran.id)
+
+        self.assertEqual(list(PengukuranFisik.objects.filter(skor_Z_BB_TB__lt=-2)), [kurus])
+        self.assertEqual(list(PengukuranFisik.objects.filter(skor_Z_LLA_U__lt=-2)), [kurus])
+
+
+class RecomputeZscoresCommandTest(TestCase):
+    def setUp(self):
+        self.pasien = []
+        for nama, jk in [("anak1", "L"), ("anak2", "P")]:
+            pasien = Pasien(namaPengguna=nama, nama=nama, jenisKelamin=jk, tanggalLahir=date(2020, 1, 1))
+            pasien.set_password("testpassword")
+            pasien.save()
+            self.pasien.append(pasien)
+
+        self.pengukuran = []
+        for pasien in self.pasien:
+            for bulan, berat, tinggi in [(3, 6.0, 60.0), (6, 7.5, 66.0), (12, 9.5, 75.0)]:
+                self.pengukuran.append(PengukuranFisik.objects.create(
+                    pasien=pasien, tanggalUkur=date(2020 + bulan // 12, bulan % 12 + 1, 1),
+                    beratBadan=berat, tinggiBadan=tinggi, lingkarKepala=tinggi * 0.6,
+                    skor_Z_BB_U=3, skor_Z_TB_U=3
+                ))
+
+    def jalankan(self, *args):
+        out = StringIO()
+        call_command('recompute_zscores', *args, stdout=out)
+        return out.getvalue()
+
+    def test_hasil_sama_dengan_perhitungan_per_baris(self):
+        self.jalankan('--chunk-size', '4')
+        hasil_massal = list(PengukuranFisik.objects.order_by('id').values_list(*KOLOM_ZSCORE.values()))
+
+        for pengukuran in self.pengukuran:
+            hitung_dan_simpan_zscore(pengukuran.id)
+        hasil_per_baris = list(PengukuranFisik.objects.order_by('id').values_list(*KOLOM_ZSCORE.values()))
+        self.assertTrue(all(skor is not None for baris in hasil_massal for skor in baris[:5]))
+        self.assertEqual(hasil_massal, hasil_per_baris)
+
+    def test_baris_lama_tidak_wajar_dikosongkan_dan_dilaporkan(self):
+        salah = PengukuranFisik.objects.create(
+            pasien=self.pasien[0], tanggalUkur=date(2020, 6, 1), beratBadan=999, tinggiBadan=65.0, skor_Z_BB_U=3
+        )
+        output = self.jalankan('--chunk-size', '4')
+        self.assertIn(f'1 pengukuran memiliki z-score tidak wajar dan disimpan kosong; periksa satuan berat/tinggi (id: {salah.id})', output)
+        salah.refresh_from_db()
+        self.assertIsNone(salah.skor_Z_BB_U)
+        self.assertIsNotNone(salah.skor_Z_TB_U)
+        self.assertFalse(PengukuranFisik.objects.filter(skor_Z_BB_U=3).exists())
+
+    def test_dry_run_tidak_menyimpan(self):
+        output = self.jalankan('--dry-run')
+        self.assertIn('6 diperbarui', output)
+        self.assertFalse(PengukuranFisik.objects.exclude(skor_Z_BB_U=3).exists())
+
+    def test_filter_pasien_dan_since(self):
+        self.jalankan('--pasien', str(self.pasien[0].id), '--since', '2020-07-01')
+        self.assertEqual(PengukuranFisik.objects.exclude(skor_Z_BB_U=3).count(), 2)
+
+    def test_jalankan_ulang_tidak_mengubah_apa_pun(self):
+        self.jalankan()
+        self.assertIn('0 diperbarui', self.jalankan())
@@ -0,0 +1,110 @@
+from datetime import date
+from django.contrib.auth.models import User, Group
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from .models import Pasien, PengukuranFisik, Konsultasi, Kondisi, Gejala, StatistikDasbor
+from . import statistik
+
+class StatistikDasborTest(TestCase):
+    def setUp(self):
+        self.pasien = Pasien.objects.create(
+            namaPengguna="anak", nama="Anak", jenisKelamin="L", tanggalLahir=date(2022, 1, 1), kataSandi="x"
+        )
+        self.kondisi = Kondisi.objects.create(kodeKondisi="K01", namaKondisi="Stunting", deskripsi="-", solusi="-")
+        Gejala.objects.create(kodeGejala="G01", namaGejala="Pendek")
+        self.bulan_ini = timezone.localdate().replace(day=1)
+
+    def rekap(self):
+        return {
+            (baris.jenis, baris.bulan, baris.kunci): baris.jumlah
+            for baris in StatistikDasbor.objects.exclude(jumlah=0)
+        }
+
+    def assertRekapSamaDenganHitungUlang(self):
+        bertahap = self.rekap()
+        statistik.bangun_ulang_statistik()
+        self.assertEqual(bertahap, self.rekap())
+
+    def test_total_diperbarui_oleh_sinyal(self):
+        Konsultasi.objects.create(pasien=self.pasien, hasilKondisi=self.kondisi)
+        total = statistik.statistik_dasbor()['total']
+        self.assertEqual(total, {'pasien': 1, 'konsultasi': 1, 'gejala': 1, 'kondisi': 1, 'aturan': 0})
+        self.assertRekapSamaDenganHitungUlang()
+
+    def test_baris_total_unik(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StatistikDasbor.objects.create(jenis='total', bulan=None, kunci='pasien', jumlah=1)
+        # Baris total yang belum ada dibuat sekali, lalu penambahan berikutnya lewat UPDATE
+        statistik._tambah('total', None, 'notifikasi', 1)
+        statistik._tambah('total', None, 'notifikasi', 1)
+        self.assertEqual(StatistikDasbor.objects.get(jenis='total', kunci='notifikasi').jumlah, 2)
+
+    def test_konsultasi_per_kondisi_mengikuti_perubahan(self):
+        konsultasi = Konsultasi.objects.create(pasien=self.pasien)
+        self.assertEqual(self.rekap()[('konsultasi_kondisi', self.bulan_ini, '')], 1)
+
+        konsultasi.hasilKondisi = self.kondisi
+        konsultasi.save()
+        rekap = self.rekap()
+        self.assertEqual(rekap[('konsultasi_kondisi', self.bulan_ini, 'K01')], 1)
+        self.assertNotIn(('konsultasi_kondisi', self.bulan_ini, ''), rekap)
+
+        self.kondisi.delete()
+        self.assertEqual(self.rekap()[('konsultasi_kondisi', self.bulan_ini, '')], 1)
+        self.assertRekapSamaDenganHitungUlang()
+
+    def test_prevalensi_stunting_per_bulan(self):
+        anak = [self.pasien] + [
+            Pasien.objects.create(
+                namaPengguna=f"anak{i}", nama=f"Anak {i}", jenisKelamin="P", tanggalLahir=date(2022, 1, 1), kataSandi="x"
+            )
+            for i in range(1, 4)
+        ]
+        for pasien, skor in zip(anak, (-2.5, -1.0, 0.5, -3.1)):
+            PengukuranFisik.objects.create(
+                pasien=pasien, tanggalUkur=self.bulan_ini, beratBadan=10, tinggiBadan=80, skor_Z_TB_U=skor
+            )
+        # Belum dihitung z-score-nya: tidak ikut penyebut
+        PengukuranFisik.objects.create(pasien=self.pasien, tanggalUkur=self.bulan_ini, beratBadan=10, tinggiBadan=80)
+
+        data = statistik.statistik_dasbor()['bulanan'][0]
+        self.assertEqual((data['diukur'], data['stunting'], data['prevalensi_stunting']), (4, 2, 50.0))
+
+        # Pengukuran ulang anak yang sama di bulan yang sama: dihitung sekali dari pengukuran terakhir
+        PengukuranFisik.objects.create(
+            pasien=anak[1], tanggalUkur=self.bulan_ini, beratBadan=10, tinggiBadan=80, skor_Z_TB_U=-2.2
+        )
+        data = statistik.statistik_dasbor()['bulanan'][0]
+        self.assertEqual((data['diukur'], data['stunting']), (4, 3))
+
+        pengukuran = PengukuranFisik.objects.get(skor_Z_TB_U=-3.1)
+        pengukuran.skor_Z_TB_U = 0
+        pengukuran.save()
+        data = statistik.statistik_dasbor()['bulanan'][0]
+        self.assertEqual((data['diukur'], data['stunting']), (4, 2))
+        pengukuran.delete()
+        data = statistik.statistik_dasbor()['bulanan'][0]
+        self.assertEqual((data['diukur'], data['stunting']), (3, 2))
+        self.assertRekapSamaDenganHitungUlang()
+
+    def test_hapus_pasien_mengurangi_rekap(self):
+        Konsultasi.objects.create(pasien=self.pasien, hasilKondisi=self.kondisi)
+        PengukuranFisik.objects.create(
+            pasien=self.pasien, tanggalUkur=self.bulan_ini, beratBadan=10, tinggiBadan=80, skor_Z_TB_U=-2.5
+        )
+        self.pasien.delete()
+        self.assertEqual(self.rekap(), {('total', None, 'kondisi'): 1, ('total', None, 'gejala'): 1})
+
+    def test_dasbor_membaca_rekap(self):
+        Konsultasi.objects.create(pasien=self.pasien, hasilKondisi=self.kondisi)
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+        self.client.login(username='pakar', password='password123')
+
+        with self.assertNumQueries(5):  # sesi, user, grup, rekap, nama kondisi
+            response = self.client.get(reverse('dashboard_pakar'))
+        self.assertEqual(response.context['total_konsultasi'], 1)
+        self.assertEqual(response.context['kolom_kondisi'], [('K01', 'Stunting')])
+        self.assertEqual(response.context['statistik_bulanan'][0]['konsultasi_per_kondisi'], [1])
@@ -0,0 +1,85 @@
+from datetime import date
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+from django.urls import reverse
+from .models import Pasien, Kondisi, Gejala, Konsultasi, DetailKonsultasi, PengukuranFisik
+from .timeline_pasien import muat_timeline_pasien
+
+class TimelinePasienTest(TestCase):
+    def setUp(self):
+        self.pasien = Pasien(
+            namaPengguna="testuser",
+            nama="Test User",
+            jenisKelamin="L",
+            tanggalLahir=date(2020, 1, 1)
+        )
+        self.pasien.set_password("testpassword")
+        self.pasien.save()
+
+        self.kondisi = Kondisi.objects.create(
+            kodeKondisi="K01", namaKondisi="Stunting", deskripsi="Tinggi badan kurang", solusi="Perbaiki gizi"
+        )
+        self.gejala = [Gejala.objects.create(kodeGejala=f"G0{i}", namaGejala=f"Gejala {i}") for i in range(1, 4)]
+
+        PengukuranFisik.objects.create(
+            pasien=self.pasien, tanggalUkur=date(2021, 1, 1), beratBadan=9.5, tinggiBadan=75.0, skor_Z_BB_U=-1.2
+        )
+
+        pakar = User.objects.create_user(username='pakar', password='password123', is_staff=True)
+        pakar.groups.add(Group.objects.get_or_create(name='Pakar Diagnosa')[0])
+
+    def buat_konsultasi(self, jumlah):
+        for i in range(jumlah):
+            konsultasi = Konsultasi.objects.create(pasien=self.pasien, hasilKondisi=self.kondisi if i % 2 else None)
+            DetailKonsultasi.objects.bulk_create([
+                DetailKonsultasi(konsultasi=konsultasi, gejala=gejala) for gejala in self.gejala
+            ])
+
+    def test_jumlah_query_tetap(self):
+        self.buat_konsultasi(2)
+        with self.assertNumQueries(4):
+            timeline = muat_timeline_pasien(self.pasien.id)
+
+        self.buat_konsultasi(20)
+        with self.assertNumQueries(4):
+            timeline = muat_timeline_pasien(self.pasien.id)
+            # Akses hasil kondisi dan gejala tidak memicu query tambahan
+            for konsultasi in timeline.konsultasi_list:
+                str(konsultasi.hasilKondisi)
+                [detail.gejala.namaGejala for detail in konsultasi.detail_gejala]
+        self.assertEqual(len(timeline.konsultasi_list), 22)
+        self.assertEqual(len(timeline.pengukuran_list), 1)
+
+    def test_tanpa_konsultasi(self):
+        self.buat_konsultasi(3)
+        with self.assertNumQueries(2):
+            timeline = muat_timeline_pasien(self.pasien.id, konsultasi=False)
+        self.assertEqual(timeline.konsultasi_list, [])
+
+    def test_detail_pasien_pakar_tanpa_n_plus_1(self):
+        self.client.login(username='pakar', password='password123')
+        url = reverse('detail_pasien_pakar', kwargs={'pasien_id': self.pasien.id})
+        # session, user, cek grup pakar, lalu 4 query timeline
+        self.buat_konsultasi(1)
+        with self.assertNumQueries(7):
+            self.client.get(url)
+
+        self.buat_konsultasi(10)
+        with self.assertNumQueries(7):
+            response = self.client.get(url)
+        for kode in ("G01", "G02", "G03"):
+            self.assertContains(response, kode)
+
+    def test_endpoint_json(self):
+        self.buat_konsultasi(2)
+        self.client.login(username='pakar', password='password123')
+        response = self.client.get(reverse('timeline_pasien_pakar', kwargs={'pasien_id': self.pasien.id}))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['pasien']['nama'], "Test User")
+        self.assertEqual(data['pengukuran'][0]['zscore']['bb_u'], -1.2)
+        self.assertEqual([k['kondisi'] for k in data['konsultasi']], [{'kode': 'K01', 'nama': 'Stunting'}, None])
+        self.assertEqual([g['kode'] for g in data['konsultasi'][0]['gejala']], ['G01', 'G02', 'G03'])
+
+        response = self.client.get(reverse('timeline_pasien_pakar', kwargs={'pasien_id': 9999}))
+        self.assertEqual(response.status_code, 404)
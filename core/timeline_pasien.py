@@ -0,0 +1,145 @@
+"""
+Timeline Pasien - Pemuat Riwayat Pasien dengan Jumlah Query Tetap
+
+Mengambil pasien beserta seluruh pengukuran dan konsultasinya (hasil kondisi
+dan gejala yang dipilih) memakai Prefetch, sehingga jumlah query tidak
+bergantung pada banyaknya konsultasi:
+
+    1. Pasien
+    2. PengukuranFisik pasien
+    3. Konsultasi pasien JOIN Kondisi
+    4. DetailKonsultasi semua konsultasi tersebut JOIN Gejala
+
+Dipakai bersama oleh halaman detail pasien pakar, ekspor PDF, dan endpoint JSON.
+"""
+from collections import namedtuple
+
+from django.db.models import Prefetch
+
+from .models import Pasien, PengukuranFisik, Konsultasi, DetailKonsultasi
+from .utils import KOLOM_ZSCORE
+
+TimelinePasien = namedtuple('TimelinePasien', [
+    'pasien',             # Objek Pasien
+    'pengukuran_list',    # List PengukuranFisik, terbaru dahulu
+    'konsultasi_list',    # List Konsultasi (hasilKondisi terisi, .detail_gejala berisi DetailKonsultasi)
+])
+
+
+def _prefetch_timeline(pengukuran, konsultasi):
+    prefetch = []
+    if pengukuran:
+        prefetch.append(Prefetch(
+            'pengukuranfisik_set',
+            queryset=PengukuranFisik.objects.order_by('-tanggalUkur', '-id'),
+            to_attr='timeline_pengukuran'
+        ))
+    if konsultasi:
+        detail = DetailKonsultasi.objects.select_related('gejala').order_by('gejala_id')
+        prefetch.append(Prefetch(
+            'konsultasi_set',
+            queryset=Konsultasi.objects.select_related('hasilKondisi')
+                .prefetch_related(Prefetch('detailkonsultasi_set', queryset=detail, to_attr='detail_gejala'))
+                .order_by('-tanggalKonsultasi', '-id'),
+            to_attr='timeline_konsultasi'
+        ))
+    return prefetch
+
+
+def _timeline_dari_pasien(pasien):
+    return TimelinePasien(
+        pasien=pasien,
+        pengukuran_list=getattr(pasien, 'timeline_pengukuran', []),
+        konsultasi_list=getattr(pasien, 'timeline_konsultasi', []),
+    )
+
+
+def muat_timeline_pasien(pasien_id, pengukuran=True, konsultasi=True):
+    """
+    Muat timeline lengkap satu pasien dengan jumlah query tetap
+
+    Args:
+        pasien_id: ID Pasien
+        pengukuran: Sertakan riwayat pengukuran fisik
+        konsultasi: Sertakan riwayat konsultasi beserta gejalanya
+
+    Returns:
+        TimelinePasien; list yang tidak diminta berisi list kosong
+
+    Raises:
+        Pasien.DoesNotExist: Jika pasien tidak ditemukan
+    """
+    pasien = Pasien.objects.prefetch_related(*_prefetch_timeline(pengukuran, konsultasi)).get(id=pasien_id)
+    return _timeline_dari_pasien(pasien)
+
+
+def muat_timeline_banyak_pasien(pasien_queryset, pengukuran=True, konsultasi=True):
+    """
+    Muat timeline banyak pasien sekaligus; jumlah query sama dengan satu pasien
+
+    Args:
+        pasien_queryset: QuerySet Pasien yang sudah difilter dan diurutkan
+        pengukuran: Sertakan riwayat pengukuran fisik
+        konsultasi: Sertakan riwayat konsultasi beserta gejalanya
+
+    Returns:
+        List TimelinePasien sesuai urutan queryset
+    """
+    pasien_list = pasien_queryset.prefetch_related(*_prefetch_timeline(pengukuran, konsultasi))
+    return [_timeline_dari_pasien(pasien) for pasien in pasien_list]
+
+
+def desimal_ke_float(nilai):
+    return float(nilai) if nilai is not None else None
+
+
+def timeline_ke_dict(timeline):
+    """
+    Ubah TimelinePasien menjadi dict yang siap di-serialisasi ke JSON
+
+    Args:
+        timeline: TimelinePasien hasil muat_timeline_pasien
+
+    Returns:
+        dict dengan kunci 'pasien', 'pengukuran', dan 'konsultasi'
+    """
+    pasien = timeline.pasien
+    return {
+        'pasien': {
+            'id': pasien.id,
+            'nama': pasien.nama,
+            'jenis_kelamin': pasien.jenisKelamin,
+            'tanggal_lahir': pasien.tanggalLahir.isoformat(),
+            'nama_wali': pasien.namaWali,
+        },
+        'pengukuran': [
+            {
+                'id': pengukuran.id,
+                'tanggal': pengukuran.tanggalUkur.isoformat(),
+                'berat_badan': desimal_ke_float(pengukuran.beratBadan),
+                'tinggi_badan': desimal_ke_float(pengukuran.tinggiBadan),
+                'lingkar_kepala': desimal_ke_float(pengukuran.lingkarKepala),
+                'lingkar_lengan': desimal_ke_float(pengukuran.lingkarLengan),
+                'zscore': {
+                    indikator: desimal_ke_float(getattr(pengukuran, kolom))
+                    for indikator, kolom in KOLOM_ZSCORE.items()
+                },
+            }
+            for pengukuran in timeline.pengukuran_list
+        ],
+        'konsultasi': [
+            {
+                'id': konsultasi.id,
+                'tanggal': konsultasi.tanggalKonsultasi.isoformat(),
+                'kondisi': {
+                    'kode': konsultasi.hasilKondisi.kodeKondisi,
+                    'nama': konsultasi.hasilKondisi.namaKondisi,
+                } if konsultasi.hasilKondisi else None,
+                'gejala': [
+                    {'kode': detail.gejala.kodeGejala, 'nama': detail.gejala.namaGejala}
+                    for detail in konsultasi.detail_gejala
+                ],
+            }
+            for konsultasi in timeline.konsultasi_list
+        ],
+    }
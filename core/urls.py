@@ -24,27 +24,42 @@ urlpatterns = [
     
     # Paths for anthropometric data and notifications
     path('grafik/<int:pasien_id>/', views.tampilkan_grafik_riwayat, name='tampilkan_grafik_riwayat'),
+    path('grafik/<int:pasien_id>/data/', views.data_grafik_riwayat, name='data_grafik_riwayat'),
     path('riwayat/', views.riwayat_pengukuran, name='riwayat_pengukuran'),
     path('riwayat/list/', views.riwayat_list, name='riwayat_list'),
     path('riwayat/pdf/', views.cetak_riwayat_pdf, name='cetak_riwayat_pdf'),
     path('diagnosa/preview/', views.preview_diagnosa, name='preview_diagnosa'),
     path('diagnosa/hasil/<int:konsultasi_id>/pdf/', views.cetak_hasil_diagnosa_pdf, name='cetak_hasil_diagnosa_pdf'),
+    path('riwayat/pdf/antri/', views.antre_riwayat_pdf, name='antre_riwayat_pdf'),
+    path('diagnosa/hasil/<int:konsultasi_id>/pdf/antri/', views.antre_hasil_diagnosa_pdf, name='antre_hasil_diagnosa_pdf'),
+    path('pdf/tugas/<uuid:tugas_id>/', views.status_tugas_pdf, name='status_tugas_pdf'),
+    path('pdf/tugas/<uuid:tugas_id>/unduh/', views.unduh_tugas_pdf, name='unduh_tugas_pdf'),
     # Expert/Admin paths
     path('pakar/dashboard/', views.dashboard_pakar, name='dashboard_pakar'),
     path('pakar/help/', views.pakar_help, name='pakar_help'),
     path('pakar/rules/create/', views.create_rule_group, name='create_rule_group'),
     path('pakar/patients/', views.list_patients_pakar, name='list_patients_pakar'),
     path('pakar/patients/<int:pasien_id>/', views.detail_pasien_pakar, name='detail_pasien_pakar'),
+    path('pakar/patients/<int:pasien_id>/timeline/', views.timeline_pasien_pakar, name='timeline_pasien_pakar'),
     path('pakar/patients/create/', views.create_pasien_pakar, name='create_pasien_pakar'),
     path('pakar/patients/<int:pasien_id>/edit/', views.edit_pasien_pakar, name='edit_pasien_pakar'),
     path('pakar/patients/<int:pasien_id>/delete/', views.delete_pasien_pakar, name='delete_pasien_pakar'),
     path('pakar/rules/', views.list_rules_pakar, name='list_rules_pakar'),
+    path('pakar/rules/analisis/', views.analisis_aturan_pakar, name='analisis_aturan_pakar'),
     path('pakar/rules/<str:pk>/detail/', views.show_rule_detail, name='show_rule_detail'),
     path('pakar/rules/<str:pk>/edit/', views.edit_rule_pakar, name='edit_rule_pakar'),
     path('pakar/rules/<str:pk>/delete/', views.delete_rule_pakar, name='delete_rule_pakar'),
+    path('pakar/diagnosa/batch/', views.inferensi_batch_pakar, name='inferensi_batch_pakar'),
+    path('pakar/diagnosa/ulang/', views.diagnosa_ulang_pakar, name='diagnosa_ulang_pakar'),
     
     # Pengukuran (Measurement) management paths
     path('pakar/pengukuran/', views.list_pengukuran_pakar, name='list_pengukuran_pakar'),
+    path('pakar/pengukuran/cetak/', views.cetak_massal_pdf_pakar, name='cetak_massal_pdf_pakar'),
+    path('pakar/pengukuran/analitik/', views.analitik_pengukuran_pakar, name='analitik_pengukuran_pakar'),
+    path('pakar/pengukuran/impor/', views.impor_pengukuran_pakar, name='impor_pengukuran_pakar'),
+    path('pakar/pengukuran/impor/<str:token>/kesalahan/', views.unduh_laporan_impor, name='unduh_laporan_impor'),
+    path('pakar/ekspor/', views.ekspor_data_pakar, name='ekspor_data_pakar'),
+    path('pakar/ekspor/<str:dataset>/', views.unduh_ekspor_pakar, name='unduh_ekspor_pakar'),
     path('pakar/pengukuran/create/', views.create_pengukuran_pakar, name='create_pengukuran_pakar'),
     path('pakar/pengukuran/<int:pk>/edit/', views.edit_pengukuran_pakar, name='edit_pengukuran_pakar'),
     path('pakar/pengukuran/<int:pk>/delete/', views.delete_pengukuran_pakar, name='delete_pengukuran_pakar'),
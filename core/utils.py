@@ -1,8 +1,52 @@
+import math
 import random
 import datetime as dt_module
 from datetime import timedelta, date, datetime
+from decimal import Decimal
+from django.core.cache import cache
 from django.utils import timezone
 from .models import Pasien, PengukuranFisik, Notifikasi
+from .standar_pertumbuhan import hitung_semua_zscore, zscore_wajar
+
+# Indikator standar_pertumbuhan -> kolom PengukuranFisik yang menyimpan z-score-nya
+KOLOM_ZSCORE = {
+    'bb_u': 'skor_Z_BB_U',
+    'tb_u': 'skor_Z_TB_U',
+    'bb_tb': 'skor_Z_BB_TB',
+    'imt_u': 'skor_Z_IMT_U',
+    'lk_u': 'skor_Z_LK_U',
+    'lla_u': 'skor_Z_LLA_U',
+}
+
+
+def zscore_ke_desimal(indikator, z):
+    """
+    Bulatkan z-score ke 2 desimal untuk disimpan
+
+    NaN (di luar tabel WHO) dan z-score di luar BATAS_WAJAR menjadi None:
+    nilai sebesar itu berasal dari salah input dan tidak muat di kolom
+    DecimalField(max_digits=5, decimal_places=2).
+    """
+    if math.isnan(z) or not zscore_wajar(indikator, z):
+        return None
+    return Decimal(f'{z:.2f}')
+
+
+def indikator_tidak_wajar(hasil):
+    """
+    Indikator yang z-score-nya dapat dihitung tetapi di luar BATAS_WAJAR
+
+    Args:
+        hasil: dict indikator -> z-score (hasil hitung_semua_zscore)
+
+    Returns:
+        List kode indikator, urut KOLOM_ZSCORE
+    """
+    return [
+        indikator for indikator in KOLOM_ZSCORE
+        if not math.isnan(float(hasil[indikator])) and not zscore_wajar(indikator, float(hasil[indikator]))
+    ]
+
 
 def hitung_dan_simpan_zscore(pengukuran_id):
     """
@@ -13,77 +57,57 @@ def hitung_dan_simpan_zscore(pengukuran_id):
         
     Returns:
         Objek PengukuranFisik yang telah diupdate dengan Z-Score
+
+    Raises:
+        ValueError: Data tidak valid, atau ada z-score tidak wajar (dilempar
+            setelah z-score lain disimpan; z-score tidak wajar disimpan kosong)
     """
     try:
         # Terima pengukuran_id dari objek PengukuranFisik yang baru diinput
-        pengukuran = PengukuranFisik.objects.get(id=pengukuran_id)
+        pengukuran = PengukuranFisik.objects.select_related('pasien').get(id=pengukuran_id)
     except PengukuranFisik.DoesNotExist:
         raise ValueError("Pengukuran tidak ditemukan")
     
     try:
-        # Ambil tanggalLahir, jenisKelamin (dari Pasien), beratBadan, dan tinggiBadan (dari PengukuranFisik)
+        # Ambil tanggalLahir, jenisKelamin (dari Pasien) dan hasil antropometri (dari PengukuranFisik)
         pasien = pengukuran.pasien
         tanggal_lahir = pasien.tanggalLahir
         jenis_kelamin = pasien.jenisKelamin
         berat_badan = float(pengukuran.beratBadan)
         tinggi_badan = float(pengukuran.tinggiBadan)
+        lingkar_kepala = float(pengukuran.lingkarKepala) if pengukuran.lingkarKepala is not None else math.nan
+        lingkar_lengan = float(pengukuran.lingkarLengan) if pengukuran.lingkarLengan is not None else math.nan
         tanggal_ukur = pengukuran.tanggalUkur
-    except (ValueError, AttributeError) as e:
+    except (ValueError, AttributeError, TypeError) as e:
         raise ValueError(f"Data pengukuran tidak valid: {str(e)}")
     
     # Hitung Usia Anak dalam bulan (umur_bulan) dari tanggalLahir Pasien dan tanggalUkur
     umur_bulan = (tanggal_ukur.year - tanggal_lahir.year) * 12 + (tanggal_ukur.month - tanggal_lahir.month)
+    umur_hari = (tanggal_ukur - tanggal_lahir).days
     
     # Validasi umur (harus positif dan masuk akal)
-    if umur_bulan < 0:
+    if umur_hari < 0:
         raise ValueError("Tanggal pengukuran tidak valid - tanggal pengukuran sebelum tanggal lahir pasien")
     
     # Validasi umur tidak terlalu besar (misalnya lebih dari 20 tahun)
     if umur_bulan > 240:  # 20 tahun
         raise ValueError("Tanggal pengukuran tidak valid - usia anak terlalu besar")
     
-    # Simulasi Lookup Tabel Z-Score: 
-    # Tampilkan placeholder di kode yang menunjukkan bagaimana nilai SD (+2, -2, dll.) 
-    # akan dicari berdasarkan umur_bulan dan jenisKelamin.
-    
-    # Placeholder untuk simulasi lookup tabel Z-Score WHO
-    # Dalam implementasi nyata, ini akan melibatkan tabel referensi WHO
-    # Berdasarkan umur_bulan dan jenisKelamin, kita akan mendapatkan:
-    # median_berat, sd_berat, median_tinggi, sd_tinggi
-    
-    # Untuk simulasi, kita gunakan nilai acak namun realistis berdasarkan umur
-    if umur_bulan <= 24:  # Bayi 0-24 bulan
-        median_berat = 0.5 * umur_bulan + 3.0
-        sd_berat = 0.2 * umur_bulan + 0.5
-        median_tinggi = 2.0 * umur_bulan + 45.0
-        sd_tinggi = 0.3 * umur_bulan + 1.0
-    elif umur_bulan <= 60:  # Balita 2-5 tahun
-        median_berat = 0.2 * umur_bulan + 7.0
-        sd_berat = 0.15 * umur_bulan + 0.8
-        median_tinggi = 1.5 * umur_bulan + 65.0
-        sd_tinggi = 0.2 * umur_bulan + 1.2
-    else:  # Anak > 5 tahun
-        median_berat = 0.15 * umur_bulan + 10.0
-        sd_berat = 0.1 * umur_bulan + 1.0
-        median_tinggi = 1.2 * umur_bulan + 80.0
-        sd_tinggi = 0.15 * umur_bulan + 1.5
-    
-    # Hitung Z-Score menggunakan rumus: (nilai - median) / SD
-    try:
-        z_score_bb_u = round((berat_badan - median_berat) / sd_berat, 2)
-        z_score_tb_u = round((tinggi_badan - median_tinggi) / sd_tinggi, 2)
-    except ZeroDivisionError:
-        raise ValueError("Terjadi kesalahan dalam perhitungan Z-Score")
-    
-    # Batasi nilai Z-Score agar realistis (biasanya antara -3 dan +3)
-    z_score_bb_u = max(min(z_score_bb_u, 3.0), -3.0)
-    z_score_tb_u = max(min(z_score_tb_u, 3.0), -3.0)
+    # Hitung seluruh indikator dengan tabel LMS WHO (interpolasi per hari umur).
+    # Di luar jangkauan tabel (lebih dari 5 tahun) hasilnya NaN dan disimpan kosong.
+    hasil = hitung_semua_zscore(
+        jenis_kelamin, umur_hari, berat_badan, tinggi_badan, lingkar_kepala, lingkar_lengan
+    )
     
     # Simpan hasil Z-Score yang dihitung kembali ke objek PengukuranFisik
-    pengukuran.skor_Z_BB_U = z_score_bb_u
-    pengukuran.skor_Z_TB_U = z_score_tb_u
+    for indikator, kolom in KOLOM_ZSCORE.items():
+        setattr(pengukuran, kolom, zscore_ke_desimal(indikator, float(hasil[indikator])))
     pengukuran.save()
     
+    tidak_wajar = indikator_tidak_wajar(hasil)
+    if tidak_wajar:
+        raise ValueError(f"Z-score tidak wajar ({', '.join(tidak_wajar)}); periksa satuan berat/tinggi")
+    
     return pengukuran
 
 
@@ -151,10 +175,52 @@ def buat_jadwal_notifikasi(pengukuran):
             tipe='edukasi_gizi'
         )
         
+        # Badge notifikasi pasien harus langsung menampilkan notifikasi baru
+        reset_cache_notifikasi(pasien.id)
+        
         return notifikasi        
     except Pasien.DoesNotExist:
         print("[ERROR] Pasien tidak ditemukan")
         raise ValueError("Pasien tidak ditemukan")
     except Exception as e:
         print(f"[ERROR] Gagal membuat notifikasi: {str(e)}")
-        raise ValueError(f"Gagal membuat notifikasi: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Gagal membuat notifikasi: {str(e)}")
+
+
+# Badge notifikasi dirender di setiap halaman portal pasien; jumlahnya di-cache
+# sebentar agar tidak ada COUNT(*) per request. Notifikasi terjadwal yang baru
+# jatuh tempo akan muncul paling lambat setelah TTL ini.
+TTL_CACHE_NOTIFIKASI = 60
+
+
+def _kunci_cache_notifikasi(pasien_id):
+    return f'notif_count:{pasien_id}'
+
+
+def hitung_notifikasi_belum_dibaca(pasien_id):
+    """
+    Jumlah notifikasi jatuh tempo yang belum dibaca pasien (di-cache per pasien)
+    
+    Args:
+        pasien_id: ID Pasien
+        
+    Returns:
+        Integer jumlah notifikasi belum dibaca
+    """
+    kunci = _kunci_cache_notifikasi(pasien_id)
+    jumlah = cache.get(kunci)
+    if jumlah is None:
+        jumlah = Notifikasi.objects.filter(
+            pasien_id=pasien_id,
+            sudahTerkirim=False,
+            jadwalNotifikasi__lte=timezone.now()
+        ).count()
+        cache.set(kunci, jumlah, TTL_CACHE_NOTIFIKASI)
+    return jumlah
+
+
+def reset_cache_notifikasi(pasien_id):
+    """
+    Hapus jumlah notifikasi yang di-cache setelah notifikasi dibuat, dibaca, atau dihapus
+    """
+    cache.delete(_kunci_cache_notifikasi(pasien_id))
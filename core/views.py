@@ -1,14 +1,34 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
 from django.template.loader import get_template
-from .models import Pasien, Konsultasi, DetailKonsultasi, Gejala, Kondisi, Aturan, PengukuranFisik, Notifikasi
-from django.db.models import Count
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import urlencode
+from .models import Pasien, Konsultasi, DetailKonsultasi, Gejala, Kondisi, Aturan, PengukuranFisik, Notifikasi, TugasPdf
+from django.db.models import Count, Max, Q
 from django.db import transaction
 from collections import defaultdict
+import os
 import random
-from datetime import date, timedelta
-from .utils import hitung_dan_simpan_zscore, buat_jadwal_notifikasi
+import tempfile
+from datetime import date, datetime, timedelta
+from .utils import hitung_dan_simpan_zscore, buat_jadwal_notifikasi, reset_cache_notifikasi
+from .mesin_inferensi import dapatkan_indeks, peringkat_kelompok_terdekat
+from .paginasi import halaman_dari_request
+from .statistik import catat_objek_baru, statistik_dasbor
+from .ekspor import DATASET, FORMAT_CSV, FORMAT_PARQUET, PILIHAN_FORMAT_EKSPOR, TANPA_KONDISI, alirkan_ekspor, queryset_ekspor
+from .impor_pengukuran import impor_dengan_laporan, path_laporan
+from .diagnosa_ulang import berbeda_dari_diagnosa_awal, diagnosa_ulang
+from .analisis_aturan import analisis_kelompok, periksa_perubahan, pesan_konflik, pesan_peringatan
+from .analitik import DIMENSI, DIMENSI_BULAN, INDIKATOR_PREVALENSI, ambil_kolom, baris_tabel, hitung_prevalensi, tulis_csv
+from .timeline_pasien import muat_timeline_pasien, timeline_ke_dict, desimal_ke_float
+from .laporan_pdf import (
+    respons_pdf, respons_pdf_dari_cache, laporan_riwayat, laporan_hasil_diagnosa, ada_di_cache
+)
+from .antrian_pdf import antrekan_pdf, antrekan_ulang, tugas_siap_diunduh
+from .kurva_referensi import HARI_PER_BULAN, url_kurva
+from .laporan_massal import FORMAT_PDF, PILIHAN_FORMAT, pilih_pasien, muat_laporan_massal, tulis_laporan_massal
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import authenticate, login, logout
 from django.forms import modelformset_factory, ModelForm
@@ -52,78 +72,109 @@ def jalankan_inferensi(pasien_id, kode_gejala_input):
         Objek Konsultasi yang berisi hasil diagnosa
     """
     
-    # Langkah 1: Inisialisasi dan Pencatatan Konsultasi
+    # Langkah 1: Inisialisasi
     try:
         pasien = Pasien.objects.get(id=pasien_id)
     except Pasien.DoesNotExist:
         raise ValueError("Pasien tidak ditemukan")
     
-    # Buat objek Konsultasi baru
-    konsultasi = Konsultasi.objects.create(pasien=pasien)
-    
-    # Catat semua kode_gejala_input ke dalam DetailKonsultasi
-    for kode_gejala in kode_gejala_input:
-        try:
-            gejala = Gejala.objects.get(kodeGejala=kode_gejala)
-            DetailKonsultasi.objects.create(konsultasi=konsultasi, gejala=gejala)
-        except Gejala.DoesNotExist:
-            # Lewati gejala yang tidak ditemukan
-            continue
-    
     # Inisialisasi Working Memory (WM) dengan kode_gejala_input
     working_memory = set(kode_gejala_input)
     
     # Langkah 2: Logika Strict Equality Matching (Kecocokan Persis)
-    # Ambil semua objek Aturan dari database
-    semua_aturan = Aturan.objects.select_related('kondisi', 'gejala').all()
-    
-    # Kelompokkan aturan berdasarkan pasangan kondisi dan kodeKelompokAturan
-    aturan_kelompok = defaultdict(list)
-    for aturan in semua_aturan:
-        key = (aturan.kondisi.kodeKondisi, aturan.kodeKelompokAturan)
-        aturan_kelompok[key].append(aturan)
-    
-    # Ulangi setiap kelompok aturan yang teridentifikasi
-    diagnosis_ditemukan = None
-    
-    # Variabel untuk menyimpan diagnosis yang ditemukan dengan exact matching
-    diagnosis_terbaik = None
-    
-    for (kode_kondisi, kode_kelompok), aturan_list in aturan_kelompok.items():
-        # Ambil semua gejala yang dibutuhkan oleh rule ini
-        gejala_di_rule = set(aturan.gejala.kodeGejala for aturan in aturan_list)
-        
-        # CEK APAKAH USER MEMILIH GEJALA SAMA PERSIS DENGAN YANG ADA DI RULE (Strict Equality Matching)
-        if gejala_di_rule == working_memory:
-            # Berhasil temukan exact match
-            try:
-                kondisi_saat_ini = Kondisi.objects.get(kodeKondisi=kode_kondisi)
-                diagnosis_terbaik = kondisi_saat_ini
-                break  # Hentikan pencarian karena sudah ditemukan exact match
-                
-            except Kondisi.DoesNotExist:
-                # Jika kondisi tidak ditemukan, lanjutkan ke kelompok aturan berikutnya
-                continue
-    
-    # Jika ditemukan diagnosis dengan exact match, gunakan itu
-    if diagnosis_terbaik:
-        konsultasi.hasilKondisi = diagnosis_terbaik
-        diagnosis_ditemukan = True
-    else:
-        # Tidak ada satupun kelompok aturan yang cocok persis
-        # Set konsultasi.hasilKondisi = None
-        konsultasi.hasilKondisi = None
-        # Sistem harus mengirimkan sinyal ke view/template bahwa 
-        # "Gejala yang dipilih tidak sesuai dengan kombinasi rule diagnosis manapun"
-    
-    # Output dan Penyimpanan
-    # Simpan (.save()) objek Konsultasi yang sudah diisi hasilKondisi
-    konsultasi.save()
+    # Kelompok aturan sudah dikompilasi sekali per proses menjadi dict bitmask -> Kondisi,
+    # sehingga pencocokan persis cukup satu lookup tanpa query ke database.
+    # Jika tidak ada kelompok yang cocok persis, hasilKondisi = None dan view akan
+    # menampilkan "Gejala yang dipilih tidak sesuai dengan kombinasi rule diagnosis manapun"
+    indeks = dapatkan_indeks()
+    diagnosis_terbaik = indeks.cocokkan(working_memory)
+    
+    # Validasi semua kode gejala dengan satu query IN (gejala yang tidak ditemukan dilewati)
+    gejala_valid = sorted(Gejala.objects.filter(kodeGejala__in=working_memory).values_list('kodeGejala', flat=True))
+    
+    # Langkah 3: Pencatatan Konsultasi
+    # Jumlah query tetap berapa pun gejala yang dipilih: satu INSERT Konsultasi yang
+    # hasilKondisi-nya sudah terisi dan satu bulk INSERT DetailKonsultasi dalam satu transaksi
+    with transaction.atomic():
+        konsultasi = Konsultasi.objects.create(
+            pasien=pasien, hasilKondisi=diagnosis_terbaik, snapshotBasisPengetahuan_id=indeks.snapshot_id
+        )
+        DetailKonsultasi.objects.bulk_create([
+            DetailKonsultasi(konsultasi=konsultasi, gejala_id=kode_gejala)
+            for kode_gejala in gejala_valid
+        ])
     
     # Kembalikan objek Konsultasi yang berisi hasil diagnosa
     return konsultasi
 
 
+def jalankan_inferensi_batch(daftar_input):
+    """
+    Mesin Inferensi untuk banyak lembar skrining sekaligus (entri offline posyandu)
+
+    Semua baris dicocokkan terhadap satu snapshot indeks aturan, lalu disimpan
+    dengan bulk INSERT dalam satu transaksi. Jumlah query tetap berapa pun
+    banyaknya baris.
+
+    Args:
+        daftar_input: Iterable pasangan (pasien_id, [kode_gejala])
+
+    Returns:
+        List dict hasil per baris dengan kunci: baris, pasien_id, konsultasi_id,
+        kode_kondisi, nama_kondisi, error
+    """
+    daftar_input = [(pasien_id, set(kode_gejala)) for pasien_id, kode_gejala in daftar_input]
+
+    # Satu snapshot basis pengetahuan untuk seluruh batch
+    indeks = dapatkan_indeks()
+
+    # Validasi pasien dan gejala masing-masing dengan satu query IN
+    pasien_valid = set(Pasien.objects.filter(
+        id__in={pasien_id for pasien_id, _ in daftar_input}
+    ).values_list('id', flat=True))
+    semua_gejala = set().union(*(kode_gejala for _, kode_gejala in daftar_input))
+    gejala_valid = set(Gejala.objects.filter(kodeGejala__in=semua_gejala).values_list('kodeGejala', flat=True))
+
+    hasil = []
+    konsultasi_baru = []
+    for baris, (pasien_id, working_memory) in enumerate(daftar_input, start=1):
+        item = {
+            'baris': baris,
+            'pasien_id': pasien_id,
+            'konsultasi_id': None,
+            'kode_kondisi': None,
+            'nama_kondisi': None,
+            'error': None,
+        }
+        hasil.append(item)
+        if pasien_id not in pasien_valid:
+            item['error'] = 'Pasien tidak ditemukan'
+            continue
+
+        kondisi = indeks.cocokkan(working_memory)
+        if kondisi:
+            item['kode_kondisi'] = kondisi.kodeKondisi
+            item['nama_kondisi'] = kondisi.namaKondisi
+        konsultasi_baru.append((item, working_memory, Konsultasi(
+            pasien_id=pasien_id, hasilKondisi=kondisi, snapshotBasisPengetahuan_id=indeks.snapshot_id
+        )))
+
+    with transaction.atomic():
+        Konsultasi.objects.bulk_create([konsultasi for _, _, konsultasi in konsultasi_baru])
+        # bulk_create tidak memicu sinyal statistik dasbor
+        catat_objek_baru([konsultasi for _, _, konsultasi in konsultasi_baru])
+        DetailKonsultasi.objects.bulk_create([
+            DetailKonsultasi(konsultasi=konsultasi, gejala_id=kode_gejala)
+            for _, working_memory, konsultasi in konsultasi_baru
+            for kode_gejala in sorted(working_memory & gejala_valid)
+        ])
+
+    for item, _, konsultasi in konsultasi_baru:
+        item['konsultasi_id'] = konsultasi.id
+
+    return hasil
+
+
 # FUNGSI mesin infrerensi
 def dokumentasi_logika_rule(kode_gejala_input):
     """
@@ -213,10 +264,22 @@ def tampilkan_hasil_diagnosa(request, konsultasi_id):
     # Ambil objek Kondisi yang menjadi hasil diagnosa
     kondisi = konsultasi.hasilKondisi
     
-    # For now, we'll assume it's not a partial diagnosis when displaying results
-    # In a production system, we would store this information in the database
     diagnosis_parsial = False
-    
+    kelompok_terdekat = []
+
+    # Jika tidak ada kecocokan persis, tampilkan peringkat kelompok aturan terdekat
+    # (Jaccard/cakupan dihitung dari bitmask gejala, tanpa query aturan) menurut
+    # basis pengetahuan yang dipakai saat konsultasi, bukan aturan terkini
+    if not kondisi:
+        kode_gejala = DetailKonsultasi.objects.filter(konsultasi=konsultasi).values_list('gejala_id', flat=True)
+        kelompok_terdekat = peringkat_kelompok_terdekat(
+            kode_gejala, snapshot_id=konsultasi.snapshotBasisPengetahuan_id
+        )
+        if kelompok_terdekat:
+            # Kondisi dari snapshot hanya memuat kode dan nama; deskripsi dan solusi dibaca sekali di sini
+            kondisi = Kondisi.objects.filter(pk=kelompok_terdekat[0].kondisi.pk).first()
+            diagnosis_parsial = kondisi is not None
+
     # Jika tidak ada hasil diagnosa
     if not kondisi:
         # Siapkan konteks untuk template dengan pesan bahwa tidak ada hasil
@@ -232,8 +295,9 @@ def tampilkan_hasil_diagnosa(request, konsultasi_id):
             'konsultasi': konsultasi,
             'kondisi': kondisi,
             'diagnosis_parsial': diagnosis_parsial,
+            'kelompok_terdekat': kelompok_terdekat,
         }
-    
+
     # Tampilkan namaKondisi, deskripsi, dan solusi dari hasil diagnosa tersebut
     return render(request, 'hasil_diagnosa.html', context)
 
@@ -542,47 +606,98 @@ def daftar_notifikasi(request):
     # Tandai semua notifikasi yang sudah jatuh tempo sebagai 'sudah terkirim' saat dibuka
     from django.utils import timezone
     notifikasi_list.filter(jadwalNotifikasi__lte=timezone.now()).update(sudahTerkirim=True)
+    reset_cache_notifikasi(pasien_id)
     
     return render(request, 'notifikasi_list.html', {'notifikasi_list': notifikasi_list})
 def tampilkan_grafik_riwayat(request, pasien_id):
     """
     View untuk menampilkan grafik riwayat pengukuran fisik
     
+    Halaman hanya berisi kerangka grafik; datanya diambil browser dari
+    data_grafik_riwayat sehingga kunjungan ulang cukup menerima 304.
+    
     Args:
         pasien_id: ID pasien
     """
     # Pastikan pengguna sudah login
     if 'pasien_id' not in request.session:
         return redirect('login_pasien')
-        
-    # Ambil semua data PengukuranFisik untuk pasien_id yang diurutkan berdasarkan tanggal
-    pengukuran_list = PengukuranFisik.objects.filter(pasien_id=pasien_id).order_by('tanggalUkur')
     
-    # Ubah data menjadi format JSON yang optimal untuk client-side rendering
-    data_bb_u = []
-    data_tb_u = []
+    pasien = get_object_or_404(Pasien.objects.only('jenisKelamin'), id=pasien_id)
     
-    for pengukuran in pengukuran_list:
-        data_bb_u.append({
-            'tgl': pengukuran.tanggalUkur.strftime('%Y-%m-%d'),
-            'score': float(pengukuran.skor_Z_BB_U) if pengukuran.skor_Z_BB_U is not None else None
-        })
-        
-        data_tb_u.append({
-            'tgl': pengukuran.tanggalUkur.strftime('%Y-%m-%d'),
-            'score': float(pengukuran.skor_Z_TB_U) if pengukuran.skor_Z_TB_U is not None else None
-        })
-    
-    # Kembalikan data untuk rendering grafik di template
+    # Kurva referensi WHO berupa berkas statis per jenis kelamin, diunduh browser sekali saja
     context = {
-        'data_bb_u': data_bb_u,
-        'data_tb_u': data_tb_u,
         'pasien_id': pasien_id,
+        'kurva_bb_u_url': url_kurva('bb_u', pasien.jenisKelamin),
+        'kurva_tb_u_url': url_kurva('tb_u', pasien.jenisKelamin),
     }
     
     return render(request, 'grafik_riwayat.html', context)
 
 
+# Naikkan bila bentuk payload data_grafik_riwayat berubah agar ETag lama tidak lagi cocok
+VERSI_SERI_PERTUMBUHAN = 2
+
+
+def etag_seri_pertumbuhan(pasien_id):
+    """
+    ETag seri pertumbuhan dari satu query agregat pada indeks (pasien, tanggalUkur)
+    
+    Jumlah baris menangkap penghapusan, id terbesar menangkap penambahan, dan
+    waktu diperbarui terakhir menangkap perubahan nilai. Tanggal lahir pasien
+    ikut karena umur_bulan dihitung darinya, dan versi payload menangkap
+    perubahan bentuk respons.
+    
+    Returns:
+        String ETag ber-tanda kutip
+    """
+    ringkasan = Pasien.objects.filter(pk=pasien_id).values('tanggalLahir').annotate(
+        jumlah=Count('pengukuranfisik'),
+        id_terakhir=Max('pengukuranfisik__id'),
+        diperbarui=Max('pengukuranfisik__diperbarui'),
+    ).order_by('tanggalLahir').first() or {'tanggalLahir': None, 'jumlah': 0, 'id_terakhir': None, 'diperbarui': None}
+    diperbarui = ringkasan['diperbarui'].timestamp() if ringkasan['diperbarui'] else 0
+    return (
+        f'"v{VERSI_SERI_PERTUMBUHAN}-{pasien_id}-{ringkasan["tanggalLahir"]}-{ringkasan["jumlah"]}-'
+        f'{ringkasan["id_terakhir"] or 0}-{diperbarui:.6f}"'
+    )
+
+
+def data_grafik_riwayat(request, pasien_id):
+    """
+    Seri pertumbuhan pasien dalam bentuk kolom (JSON) dengan ETag / 304 Not Modified
+    
+    Returns:
+        JsonResponse {'tanggal': [...], 'umur_bulan': [...], 'bb_u': [...], 'tb_u': [...],
+        'berat_badan': [...], 'tinggi_badan': [...]}, urut tanggal ukur
+    """
+    if request.session.get('pasien_id') != pasien_id:
+        return JsonResponse({'error': 'Tidak diizinkan'}, status=403)
+    
+    etag = etag_seri_pertumbuhan(pasien_id)
+    respons = get_conditional_response(request, etag=etag)
+    if respons is None:
+        baris = list(PengukuranFisik.objects.filter(pasien_id=pasien_id).order_by('tanggalUkur', 'id').values_list(
+            'tanggalUkur', 'skor_Z_BB_U', 'skor_Z_TB_U', 'beratBadan', 'tinggiBadan', 'pasien__tanggalLahir'
+        ))
+        tanggal, bb_u, tb_u, berat, tinggi, tanggal_lahir = zip(*baris) if baris else ([], [], [], [], [], [])
+        respons = JsonResponse({
+            'tanggal': [nilai.isoformat() for nilai in tanggal],
+            # Sumbu x kurva referensi WHO (lihat kurva_referensi)
+            'umur_bulan': [
+                round((ukur - lahir).days / HARI_PER_BULAN, 2) for ukur, lahir in zip(tanggal, tanggal_lahir)
+            ],
+            'bb_u': [desimal_ke_float(nilai) for nilai in bb_u],
+            'tb_u': [desimal_ke_float(nilai) for nilai in tb_u],
+            'berat_badan': [desimal_ke_float(nilai) for nilai in berat],
+            'tinggi_badan': [desimal_ke_float(nilai) for nilai in tinggi],
+        })
+    respons['ETag'] = etag
+    # Data pasien: hanya cache browser, selalu divalidasi ulang dengan If-None-Match
+    patch_cache_control(respons, private=True, no_cache=True)
+    return respons
+
+
 # Expert/Admin Views
 @login_required
 @user_passes_test(is_expert)
@@ -617,6 +732,14 @@ def create_rule_group(request):
             # Ambil Kondisi
             kondisi = Kondisi.objects.get(kodeKondisi=kondisi_id)
             
+            # Tolak himpunan gejala yang sudah dipakai kondisi lain sebelum ada baris yang dibuat
+            analisis = periksa_perubahan(
+                dapatkan_indeks().kelompok, {(kondisi.kodeKondisi, kode_kelompok): frozenset(gejala_ids)}
+            )
+            konflik = pesan_konflik(analisis)
+            if konflik:
+                raise ValueError('; '.join(konflik))
+            
             # Untuk setiap Gejala yang dipilih, buat entri terpisah dalam tabel Aturan
             for gejala_id in gejala_ids:
                 gejala = Gejala.objects.get(kodeGejala=gejala_id)
@@ -626,6 +749,9 @@ def create_rule_group(request):
                     kodeKelompokAturan=kode_kelompok
                 )
             
+            for pesan in pesan_peringatan(analisis):
+                messages.warning(request, pesan)
+            
             # Redirect ke daftar aturan
             return redirect('list_rules_pakar')
             
@@ -659,13 +785,30 @@ def create_rule_group(request):
 @user_passes_test(is_expert)
 def list_patients_pakar(request):
     """
-    View untuk menampilkan daftar semua Pasien
+    View untuk menampilkan daftar Pasien (paginasi keyset, urut nama)
+    
+    Parameter GET:
+        q: Awalan nama pasien atau nama pengguna
+        jenis_kelamin: 'L' atau 'P'
     """
-    # Ambil semua pasien
-    pasien_list = Pasien.objects.all().order_by('nama')
+    q = request.GET.get('q', '').strip()
+    jenis_kelamin = request.GET.get('jenis_kelamin', '')
+    
+    pasien_list = Pasien.objects.all()
+    if q:
+        # istartswith menjadi LIKE ... ESCAPE di SQLite sehingga tidak memakai pasien_nama_idx;
+        # indeks tetap melayani urutan (nama, id) dan halaman berhenti setelah n baris cocok
+        pasien_list = pasien_list.filter(Q(nama__istartswith=q) | Q(namaPengguna__istartswith=q))
+    if jenis_kelamin in ('L', 'P'):
+        pasien_list = pasien_list.filter(jenisKelamin=jenis_kelamin)
+    
+    halaman = halaman_dari_request(request, pasien_list, ['nama', 'id'])
     
     context = {
-        'pasien_list': pasien_list,
+        'pasien_list': halaman.object_list,
+        'halaman': halaman,
+        'q': q,
+        'jenis_kelamin': jenis_kelamin,
         'page_title': 'Daftar Pasien',
         'breadcrumb_items': [
             ('Dashboard', 'dashboard_pakar'),
@@ -682,32 +825,36 @@ def detail_pasien_pakar(request, pasien_id):
     """
     View untuk menampilkan ringkasan data Pasien untuk Pakar
     """
-    # Ambil data pasien
+    # Ambil pasien, pengukuran, dan konsultasi (beserta kondisi dan gejala) dengan jumlah query tetap
     try:
-        pasien = Pasien.objects.get(id=pasien_id)
+        timeline = muat_timeline_pasien(pasien_id)
     except Pasien.DoesNotExist:
         # Jika pasien tidak ditemukan, tampilkan pesan error
         return render(request, 'pakar_list_patients.html', {
             'error': 'Pasien tidak ditemukan'
         })
     
-    # Ambil semua data PengukuranFisik
-    pengukuran_list = PengukuranFisik.objects.filter(pasien=pasien).order_by('-tanggalUkur')
-    
-    # Ambil riwayat Konsultasi
-    konsultasi_list = Konsultasi.objects.filter(pasien=pasien).order_by('-tanggalKonsultasi')
-    
-    # Untuk setiap konsultasi, ambil detail gejala
-    for konsultasi in konsultasi_list:
-        konsultasi.detail_gejala = DetailKonsultasi.objects.filter(konsultasi=konsultasi).select_related('gejala')
-    
     return render(request, 'pakar_detail_pasien.html', {
-        'pasien': pasien,
-        'pengukuran_list': pengukuran_list,
-        'konsultasi_list': konsultasi_list
+        'pasien': timeline.pasien,
+        'pengukuran_list': timeline.pengukuran_list,
+        'konsultasi_list': timeline.konsultasi_list
     })
 
 
+@login_required
+@user_passes_test(is_expert)
+def timeline_pasien_pakar(request, pasien_id):
+    """
+    Endpoint JSON timeline pasien (pengukuran dan konsultasi) untuk Pakar
+    """
+    try:
+        timeline = muat_timeline_pasien(pasien_id)
+    except Pasien.DoesNotExist:
+        return JsonResponse({'error': 'Pasien tidak ditemukan'}, status=404)
+    
+    return JsonResponse(timeline_ke_dict(timeline))
+
+
 @login_required
 @user_passes_test(is_expert)
 def list_rules_pakar(request):
@@ -735,6 +882,27 @@ def list_rules_pakar(request):
     return render(request, 'pakar_list_rules.html', context)
 
 
+@login_required
+@user_passes_test(is_expert)
+def analisis_aturan_pakar(request):
+    """
+    View untuk menampilkan duplikat, kelompok tidak terjangkau dan relasi subset antar kelompok aturan
+    """
+    analisis = analisis_kelompok(dapatkan_indeks().kelompok)
+    
+    context = {
+        'analisis': analisis,
+        'jumlah_konflik': sum(1 for item in analisis.duplikat if item.lintas_kondisi),
+        'page_title': 'Analisis Aturan',
+        'breadcrumb_items': [
+            ('Dashboard', 'dashboard_pakar'),
+            ('Aturan', 'list_rules_pakar'),
+            ('Analisis Aturan', 'analisis_aturan_pakar'),
+        ]
+    }
+    return render(request, 'pakar_analisis_aturan.html', context)
+
+
 @login_required
 @user_passes_test(is_expert)
 def show_rule_detail(request, pk):
@@ -789,12 +957,10 @@ def edit_rule_pakar(request, pk):
             rule_groups[aturan.kodeKelompokAturan] = []
         rule_groups[aturan.kodeKelompokAturan].append(aturan)
     
+    error = None
     if request.method == 'POST':
         # Handle form submission for updating rules
         try:
-            # Clear existing rules for this condition
-            Aturan.objects.filter(kondisi=kondisi).delete()
-            
             # Process submitted rule groups
             rule_group_indices = []
             for key in request.POST.keys():
@@ -805,6 +971,21 @@ def edit_rule_pakar(request, pk):
                     except (IndexError, ValueError):
                         continue
             
+            # Periksa kelompok baru terhadap kondisi lain sebelum aturan lama dihapus
+            kelompok_baru = defaultdict(frozenset)
+            for group_index in rule_group_indices:
+                kode_kelompok = request.POST.get(f'kode_kelompok_{group_index}', f'R{int(group_index)+1:02d}')
+                gejala_ids = frozenset(filter(None, request.POST.getlist(f'gejala_{group_index}')))
+                if gejala_ids:
+                    kelompok_baru[(kondisi.kodeKondisi, kode_kelompok)] |= gejala_ids
+            analisis = periksa_perubahan(dapatkan_indeks().kelompok, kelompok_baru, kode_kondisi=kondisi.kodeKondisi)
+            konflik = pesan_konflik(analisis)
+            if konflik:
+                raise ValueError('; '.join(konflik))
+            
+            # Clear existing rules for this condition
+            Aturan.objects.filter(kondisi=kondisi).delete()
+            
             # Process each rule group
             for group_index in rule_group_indices:
                 gejala_ids = request.POST.getlist(f'gejala_{group_index}')
@@ -827,10 +1008,13 @@ def edit_rule_pakar(request, pk):
                                 continue
             
             messages.success(request, f'Aturan untuk Kondisi {kondisi.namaKondisi} berhasil diperbarui.')
+            for pesan in pesan_peringatan(analisis):
+                messages.warning(request, pesan)
             return redirect('list_rules_pakar')
             
         except Exception as e:
-            messages.error(request, f'Terjadi kesalahan saat memperbarui aturan: {str(e)}')
+            error = f'Terjadi kesalahan saat memperbarui aturan: {str(e)}'
+            messages.error(request, error)
             # Re-fetch aturan_list as they might have been deleted
             aturan_list = Aturan.objects.filter(kondisi=kondisi)
             rule_groups = {}
@@ -846,6 +1030,7 @@ def edit_rule_pakar(request, pk):
         'aturan_list': aturan_list,
         'rule_groups': rule_groups,
         'gejala_list': gejala_list,
+        'error': error,
     }
     return render(request, 'pakar_form_rule.html', context)
 
@@ -884,19 +1069,22 @@ def dashboard_pakar(request):
     """
     View untuk dashboard Pakar - menampilkan statistik sistem
     """
-    # Ambil statistik sistem
-    total_pasien = Pasien.objects.count()
-    total_konsultasi = Konsultasi.objects.count()
-    total_gejala = Gejala.objects.count()
-    total_kondisi = Kondisi.objects.count()
-    total_aturan = Aturan.objects.count()
+    # Statistik dibaca dari tabel rekap (core/statistik.py), bukan COUNT(*) per tabel
+    statistik = statistik_dasbor()
+    total = statistik['total']
+    nama_kondisi = dict(Kondisi.objects.values_list('kodeKondisi', 'namaKondisi'))
     
     context = {
-        'total_pasien': total_pasien,
-        'total_konsultasi': total_konsultasi,
-        'total_gejala': total_gejala,
-        'total_kondisi': total_kondisi,
-        'total_aturan': total_aturan,
+        'total_pasien': total['pasien'],
+        'total_konsultasi': total['konsultasi'],
+        'total_gejala': total['gejala'],
+        'total_kondisi': total['kondisi'],
+        'total_aturan': total['aturan'],
+        'kolom_kondisi': [(kode, nama_kondisi.get(kode, kode) if kode else 'Tidak Terdiagnosis') for kode in statistik['kode_kondisi']],
+        'statistik_bulanan': [
+            dict(data, konsultasi_per_kondisi=[data['konsultasi'].get(kode, 0) for kode in statistik['kode_kondisi']])
+            for data in statistik['bulanan']
+        ],
         'page_title': 'Dashboard Pakar',
         # Removed breadcrumb_items to avoid redundancy with page_title
     }
@@ -957,12 +1145,23 @@ def login_pakar(request):
 @user_passes_test(is_expert)
 def list_gejala_pakar(request):
     """
-    View untuk menampilkan daftar semua Gejala
+    View untuk menampilkan daftar Gejala (paginasi keyset, urut kode)
+    
+    Parameter GET:
+        q: Awalan kode gejala atau bagian nama gejala
     """
-    gejala_list = Gejala.objects.all().order_by('kodeGejala')
+    q = request.GET.get('q', '').strip()
+    
+    gejala_list = Gejala.objects.all()
+    if q:
+        gejala_list = gejala_list.filter(Q(kodeGejala__istartswith=q) | Q(namaGejala__icontains=q))
+    
+    halaman = halaman_dari_request(request, gejala_list, ['kodeGejala'])
     
     context = {
-        'gejala_list': gejala_list,
+        'gejala_list': halaman.object_list,
+        'halaman': halaman,
+        'q': q,
         'page_title': 'Daftar Gejala',
         'breadcrumb_items': [
             ('Dashboard', 'dashboard_pakar'),
@@ -1144,12 +1343,23 @@ def delete_gejala_pakar(request, pk):
 @user_passes_test(is_expert)
 def list_kondisi_pakar(request):
     """
-    View untuk menampilkan daftar semua Kondisi
+    View untuk menampilkan daftar Kondisi (paginasi keyset, urut kode)
+    
+    Parameter GET:
+        q: Awalan kode kondisi atau bagian nama kondisi
     """
-    kondisi_list = Kondisi.objects.all().order_by('kodeKondisi')
+    q = request.GET.get('q', '').strip()
+    
+    kondisi_list = Kondisi.objects.all()
+    if q:
+        kondisi_list = kondisi_list.filter(Q(kodeKondisi__istartswith=q) | Q(namaKondisi__icontains=q))
+    
+    halaman = halaman_dari_request(request, kondisi_list, ['kodeKondisi'])
     
     context = {
-        'kondisi_list': kondisi_list,
+        'kondisi_list': halaman.object_list,
+        'halaman': halaman,
+        'q': q,
         'page_title': 'Daftar Kondisi',
         'breadcrumb_items': [
             ('Dashboard', 'dashboard_pakar'),
@@ -1516,57 +1726,110 @@ def riwayat_pengukuran(request):
 
 
 def cetak_riwayat_pdf(request):
-    from io import BytesIO
-    from xhtml2pdf import pisa
-    from django.template.loader import get_template
-
     pasien_id = request.session.get('pasien_id')
-    pasien = Pasien.objects.get(id=pasien_id)
-    pengukuran_list = PengukuranFisik.objects.filter(pasien=pasien).order_by('-tanggalUkur')
-    context = {'pasien': pasien, 'pengukuran_list': pengukuran_list}
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="riwayat_{pasien.nama}.pdf"'
-
-    template = get_template('pdf/riwayat_pengukuran_pdf.html')
-    html = template.render(context)
-    pisa_status = pisa.CreatePDF(html, dest=response)
-    return response
+    
+    # PDF hanya di-render ulang bila data, template, atau tanggal cetak berubah
+    return respons_pdf(request, laporan_riwayat(pasien_id))
 def cetak_hasil_diagnosa_pdf(request, konsultasi_id):
     """
     View untuk mencetak hasil diagnosa dalam format PDF
     """
-    from io import BytesIO
-    from xhtml2pdf import pisa
-    from django.template.loader import get_template
-    
     # Pastikan pengguna sudah login
     if 'pasien_id' not in request.session:
         return redirect('login_pasien')
     
     # Ambil konsultasi berdasarkan konsultasi_id
     try:
-        konsultasi = get_object_or_404(Konsultasi.objects.select_related('hasilKondisi'), id=konsultasi_id)
+        laporan = laporan_hasil_diagnosa(konsultasi_id)
     except Konsultasi.DoesNotExist:
         return HttpResponse('Konsultasi tidak ditemukan', status=404)
     
-    # Render template HTML untuk PDF
-    template_path = 'pdf/hasil_diagnosa_pdf.html'
-    context = {
-        'konsultasi': konsultasi,
-        'pasien': konsultasi.pasien,
-        'kondisi': konsultasi.hasilKondisi
-    }
+    # Ambil PDF dari cache disk; render hanya bila sidik jari laporan belum pernah dibuat
+    return respons_pdf(request, laporan)
+
+
+def antre_riwayat_pdf(request):
+    """
+    Minta PDF riwayat pengukuran lewat antrian latar belakang
+    """
+    pasien_id = request.session.get('pasien_id')
+    if not pasien_id:
+        return redirect('login_pasien')
     
-    # Buat respons PDF
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="diagnosa_{konsultasi.pasien.nama}.pdf"'
+    # PDF dengan data terkini sudah ada di cache: langsung unduh tanpa antri
+    if ada_di_cache(laporan_riwayat(pasien_id).kunci):
+        return redirect('cetak_riwayat_pdf')
     
-    # Render HTML ke PDF
-    template = get_template(template_path)
-    html = template.render(context)
-    pisa_status = pisa.CreatePDF(html, dest=response)
+    tugas = antrekan_pdf(TugasPdf.JENIS_RIWAYAT, pasien_id)
+    return redirect('status_tugas_pdf', tugas_id=tugas.id)
+
+
+def antre_hasil_diagnosa_pdf(request, konsultasi_id):
+    """
+    Minta PDF hasil diagnosa lewat antrian latar belakang
+    """
+    pasien_id = request.session.get('pasien_id')
+    if not pasien_id:
+        return redirect('login_pasien')
     
-    return response
+    try:
+        laporan = laporan_hasil_diagnosa(konsultasi_id)
+    except Konsultasi.DoesNotExist:
+        return HttpResponse('Konsultasi tidak ditemukan', status=404)
+    if laporan.context['pasien'].id != pasien_id:
+        return HttpResponse('Konsultasi tidak ditemukan', status=404)
+    
+    if ada_di_cache(laporan.kunci):
+        return redirect('cetak_hasil_diagnosa_pdf', konsultasi_id=konsultasi_id)
+    
+    tugas = antrekan_pdf(TugasPdf.JENIS_HASIL_DIAGNOSA, pasien_id, konsultasi_id)
+    return redirect('status_tugas_pdf', tugas_id=tugas.id)
+
+
+def status_tugas_pdf(request, tugas_id):
+    """
+    Halaman status tugas PDF; dipolling oleh browser (format=json) hingga PDF siap
+    """
+    pasien_id = request.session.get('pasien_id')
+    if not pasien_id:
+        return redirect('login_pasien')
+    
+    tugas = get_object_or_404(TugasPdf.objects.select_related('pasien'), id=tugas_id, pasien_id=pasien_id)
+    siap = tugas_siap_diunduh(tugas)
+    if tugas.status == TugasPdf.STATUS_SELESAI and not siap:
+        # Berkas sudah tergusur dari cache sebelum diunduh: render ulang
+        antrekan_ulang(tugas)
+    
+    data = {
+        'status': tugas.status,
+        'siap': siap,
+        'url_unduh': reverse('unduh_tugas_pdf', kwargs={'tugas_id': tugas.id}) if siap else None,
+        'pesan_error': tugas.pesanError if tugas.status == TugasPdf.STATUS_GAGAL else None,
+    }
+    if request.GET.get('format') == 'json':
+        return JsonResponse(data)
+    if siap:
+        return redirect(data['url_unduh'])
+    
+    return render(request, 'status_pdf.html', {'tugas': tugas, 'data': data})
+
+
+def unduh_tugas_pdf(request, tugas_id):
+    """
+    Unduh PDF hasil tugas antrian langsung dari cache disk
+    """
+    pasien_id = request.session.get('pasien_id')
+    if not pasien_id:
+        return redirect('login_pasien')
+    
+    tugas = get_object_or_404(TugasPdf.objects.select_related('pasien'), id=tugas_id, pasien_id=pasien_id)
+    if tugas.status == TugasPdf.STATUS_SELESAI:
+        awalan = 'diagnosa' if tugas.jenis == TugasPdf.JENIS_HASIL_DIAGNOSA else 'riwayat'
+        respons = respons_pdf_dari_cache(request, tugas.kunci, f'{awalan}_{tugas.pasien.nama}.pdf')
+        if respons is not None:
+            return respons
+        antrekan_ulang(tugas)
+    return redirect('status_tugas_pdf', tugas_id=tugas.id)
 
 
 def riwayat_list(request):
@@ -1613,17 +1876,66 @@ def preview_diagnosa(request):
     return render(request, 'preview_diagnosa.html', context)
 
 
+# Filter status gizi pada daftar pengukuran; memakai kolom z-score yang terindeks
+STATUS_GIZI_PENGUKURAN = {
+    'stunting': ('Stunting (TB/U < -2 SD)', {'skor_Z_TB_U__lt': -2}),
+    'gizi_kurang': ('Berat Badan Kurang (BB/U < -2 SD)', {'skor_Z_BB_U__lt': -2}),
+    'gizi_buruk': ('Wasting (BB/TB < -2 SD)', {'skor_Z_BB_TB__lt': -2}),
+}
+
+
+def _parse_tanggal(nilai):
+    """
+    Ubah string YYYY-MM-DD dari query string menjadi date; None jika kosong atau tidak valid
+    """
+    try:
+        return datetime.strptime(nilai, '%Y-%m-%d').date() if nilai else None
+    except ValueError:
+        return None
+
+
 @login_required
 @user_passes_test(is_expert)
 def list_pengukuran_pakar(request):
     """
-    View untuk menampilkan daftar semua Pengukuran
-    """
-    # Ambil semua pengukuran dengan informasi pasien
-    pengukuran_list = PengukuranFisik.objects.select_related('pasien').order_by('-tanggalUkur')
+    View untuk menampilkan daftar Pengukuran (paginasi keyset, terbaru dahulu)
+    
+    Parameter GET:
+        pasien: ID pasien
+        q: Awalan nama pasien
+        dari, sampai: Rentang tanggal ukur (YYYY-MM-DD)
+        status: Kunci STATUS_GIZI_PENGUKURAN (misal 'stunting')
+    """
+    pasien_id = request.GET.get('pasien', '')
+    q = request.GET.get('q', '').strip()
+    dari = _parse_tanggal(request.GET.get('dari'))
+    sampai = _parse_tanggal(request.GET.get('sampai'))
+    status = request.GET.get('status', '')
+    
+    # Ambil pengukuran dengan informasi pasien, hanya satu halaman
+    pengukuran_list = PengukuranFisik.objects.select_related('pasien')
+    if pasien_id.isdigit():
+        pengukuran_list = pengukuran_list.filter(pasien_id=int(pasien_id))
+    if q:
+        pengukuran_list = pengukuran_list.filter(pasien__nama__istartswith=q)
+    if dari:
+        pengukuran_list = pengukuran_list.filter(tanggalUkur__gte=dari)
+    if sampai:
+        pengukuran_list = pengukuran_list.filter(tanggalUkur__lte=sampai)
+    if status in STATUS_GIZI_PENGUKURAN:
+        pengukuran_list = pengukuran_list.filter(**STATUS_GIZI_PENGUKURAN[status][1])
+    
+    halaman = halaman_dari_request(request, pengukuran_list, ['-tanggalUkur', '-id'])
     
     context = {
-        'pengukuran_list': pengukuran_list,
+        'pengukuran_list': halaman.object_list,
+        'halaman': halaman,
+        'filter_pasien': pasien_id,
+        'q': q,
+        'dari': request.GET.get('dari', ''),
+        'sampai': request.GET.get('sampai', ''),
+        'status': status,
+        'pilihan_status': [(kunci, label) for kunci, (label, _) in STATUS_GIZI_PENGUKURAN.items()],
         'page_title': 'Daftar Pengukuran',
         'breadcrumb_items': [
             ('Dashboard', 'dashboard_pakar'),
@@ -1634,6 +1946,200 @@ def list_pengukuran_pakar(request):
     return render(request, 'pakar_list_pengukuran.html', context)
 
 
+@login_required
+@user_passes_test(is_expert)
+def cetak_massal_pdf_pakar(request):
+    """
+    Cetak riwayat semua anak pada satu sesi posyandu sebagai satu PDF atau ZIP
+    
+    Parameter GET:
+        dari, sampai: Rentang tanggal ukur (YYYY-MM-DD)
+        pasien: ID pasien (boleh berulang)
+        format: 'pdf' (gabungan, default) atau 'zip' (satu PDF per anak)
+    """
+    dari = _parse_tanggal(request.GET.get('dari'))
+    sampai = _parse_tanggal(request.GET.get('sampai'))
+    pasien_ids = [int(nilai) for nilai in request.GET.getlist('pasien') if nilai.isdigit()]
+    format_keluaran = request.GET.get('format', FORMAT_PDF)
+    if format_keluaran not in PILIHAN_FORMAT:
+        format_keluaran = FORMAT_PDF
+    
+    if not (dari or sampai or pasien_ids):
+        messages.error(request, 'Pilih rentang tanggal atau pasien terlebih dahulu.')
+        return redirect('list_pengukuran_pakar')
+    
+    laporan_list = muat_laporan_massal(pilih_pasien(dari, sampai, pasien_ids))
+    if not laporan_list:
+        messages.error(request, 'Tidak ada pasien yang cocok dengan filter.')
+        return redirect('list_pengukuran_pakar')
+    
+    # Hasil ditulis ke file sementara (bukan memori); dihapus otomatis saat respons ditutup
+    berkas = tempfile.TemporaryFile()
+    tulis_laporan_massal(laporan_list, berkas, format_keluaran)
+    berkas.seek(0)
+    rentang = '_'.join(str(tanggal) for tanggal in (dari, sampai) if tanggal) or 'pasien'
+    return FileResponse(berkas, as_attachment=True, filename=f'laporan_posyandu_{rentang}.{format_keluaran}')
+
+
+@login_required
+@user_passes_test(is_expert)
+def analitik_pengukuran_pakar(request):
+    """
+    View prevalensi stunting, berat badan kurang dan wasting dari z-score tersimpan
+    
+    Parameter GET:
+        dari, sampai: Rentang tanggal ukur (YYYY-MM-DD)
+        dimensi: Kunci DIMENSI untuk pengelompokan (boleh berulang, default 'bulan' bila tidak ada)
+        format: 'csv' untuk mengunduh tabel sebagai CSV
+    """
+    dari = _parse_tanggal(request.GET.get('dari'))
+    sampai = _parse_tanggal(request.GET.get('sampai'))
+    # Tanpa parameter dimensi: default per bulan; form mengirim dimensi kosong bila
+    # tidak ada yang dicentang sehingga total saja tetap bisa dipilih
+    dipilih = set(request.GET.getlist('dimensi')) if 'dimensi' in request.GET else {DIMENSI_BULAN}
+    dimensi = tuple(nama for nama in DIMENSI if nama in dipilih)
+    
+    data = ambil_kolom(dari, sampai)
+    hasil = hitung_prevalensi(data, dimensi)
+    
+    if request.GET.get('format') == 'csv':
+        rentang = '_'.join(str(tanggal) for tanggal in (dari, sampai) if tanggal) or 'semua'
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="prevalensi_{"_".join(dimensi) or "total"}_{rentang}.csv"'
+        tulis_csv(hasil, dimensi, response)
+        return response
+    
+    context = {
+        'baris_list': baris_tabel(hasil, dimensi),
+        'total': baris_tabel(hitung_prevalensi(data, ()), ()),
+        'dimensi': dimensi,
+        'pilihan_dimensi': list(DIMENSI.items()),
+        'kolom_dimensi': [DIMENSI[nama] for nama in dimensi],
+        'indikator': [label for _, label, _ in INDIKATOR_PREVALENSI],
+        'dari': request.GET.get('dari', ''),
+        'sampai': request.GET.get('sampai', ''),
+        # Dimensi efektif ikut ditulis agar CSV sama dengan tabel yang tampil
+        'query_csv': urlencode({
+            'dari': request.GET.get('dari', ''),
+            'sampai': request.GET.get('sampai', ''),
+            'dimensi': list(dimensi) or [''],
+        }, doseq=True),
+        'page_title': 'Analitik Prevalensi Gizi',
+        'breadcrumb_items': [
+            ('Dashboard', 'dashboard_pakar'),
+            ('Pengukuran', 'list_pengukuran_pakar'),
+            ('Analitik', 'analitik_pengukuran_pakar'),
+        ]
+    }
+    
+    return render(request, 'pakar_analitik_pengukuran.html', context)
+
+
+@login_required
+@user_passes_test(is_expert)
+def impor_pengukuran_pakar(request):
+    """
+    View untuk impor massal pengukuran dari buku register posyandu (CSV/XLSX)
+    """
+    context = {
+        'page_title': 'Impor Pengukuran',
+        'breadcrumb_items': [
+            ('Dashboard', 'dashboard_pakar'),
+            ('Pengukuran', 'list_pengukuran_pakar'),
+            ('Impor', 'impor_pengukuran_pakar'),
+        ]
+    }
+    
+    if request.method == 'POST':
+        berkas = request.FILES.get('berkas')
+        if berkas is None:
+            context['error'] = 'Berkas belum dipilih'
+            return render(request, 'pakar_impor_pengukuran.html', context)
+        
+        hanya_periksa = bool(request.POST.get('hanya_periksa'))
+        try:
+            context['hasil'] = impor_dengan_laporan(berkas.file, berkas.name, simpan=not hanya_periksa)
+        except ValueError as e:
+            context['error'] = str(e)
+        context['hanya_periksa'] = hanya_periksa
+    
+    return render(request, 'pakar_impor_pengukuran.html', context)
+
+
+@login_required
+@user_passes_test(is_expert)
+def unduh_laporan_impor(request, token):
+    """
+    Unduh laporan kesalahan per baris dari impor massal pengukuran
+    """
+    path = path_laporan(token)
+    if path is None or not os.path.exists(path):
+        messages.error(request, 'Laporan kesalahan tidak ditemukan.')
+        return redirect('impor_pengukuran_pakar')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename='kesalahan_impor_pengukuran.csv')
+
+
+@login_required
+@user_passes_test(is_expert)
+def ekspor_data_pakar(request):
+    """
+    View untuk memilih filter ekspor data pengukuran dan konsultasi
+    """
+    context = {
+        'dataset_list': list(DATASET),
+        'pilihan_format': PILIHAN_FORMAT_EKSPOR,
+        'kondisi_list': Kondisi.objects.order_by('kodeKondisi').values_list('kodeKondisi', 'namaKondisi'),
+        'tanpa_kondisi': TANPA_KONDISI,
+        'page_title': 'Ekspor Data',
+        'breadcrumb_items': [
+            ('Dashboard', 'dashboard_pakar'),
+            ('Ekspor Data', 'ekspor_data_pakar'),
+        ]
+    }
+    
+    return render(request, 'pakar_ekspor_data.html', context)
+
+
+@login_required
+@user_passes_test(is_expert)
+def unduh_ekspor_pakar(request, dataset):
+    """
+    Alirkan ekspor satu dataset sebagai CSV atau Parquet tanpa memuat seluruh data
+    
+    Parameter GET:
+        dari, sampai: Rentang tanggal (YYYY-MM-DD)
+        jenis_kelamin: 'L' atau 'P'
+        kondisi: kodeKondisi hasil diagnosa, atau '-' untuk tidak terdiagnosis
+        format: 'csv' (default) atau 'parquet'
+    """
+    if dataset not in DATASET:
+        messages.error(request, 'Dataset ekspor tidak dikenal.')
+        return redirect('ekspor_data_pakar')
+    dari = _parse_tanggal(request.GET.get('dari'))
+    sampai = _parse_tanggal(request.GET.get('sampai'))
+    jenis_kelamin = request.GET.get('jenis_kelamin', '')
+    format_keluaran = request.GET.get('format', FORMAT_CSV)
+    if format_keluaran not in PILIHAN_FORMAT_EKSPOR:
+        format_keluaran = FORMAT_CSV
+    
+    queryset = queryset_ekspor(
+        dataset, dari, sampai,
+        jenis_kelamin if jenis_kelamin in ('L', 'P') else None,
+        request.GET.get('kondisi') or None,
+    )
+    try:
+        aliran = alirkan_ekspor(dataset, queryset, format_keluaran)
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect('ekspor_data_pakar')
+    
+    content_type = 'application/vnd.apache.parquet' if format_keluaran == FORMAT_PARQUET else 'text/csv; charset=utf-8'
+    rentang = '_'.join(str(tanggal) for tanggal in (dari, sampai) if tanggal) or 'semua'
+    response = StreamingHttpResponse(aliran, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{dataset}_{rentang}.{format_keluaran}"'
+    return response
+
+
 @login_required
 @user_passes_test(is_expert)
 def create_pengukuran_pakar(request):
@@ -2193,3 +2699,117 @@ def riwayat_list(request):
         'pengukuran_list': pengukuran_list
     })
 
+
+
+def _pisah_kode_gejala(nilai):
+    """
+    Kode gejala dari daftar string, atau dari string yang dipisah titik koma/spasi seperti kolom CSV
+    """
+    if isinstance(nilai, str):
+        return nilai.replace(';', ' ').split()
+    if not isinstance(nilai, list) or not all(isinstance(kode, str) for kode in nilai):
+        raise ValueError('gejala harus berupa daftar kode gejala')
+    return nilai
+
+
+def _baca_input_batch(request):
+    """
+    Baca pasangan (pasien_id, [kode_gejala]) dari JSON POST atau unggahan CSV
+
+    JSON: [{"pasien_id": 1, "gejala": ["G01", "G02"]}, ...] (boleh dibungkus {"data": [...]});
+          gejala juga boleh string "G01;G02"
+    CSV : kolom pasien_id,gejala dengan kode gejala dipisah titik koma atau spasi
+    """
+    import csv
+    import io
+    import json
+
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            raise ValueError('Format JSON tidak valid')
+        baris_list = data.get('data', []) if isinstance(data, dict) else data
+        try:
+            return [(int(baris['pasien_id']), _pisah_kode_gejala(baris.get('gejala', []))) for baris in baris_list]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Setiap baris JSON harus berisi pasien_id dan daftar gejala')
+
+    berkas = request.FILES.get('berkas')
+    if not berkas:
+        raise ValueError('Berkas CSV belum dipilih')
+    reader = csv.DictReader(io.TextIOWrapper(berkas.file, encoding='utf-8-sig'))
+    daftar_input = []
+    for nomor, baris in enumerate(reader, start=2):
+        try:
+            pasien_id = int(baris['pasien_id'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f'Baris {nomor}: kolom pasien_id tidak valid')
+        kode_gejala = _pisah_kode_gejala(baris.get('gejala') or '')
+        daftar_input.append((pasien_id, kode_gejala))
+    return daftar_input
+
+
+@login_required
+@user_passes_test(is_expert)
+def inferensi_batch_pakar(request):
+    """
+    View untuk menjalankan diagnosa massal dari lembar skrining (JSON atau CSV)
+    """
+    context = {
+        'page_title': 'Diagnosa Massal',
+        'breadcrumb_items': [
+            ('Dashboard', 'dashboard_pakar'),
+            ('Diagnosa Massal', 'inferensi_batch_pakar'),
+        ]
+    }
+
+    if request.method == 'POST':
+        is_json = request.content_type == 'application/json'
+        try:
+            daftar_input = _baca_input_batch(request)
+        except ValueError as e:
+            if is_json:
+                return JsonResponse({'error': str(e)}, status=400)
+            context['error'] = str(e)
+            return render(request, 'pakar_inferensi_batch.html', context)
+
+        hasil = jalankan_inferensi_batch(daftar_input)
+        if is_json:
+            return JsonResponse({'hasil': hasil})
+        context['hasil'] = hasil
+        context['jumlah_berhasil'] = sum(1 for item in hasil if not item['error'])
+
+    return render(request, 'pakar_inferensi_batch.html', context)
+
+
+@login_required
+@user_passes_test(is_expert)
+def diagnosa_ulang_pakar(request):
+    """
+    View untuk mengevaluasi ulang konsultasi lama setelah aturan diubah
+
+    GET menampilkan jumlah konsultasi yang belum dievaluasi terhadap basis
+    pengetahuan saat ini dan daftar konsultasi yang hasil evaluasi ulangnya
+    berbeda dari diagnosa awal; POST menjalankan diagnosa ulang.
+    """
+    context = {
+        'page_title': 'Diagnosa Ulang',
+        'breadcrumb_items': [
+            ('Dashboard', 'dashboard_pakar'),
+            ('Diagnosa Ulang', 'diagnosa_ulang_pakar'),
+        ]
+    }
+
+    if request.method == 'POST':
+        context['hasil'] = diagnosa_ulang()
+
+    snapshot_id = dapatkan_indeks().snapshot_id
+    context['jumlah_tertunda'] = Konsultasi.objects.filter(
+        Q(snapshotEvaluasiUlang__isnull=True) | ~Q(snapshotEvaluasiUlang_id=snapshot_id)
+    ).count()
+    berbeda = Konsultasi.objects.filter(berbeda_dari_diagnosa_awal()).select_related('pasien', 'hasilKondisi', 'hasilEvaluasiUlang')
+    halaman = halaman_dari_request(request, berbeda, ['-id'])
+    context['konsultasi_list'] = halaman.object_list
+    context['halaman'] = halaman
+    return render(request, 'pakar_diagnosa_ulang.html', context)